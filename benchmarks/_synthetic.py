@@ -0,0 +1,66 @@
+"""
+File: _synthetic.py
+Purpose: Synthetic sales data shared by the benchmark scripts
+"""
+import os
+import random
+import sys
+
+# Make the project root importable when a benchmark is run as a script
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+
+PRODUCTS = [
+    ("P101", "Laptop", 45000), ("P102", "Mouse", 500),
+    ("P103", "Keyboard", 1500), ("P104", "Monitor", 12000),
+    ("P105", "Webcam", 3000), ("P106", "Headphones", 1500),
+    ("P107", "USB Cable", 175), ("P108", "External Hard Drive", 5000),
+    ("P109", "Wireless Mouse", 1200), ("P110", "Laptop Charger", 1900)
+]
+REGIONS = ["North", "South", "East", "West"]
+
+
+def make_lines(count, dirty_ratio=0.0, customers=5000, seed=42, months=24):
+    """
+    Builds `count` pipe-delimited sales lines (no header)
+
+    dirty_ratio: share of rows with comma-formatted numbers, and a small
+    share of those with unparseable fields
+
+    months: dates are spread over this many months ending 2024-12 (days
+    1-28), so monthly cohorts and date ranges have real spread
+    """
+
+    rng = random.Random(seed)
+    lines = []
+
+    # "YYYY-MM" of the last `months` months, oldest first
+    month_keys = []
+    for offset in range(months - 1, -1, -1):
+        year, month = divmod(2024 * 12 + 11 - offset, 12)
+        month_keys.append(f"{year}-{month + 1:02d}")
+
+    for i in range(count):
+        product_id, name, price = rng.choice(PRODUCTS)
+        quantity = rng.randint(1, 20)
+        month_key = rng.choice(month_keys)
+        day = rng.randint(1, 28)
+        customer = f"C{rng.randint(1, customers):05d}"
+        region = rng.choice(REGIONS)
+        quantity_text = str(quantity)
+        price_text = str(price)
+
+        if dirty_ratio and rng.random() < dirty_ratio:
+            price_text = f"{price:,}"
+            name = name.replace(" ", ",")
+            if rng.random() < 0.1:
+                quantity_text = "n/a"
+
+        lines.append(
+            f"T{i:07d}|{month_key}-{day:02d}|{product_id}|{name}|{quantity_text}|"
+            f"{price_text}|{customer}|{region}"
+        )
+
+    return lines
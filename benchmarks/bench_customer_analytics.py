@@ -0,0 +1,34 @@
+"""
+File: bench_customer_analytics.py
+Purpose: Times RFM scoring and cohort retention on synthetic data
+
+Run from the project root:
+python benchmarks/bench_customer_analytics.py [rows] [customers]
+"""
+import sys
+import time
+
+from _synthetic import make_lines
+
+from utils.customer_analytics import rfm_analysis, cohort_retention
+from utils.file_handler import parse_transactions
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 500_000
+    customers = int(sys.argv[2]) if len(sys.argv) > 2 else 100_000
+
+    transactions = parse_transactions(make_lines(rows, customers=customers))
+    print(f"{len(transactions):,} transactions, up to {customers:,} customers")
+
+    start = time.perf_counter()
+    scores = rfm_analysis(transactions)
+    print(f"rfm_analysis       {time.perf_counter() - start:>8.2f} s  ({len(scores):,} customers)")
+
+    start = time.perf_counter()
+    table = cohort_retention(transactions)
+    print(f"cohort_retention   {time.perf_counter() - start:>8.2f} s  ({len(table):,} cohorts)")
+
+
+if __name__ == "__main__":
+    main()
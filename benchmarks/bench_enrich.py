@@ -0,0 +1,81 @@
+"""
+File: bench_enrich.py
+Purpose: Measures enrichment throughput against local catalog providers
+         (no network needed)
+
+A generated catalog is written as JSON and SQLite. The bulk load only
+returns the first page of products, so most ProductIDs have to go through
+the batched lookup of misses.
+
+Run from the project root:
+python benchmarks/bench_enrich.py [rows] [catalog_size]
+"""
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+from _synthetic import make_lines
+
+from utils.api_handler import create_product_mapping, enrich_sales_data, fetch_all_products
+from utils.catalog import JsonFileCatalogProvider, SqliteCatalogProvider, write_catalog_sqlite
+from utils.file_handler import parse_transactions
+
+
+def make_catalog(size):
+    """
+    Builds `size` DummyJSON-style products with IDs 1..size
+    """
+
+    return [
+        {"id": i, "title": f"Product {i}", "category": f"category-{i % 12}",
+         "brand": f"Brand {i % 40}", "price": round(5 + i * 0.37, 2), "rating": round(3 + (i % 20) / 10, 1)}
+        for i in range(1, size + 1)
+    ]
+
+
+def measure(label, provider, transactions):
+    """
+    Runs bulk load + enrichment twice (cold and warm lookup cache)
+    """
+
+    for run in ("cold", "warm"):
+        start = time.perf_counter()
+        mapping = create_product_mapping(fetch_all_products(provider))
+        enriched = enrich_sales_data(transactions, mapping, provider=provider)
+        elapsed = time.perf_counter() - start
+
+        matched = sum(1 for txn in enriched if txn["API_Match"])
+        print(f"  {label} ({run}): {elapsed * 1000:8.1f} ms  "
+              f"{len(transactions) / elapsed:>10,.0f} rows/s  matched={matched:,}")
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    catalog_size = int(sys.argv[2]) if len(sys.argv) > 2 else 5_000
+
+    # Spread transactions over many ProductIDs (some beyond the catalog)
+    rng = random.Random(7)
+    transactions = parse_transactions(make_lines(rows))
+    for txn in transactions:
+        txn["ProductID"] = f"P{rng.randint(1, int(catalog_size * 1.2))}"
+
+    catalog = make_catalog(catalog_size)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        json_path = os.path.join(tmp_dir, "catalog.json")
+        with open(json_path, "w", encoding="utf-8") as file:
+            json.dump({"products": catalog}, file)
+
+        db_path = os.path.join(tmp_dir, "catalog.db")
+        write_catalog_sqlite(catalog, db_path)
+
+        print(f"Enriching {rows:,} rows against a {catalog_size:,}-product catalog (bulk page = 100)")
+        measure("json  ", JsonFileCatalogProvider(json_path, bulk_limit=100), transactions)
+        measure("sqlite", SqliteCatalogProvider(db_path, bulk_limit=100), transactions)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+File: bench_filter.py
+Purpose: Compares compiled filter expressions with hand-written lambdas
+
+Run from the project root:
+python benchmarks/bench_filter.py [rows]
+"""
+import re
+import sys
+import time
+
+from _synthetic import make_lines
+
+from utils.file_handler import parse_transactions
+from utils.filter_expr import compile_filter, build_index
+from utils.money import amount_paise
+
+
+MOUSE = re.compile("Mouse")
+
+# (expression, equivalent hand-written predicate)
+CASES = [
+    (
+        "region = North",
+        lambda t: t["Region"] == "North"
+    ),
+    (
+        "region in [North, East] and date >= 2024-12-10 and date <= 2024-12-20",
+        lambda t: t["Region"] in ("North", "East") and "2024-12-10" <= t["Date"] <= "2024-12-20"
+    ),
+    (
+        "amount >= 10000 and not (product ~ 'Mouse' or customer = C00042)",
+        lambda t: amount_paise(t) >= 1_000_000
+        and not (MOUSE.search(t["ProductName"]) or t["CustomerID"] == "C00042")
+    )
+]
+
+
+def best_of(func, repeat=3):
+    """
+    Returns (best elapsed seconds, result) over `repeat` runs
+    """
+
+    best = None
+    result = None
+
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+
+    return best, result
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+
+    transactions = parse_transactions(make_lines(rows))
+    indexes = {"Region": build_index(transactions, "Region"),
+               "CustomerID": build_index(transactions, "CustomerID")}
+
+    print(f"Filtering {rows:,} rows")
+
+    for text, hand_written in CASES:
+        expression = compile_filter(text)
+
+        lambda_time, expected = best_of(lambda: [t for t in transactions if hand_written(t)])
+        compiled_time, compiled = best_of(lambda: expression.filter(transactions))
+        indexed_time, indexed = best_of(lambda: expression.filter(transactions, indexes))
+
+        assert compiled == expected and indexed == expected
+
+        print(f"\n{text}  ({len(expected):,} matches)")
+        for label, elapsed in (("hand-written lambda", lambda_time),
+                               ("compiled expression", compiled_time),
+                               ("compiled + index", indexed_time)):
+            print(f"  {label:<22} {elapsed * 1000:>8.1f} ms  {elapsed / rows * 1e9:>7.1f} ns/row")
+
+
+if __name__ == "__main__":
+    main()
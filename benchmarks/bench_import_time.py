@@ -0,0 +1,100 @@
+"""
+File: bench_import_time.py
+Purpose: Measures interpreter startup + import time of the entry points
+
+Each case runs in a fresh interpreter (as a cron job would). The median
+wall time over several runs is reported next to the cumulative import
+time Python itself reports with -X importtime.
+
+The last case is the real local invocation
+(main.py --skip filter,enrich). It runs in a scratch directory holding a
+copy of data/sales_data.txt, so the report it writes does not touch the
+project tree.
+
+Run from the project root:
+python benchmarks/bench_import_time.py [runs]
+"""
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from _synthetic import PROJECT_ROOT
+
+
+# (label, interpreter arguments, module whose import time is reported)
+CASES = [
+    ("interpreter only", ["-c", "pass"], None),
+    ("import main", ["-c", "import main"], "main"),
+    ("import utils.file_handler", ["-c", "import utils.file_handler"], "utils.file_handler"),
+    ("import utils.data_processor", ["-c", "import utils.data_processor"], "utils.data_processor"),
+    ("import utils.api_handler", ["-c", "import utils.api_handler"], "utils.api_handler"),
+    ("import requests (HTTP catalog)", ["-c", "import requests"], "requests"),
+    ("main.py --skip filter,enrich",
+     [os.path.join(PROJECT_ROOT, "main.py"), "--skip", "filter,enrich"], None)
+]
+
+
+def wall_time(args, runs, cwd):
+    """
+    Returns the median wall time (seconds) of `python *args`
+    """
+
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, *args], cwd=cwd, check=True,
+                       stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def import_time(args, module, cwd):
+    """
+    Returns the cumulative import time (seconds) of `module` as reported
+    by -X importtime, or None
+    """
+
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", *args],
+        cwd=cwd, check=True, capture_output=True, text=True, stdin=subprocess.DEVNULL
+    )
+
+    for line in result.stderr.splitlines():
+        # "import time:   self [us] | cumulative | imported package"
+        parts = line.split("|")
+        if len(parts) == 3 and parts[2].strip() == module:
+            return int(parts[1]) / 1e6
+
+    return None
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+
+    # Keep stale bytecode from skewing the first run
+    subprocess.run([sys.executable, "-m", "compileall", "-q", "main.py", "utils"],
+                   cwd=PROJECT_ROOT, check=True)
+
+    print(f"Startup cost over {runs} fresh interpreters (python {sys.version.split()[0]}, {os.name})")
+    print(f"{'case':<32} {'wall (median)':>14} {'import time':>12}")
+
+    # Scratch working directory for the full invocation
+    with tempfile.TemporaryDirectory() as scratch_dir:
+        os.makedirs(os.path.join(scratch_dir, "data"))
+        os.makedirs(os.path.join(scratch_dir, "output"))
+        shutil.copy(os.path.join(PROJECT_ROOT, "data", "sales_data.txt"), os.path.join(scratch_dir, "data"))
+
+        for label, args, module in CASES:
+            cwd = PROJECT_ROOT if args[0] == "-c" else scratch_dir
+            wall = wall_time(args, runs, cwd)
+            imported = import_time(args, module, cwd) if module else None
+            imported_text = f"{imported * 1000:9.1f} ms" if imported is not None else f"{'-':>12}"
+            print(f"{label:<32} {wall * 1000:11.1f} ms {imported_text}")
+
+
+if __name__ == "__main__":
+    main()
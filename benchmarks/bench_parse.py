@@ -0,0 +1,90 @@
+"""
+File: bench_parse.py
+Purpose: Measures parse_transactions throughput on clean and dirty input,
+         against the original (pre fault-tolerance) parser as a reference
+
+Run from the project root:
+python benchmarks/bench_parse.py [rows]
+"""
+import sys
+import time
+
+from _synthetic import make_lines
+
+from utils.file_handler import parse_transactions, parse_transactions_encoded
+
+
+def reference_parse(raw_lines, rejects=None):
+    """
+    The original parse_transactions loop (float prices, no interning, no
+    rejects channel), kept as the baseline to compare against; it
+    raises on malformed rows, so it is only timed on clean input
+    """
+
+    parsed_transactions = []
+
+    for line in raw_lines:
+        fields = line.split("|")
+        if len(fields) != 8:
+            continue
+
+        transaction_id, date, product_id, product_name, quantity, unit_price, customer_id, region = fields
+        product_name = product_name.replace(",", " ")
+        quantity = int(quantity.replace(",", ""))
+        unit_price = float(unit_price.replace(",", ""))
+
+        parsed_transactions.append({
+            "TransactionID": transaction_id,
+            "Date": date,
+            "ProductID": product_id,
+            "ProductName": product_name,
+            "Quantity": quantity,
+            "UnitPrice": unit_price,
+            "CustomerID": customer_id,
+            "Region": region
+        })
+
+    return parsed_transactions
+
+
+def measure(label, func, lines, repeat=3):
+    """
+    Prints the best-of-`repeat` throughput of func(lines, rejects)
+
+    Returns:
+    best time in seconds
+    """
+
+    best = None
+    rejects = []
+
+    for _ in range(repeat):
+        rejects = []
+        start = time.perf_counter()
+        func(lines, rejects)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+
+    rate = len(lines) / best
+    print(f"{label:<28} {best * 1000:>9.1f} ms  {rate:>12,.0f} rows/s  rejects={len(rejects)}")
+    return best
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+
+    clean = make_lines(rows)
+    dirty = make_lines(rows, dirty_ratio=0.3)
+
+    print(f"Parsing {rows:,} rows")
+    reference = measure("reference clean", reference_parse, clean)
+    current = measure("parse_transactions clean", parse_transactions, clean)
+    measure("parse_transactions dirty", parse_transactions, dirty)
+    measure("parse_encoded clean", parse_transactions_encoded, clean)
+    measure("parse_encoded dirty", parse_transactions_encoded, dirty)
+
+    print(f"parse_transactions vs reference (clean): {reference / current:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
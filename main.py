@@ -2,63 +2,310 @@
 Main Application Script.
 Sales Analytics System
 """
+import argparse
+import os
 
-from utils.file_handler import (
-    read_sales_data,
-    parse_transactions,
-    validate_and_filter
-)
-
-from utils.data_processor import (
-    calculate_total_revenue,
-    region_wise_sales,
-    top_selling_products,
-    customer_analysis,
-    daily_sales_trend,
-    find_peak_sales_day,
-    low_performing_products
-)
-
-from utils.api_handler import (
-    fetch_all_products,
-    create_product_mapping,
-    enrich_sales_data,
-    save_enriched_data
-)
-
-from utils.report_generator import generate_sales_report
-
-
-def main():
+# Heavier modules (analysis backends, API/catalog, SQLite, report) are
+# imported inside the stages that use them, so skipped stages cost nothing
+# at startup
+
+# Optional pipeline stages; reading, parsing and validation always run.
+# Select with --stages or drop with --skip (e.g. --skip filter,enrich)
+OPTIONAL_STAGES = ("filter", "analyze", "enrich", "save", "report")
+
+# Analysis backend: "memory" (Python lists), "encoded" (dictionary-encoded
+# columns grouped on integer codes) or "sqlite" (SQL pushdown)
+# Select at runtime with: SALES_BACKEND=sqlite python main.py
+ANALYSIS_BACKEND = os.environ.get("SALES_BACKEND", "memory").strip().lower()
+
+# Optional SQLite database file for the sqlite backend; it is reloaded only
+# when the analyzed data changes (default: rebuilt in memory every run)
+SQLITE_DB_PATH = os.environ.get("SALES_SQLITE_DB") or None
+
+# Optional memory budget for high-cardinality grouping (e.g. "256MB");
+# above it, customer state spills sorted runs to temporary files
+MEMORY_BUDGET_SPEC = os.environ.get("SALES_MEMORY_BUDGET")
+
+# Customers kept by the bounded-memory customer analysis (the report
+# lists the top 5)
+TOP_CUSTOMERS = 5
+
+# Optional directory that remembers ingested TransactionIDs between runs,
+# so replayed batches are dropped in incremental runs
+DEDUP_STATE_DIR = os.environ.get("SALES_DEDUP_STATE") or None
+
+# Optional JSON file holding the anomaly detector state between
+# incremental runs (without it every run starts from scratch)
+ANOMALY_STATE_FILE = os.environ.get("SALES_ANOMALY_STATE") or None
+
+# Analysis result cache; SALES_CACHE_DIR adds an on-disk tier so repeated
+# runs over the same data and filters reuse earlier results
+CACHE_DIR = os.environ.get("SALES_CACHE_DIR") or None
+
+# Optional directory for region=/date= partitioned enriched output
+PARTITION_DIR = os.environ.get("SALES_PARTITION_DIR") or None
+
+# Product catalog: "http" (DummyJSON), an API URL, a .json file or a SQLite file
+CATALOG_SPEC = os.environ.get("SALES_CATALOG", "http")
+
+# Minimum Dice score for fuzzy title matching (0 disables the fallback)
+TITLE_MATCH_SPEC = os.environ.get("SALES_TITLE_MATCH")
+
+# Market-basket grouping for the "frequently bought together" report
+# section: "customer_date" (one basket per customer per day) or "customer"
+BASKET_BY = os.environ.get("SALES_BASKET_BY", "customer_date").strip().lower()
+
+# Product pairs listed in the report
+TOP_PAIRS = 5
+
+# Threads running independent pipeline stages concurrently
+PIPELINE_WORKERS = int(os.environ.get("SALES_WORKERS", "4"))
+
+
+def analyze_sales(transactions, backend="memory", memory_budget=None, cache=None, version=None):
     """
-    Main execution function
+    Runs all Part 2 analyses on the selected backend
+
+    memory_budget (bytes) switches the memory backend's customer analysis
+    to spill-to-disk grouping that returns only the TOP_CUSTOMERS biggest
+    spenders (without product lists)
+
+    cache / version: optional ResultCache and dataset version; results
+    for the same version are reused instead of recomputed. The version
+    also decides whether the SALES_SQLITE_DB file can be reused.
+
+    Returns:
+    dictionary of analysis results keyed by analysis name; money is
+    also kept as exact paise (the *_paise fields and
+    "product_revenue_paise") for the report
     """
 
-    try:
-        # ------------------------------------------------
-        # HEADER
-        # ------------------------------------------------
-        print("=" * 40)
-        print("SALES ANALYTICS SYSTEM")
-        print("=" * 40)
+    if cache is not None and version is None:
+        from utils.memo import dataset_version
+        version = dataset_version(transactions, memory_budget=memory_budget)
+
+    if backend in ("sqlite", "encoded") and cache is not None:
+        return cache.get_or_compute(
+            version,
+            f"analyze_sales[{backend}]",
+            lambda: analyze_sales(transactions, backend, memory_budget, version=version)
+        )
+
+    if backend == "sqlite":
+        from utils.sqlite_store import (
+            load_transactions_to_sqlite,
+            open_transactions_db,
+            sqlite_calculate_total_revenue,
+            sqlite_region_wise_sales,
+            sqlite_top_selling_products,
+            sqlite_product_revenue_paise,
+            sqlite_customer_analysis,
+            sqlite_daily_sales_trend,
+            sqlite_find_peak_sales_day,
+            sqlite_low_performing_products
+        )
+
+        if SQLITE_DB_PATH:
+            if version is None:
+                from utils.memo import dataset_version
+                version = dataset_version(transactions)
+            conn, _ = open_transactions_db(transactions, SQLITE_DB_PATH, version)
+        else:
+            conn = load_transactions_to_sqlite(transactions)
+
+        try:
+            return {
+                "total_revenue": sqlite_calculate_total_revenue(conn),
+                "region_sales": sqlite_region_wise_sales(conn),
+                "top_products": sqlite_top_selling_products(conn),
+                "product_revenue_paise": sqlite_product_revenue_paise(conn),
+                "customers": sqlite_customer_analysis(conn),
+                "daily_trend": sqlite_daily_sales_trend(conn),
+                "peak_day": sqlite_find_peak_sales_day(conn),
+                "low_performers": sqlite_low_performing_products(conn)
+            }
+        finally:
+            conn.close()
+
+    from utils.data_processor import (
+        calculate_total_revenue,
+        region_wise_sales,
+        top_selling_products,
+        customer_analysis,
+        daily_sales_trend,
+        find_peak_sales_day,
+        low_performing_products,
+        product_revenue_paise,
+        customer_analysis_spilling
+    )
+
+    if backend == "encoded":
+        from utils.data_processor import (
+            calculate_total_revenue_encoded,
+            region_wise_sales_encoded,
+            top_selling_products_encoded,
+            customer_analysis_encoded,
+            daily_sales_trend_encoded,
+            low_performing_products_encoded,
+            product_revenue_paise_encoded
+        )
+        from utils.file_handler import EncodedTransactions, encode_transactions
+
+        # The pipeline parses straight into an encoded table (the view
+        # only selects its rows); plain lists are encoded here
+        if isinstance(transactions, EncodedTransactions):
+            encoded = transactions.to_table()
+        else:
+            encoded = encode_transactions(transactions)
+
+        daily_trend = daily_sales_trend_encoded(encoded)
+        return {
+            "total_revenue": calculate_total_revenue_encoded(encoded),
+            "region_sales": region_wise_sales_encoded(encoded),
+            "top_products": top_selling_products_encoded(encoded),
+            "product_revenue_paise": product_revenue_paise_encoded(encoded),
+            "customers": customer_analysis_encoded(encoded),
+            "daily_trend": daily_trend,
+            "peak_day": find_peak_sales_day(None, daily_summary=daily_trend),
+            "low_performers": low_performing_products_encoded(encoded)
+        }
+
+    if backend != "memory":
+        raise ValueError(f"Unknown analysis backend: {backend}")
+
+    from utils.memo import cached_call
+
+    def cached(func, *args, **kwargs):
+        return cached_call(cache, version, func, transactions, *args, **kwargs)
+
+    if memory_budget:
+        # Bounded memory: only the top customers (as used by the report)
+        # are collected from the spilled groups
+        customers = cached(customer_analysis_spilling, memory_budget,
+                           top_n=TOP_CUSTOMERS, include_product_list=False)
+    else:
+        customers = cached(customer_analysis)
+
+    # The peak day is derived from the (cached) daily trend
+    daily_trend = cached(daily_sales_trend)
+    if cache is None:
+        peak_day = find_peak_sales_day(transactions, daily_summary=daily_trend)
+    else:
+        peak_day = cache.get_or_compute(
+            version,
+            "find_peak_sales_day",
+            lambda: find_peak_sales_day(transactions, daily_summary=daily_trend)
+        )
+
+    return {
+        "total_revenue": cached(calculate_total_revenue),
+        "region_sales": cached(region_wise_sales),
+        "top_products": cached(top_selling_products),
+        "product_revenue_paise": cached(product_revenue_paise),
+        "customers": customers,
+        "daily_trend": daily_trend,
+        "peak_day": peak_day,
+        "low_performers": cached(low_performing_products)
+    }
+
+
+# Pipeline stages behind each optional stage name
+STAGE_GROUPS = {
+    "filter": ("filter",),
+    "analyze": ("version", "analyze", "anomalies", "basket"),
+    "enrich": ("fetch", "enrich"),
+    "save": ("save",),
+    "report": ("report",)
+}
+
+
+class NothingToProcess(Exception):
+    """
+    Raised by a stage when the batch has no rows left to process
+    (e.g. every transaction is a replay of an earlier run)
+    """
+
+
+def build_pipeline(max_workers=4, cache=None, dedup_state_dir=DEDUP_STATE_DIR):
+    """
+    Registers the ten steps as pipeline stages with their inputs/outputs
+
+    Independent stages run concurrently once their inputs are ready:
+    the analysis, anomaly detection and catalog fetch overlap, and saving
+    the enriched data overlaps with the report.
+
+    Returns:
+    Pipeline (run it with initial values "data_file" and "memory_budget")
+    """
+
+    from utils.pipeline import Pipeline
+
+    pipeline = Pipeline(max_workers=max_workers, cache=cache)
+
+    # ------------------------------------------------
+    # [1/10] READ SALES DATA
+    # ------------------------------------------------
+    @pipeline.stage(inputs=("data_file",), outputs=("raw_lines", "line_numbers"))
+    def read(data_file):
+        from utils.file_handler import read_sales_data
 
-        # ------------------------------------------------
-        # [1/10] READ SALES DATA
-        # ------------------------------------------------
         print("\n[1/10] Reading sales data....")
-        raw_lines = read_sales_data("data/sales_data.txt")
+        line_numbers = []
+        raw_lines = read_sales_data(data_file, line_numbers=line_numbers)
         print(f"✓ Successfully read {len(raw_lines)} transactions")
+        return raw_lines, line_numbers
+
+    # ------------------------------------------------
+    # [2/10] PARSE & CLEAN
+    # ------------------------------------------------
+    @pipeline.stage(inputs=("raw_lines", "line_numbers"), outputs=("parsed_transactions",))
+    def parse(raw_lines, line_numbers):
+        from utils.file_handler import EncodedTransactions, parse_transactions, parse_transactions_encoded
+        from utils.dedup import remove_duplicate_transactions
 
-        # ------------------------------------------------
-        # [2/10] PARSE & CLEAN
-        # ------------------------------------------------
         print("\n[2/10] Parsing and cleaning data....")
-        parsed_transactions = parse_transactions(raw_lines)
+        rejected_rows = []
+
+        # The encoded backend parses straight into the encoded table; the
+        # other stages see it through a list-like view
+        if ANALYSIS_BACKEND == "encoded":
+            parsed_transactions = EncodedTransactions(
+                parse_transactions_encoded(raw_lines, rejects=rejected_rows, line_numbers=line_numbers)
+            )
+        else:
+            parsed_transactions = parse_transactions(raw_lines, rejects=rejected_rows, line_numbers=line_numbers)
         print(f"✓ Parsed {len(parsed_transactions)} records")
 
-        # ------------------------------------------------
-        # [3/10] FILTER OPTIONS
-        # ------------------------------------------------
+        if rejected_rows:
+            print(f"⚠ Rejected {len(rejected_rows)} malformed rows:")
+            for reject in rejected_rows[:5]:
+                print(f"  - line {reject['line_number']}: {reject['reason']}")
+
+        # IDs are only checked here; they are recorded once the run succeeded
+        parsed_transactions, duplicates = remove_duplicate_transactions(
+            parsed_transactions, state_dir=dedup_state_dir, record=False
+        )
+        if duplicates:
+            duplicate_ids = ", ".join(t["TransactionID"] for t in duplicates[:10])
+            print(f"⚠ Dropped {len(duplicates)} duplicate transactions: {duplicate_ids}")
+
+        if not parsed_transactions:
+            raise NothingToProcess(
+                f"No new transactions to process ({len(duplicates)} duplicates, "
+                f"{len(rejected_rows)} rejected rows)"
+            )
+
+        return parsed_transactions
+
+    # ------------------------------------------------
+    # [3/10] FILTER OPTIONS (interactive)
+    # ------------------------------------------------
+    @pipeline.stage(name="filter", inputs=("parsed_transactions",),
+                    outputs=("filtered_transactions", "filter_expression", "filter_params"))
+    def filter_stage(parsed_transactions):
+        from utils.file_handler import select_transactions
+        from utils.filter_expr import compile_filter
+
         regions = sorted({t["Region"] for t in parsed_transactions})
         amounts = [t["Quantity"] * t["UnitPrice"] for t in parsed_transactions]
 
@@ -66,6 +313,10 @@ def main():
         print("Regions:", ", ".join(regions))
         print(f"Amount Range: ₹{min(amounts):,.0f} - ₹{max(amounts):,.0f}")
 
+        # Filter parameters become part of the dataset version
+        filter_params = {}
+        filter_expression = None
+
         apply_filter = input("\nDo you want to filter data? (y/n): ").strip().lower()
 
         if apply_filter not in ("y", "n"):
@@ -73,75 +324,237 @@ def main():
             apply_filter = "n"
 
         if apply_filter == "y":
-            selected_region = input("Enter region to filter: ").strip()
-            min_amt = float(input("Enter minimum transaction amount: "))
-            max_amt = float(input("Enter maximum transaction amount: "))
+            print("Filter expression, e.g. region in [North, East] and amount >= 5000 and date >= 2024-12-10")
+            expression_text = input("Enter filter expression (blank for region/amount prompts): ").strip()
 
-            parsed_transactions = [
-                t for t in parsed_transactions
-                if t["Region"] == selected_region
-                and min_amt <= (t["Quantity"] * t["UnitPrice"]) <= max_amt
-            ]
+            if expression_text:
+                try:
+                    filter_expression = compile_filter(expression_text)
+                except ValueError as error:
+                    print(f"Invalid filter expression: {error}. Proceeding without filters.")
+                else:
+                    filter_params = {"expression": expression_text}
+            else:
+                selected_region = input("Enter region to filter: ").strip()
+                min_amt = float(input("Enter minimum transaction amount: "))
+                max_amt = float(input("Enter maximum transaction amount: "))
 
-            print(f"✓ Records after filtering: {len(parsed_transactions)}")
+                parsed_transactions = select_transactions(parsed_transactions, [
+                    position for position, t in enumerate(parsed_transactions)
+                    if t["Region"] == selected_region
+                    and min_amt <= (t["Quantity"] * t["UnitPrice"]) <= max_amt
+                ])
+
+                filter_params = {"region": selected_region, "min_amount": min_amt, "max_amount": max_amt}
+                print(f"✓ Records after filtering: {len(parsed_transactions)}")
+
+        return parsed_transactions, filter_expression, filter_params
+
+    # ------------------------------------------------
+    # [4/10] VALIDATION
+    # ------------------------------------------------
+    @pipeline.stage(inputs=("parsed_transactions", "filtered_transactions", "filter_expression", "filter_params"),
+                    outputs=("validated_transactions", "valid_transactions"))
+    def validate(parsed_transactions, filtered_transactions, filter_expression, filter_params):
+        from utils.file_handler import validate_and_filter
 
-        # ------------------------------------------------
-        # [4/10] VALIDATION
-        # ------------------------------------------------
         print("\n[4/10] Validating transactions...")
-        valid_transactions, invalid_count, summary = validate_and_filter(parsed_transactions)
+
+        # A skipped filter stage leaves its outputs as None
+        if not filter_params:
+            valid_transactions, invalid_count, summary = validate_and_filter(parsed_transactions)
+            print(f"✓ Valid: {len(valid_transactions)} | Invalid: {invalid_count}")
+            return valid_transactions, valid_transactions
+
+        # With a filter, the unfiltered valid rows are kept as well: the
+        # anomaly detector must see every day's full revenue
+        validated_transactions, _, _ = validate_and_filter(parsed_transactions, verbose=False)
+        valid_transactions, invalid_count, summary = validate_and_filter(
+            filtered_transactions, expression=filter_expression
+        )
         print(f"✓ Valid: {len(valid_transactions)} | Invalid: {invalid_count}")
+        return validated_transactions, valid_transactions
 
-        # ------------------------------------------------
-        # [5/10] DATA ANALYSIS (PART 2)
-        # ------------------------------------------------
-        print("\n[5/10] Analyzing sales data...")
-        calculate_total_revenue(valid_transactions)
-        region_wise_sales(valid_transactions)
-        top_selling_products(valid_transactions)
-        customer_analysis(valid_transactions)
-        daily_sales_trend(valid_transactions)
-        find_peak_sales_day(valid_transactions)
-        low_performing_products(valid_transactions)
+    # ------------------------------------------------
+    # [5/10] DATA ANALYSIS (PART 2)
+    # ------------------------------------------------
+    # The memory budget changes what the customer analysis keeps (top
+    # customers only), so it is part of the version too
+    @pipeline.stage(inputs=("valid_transactions", "filter_params", "memory_budget"), outputs=("version",))
+    def version(valid_transactions, filter_params, memory_budget):
+        from utils.memo import dataset_version
+
+        return dataset_version(
+            valid_transactions,
+            backend=ANALYSIS_BACKEND,
+            memory_budget=memory_budget,
+            **(filter_params or {})
+        )
+
+    # The heading is printed by the scheduler, so a cache hit shows it too
+    @pipeline.stage(inputs=("valid_transactions", "version", "memory_budget"),
+                    outputs=("analysis",), cache_key="version",
+                    title=f"\n[5/10] Analyzing sales data ({ANALYSIS_BACKEND} backend)...")
+    def analyze(valid_transactions, version, memory_budget):
+        analysis = analyze_sales(valid_transactions, ANALYSIS_BACKEND, memory_budget, version=version)
         print("✓ Analysis complete")
+        return analysis
+
+    # Runs on the validated rows before any filter: the detector state
+    # (SALES_ANOMALY_STATE) follows the full daily series, so a filtered
+    # run must not feed it partial revenue
+    @pipeline.stage(inputs=("validated_transactions",), outputs=("anomalies",))
+    def anomalies(validated_transactions):
+        from utils.anomaly import detect_revenue_anomalies
+
+        anomalies = detect_revenue_anomalies(validated_transactions, ANOMALY_STATE_FILE)
+        print(f"[5/10] ✓ Revenue anomalies flagged: {len(anomalies)}")
+        return anomalies
+
+    @pipeline.stage(inputs=("valid_transactions",), outputs=("basket_pairs",))
+    def basket(valid_transactions):
+        from utils.market_basket import frequently_bought_together
+
+        basket_pairs = frequently_bought_together(valid_transactions, basket_by=BASKET_BY, top_n=TOP_PAIRS)
+        print(f"[5/10] ✓ Frequently bought together pairs: {len(basket_pairs)}")
+        return basket_pairs
+
+    # ------------------------------------------------
+    # [6/10] API FETCH
+    # (after the filter prompt, so its output does not interleave with it)
+    # ------------------------------------------------
+    @pipeline.stage(outputs=("catalog", "product_mapping", "title_index"), after=("filter",))
+    def fetch():
+        from utils.api_handler import fetch_all_products, create_product_mapping
+        from utils.catalog import catalog_provider_from_spec
+        from utils.title_match import DEFAULT_THRESHOLD, TitleIndex
 
-        # ------------------------------------------------
-        # [6/10] API FETCH
-        # ------------------------------------------------
         print("\n[6/10] Fetching product data from API...")
-        api_products = fetch_all_products()
+        catalog = catalog_provider_from_spec(CATALOG_SPEC)
+        api_products = fetch_all_products(catalog)
         product_mapping = create_product_mapping(api_products)
+
+        threshold = float(TITLE_MATCH_SPEC) if TITLE_MATCH_SPEC else DEFAULT_THRESHOLD
+        title_index = TitleIndex(api_products, threshold) if threshold > 0 else None
         print(f"✓ Fetched {len(api_products)} products")
 
-        # ------------------------------------------------
-        # [7/10] ENRICH SALES DATA
-        # ------------------------------------------------
+        return catalog, product_mapping, title_index
+
+    # ------------------------------------------------
+    # [7/10] ENRICH SALES DATA
+    # ------------------------------------------------
+    @pipeline.stage(inputs=("valid_transactions", "catalog", "product_mapping", "title_index"),
+                    outputs=("enriched_transactions",))
+    def enrich(valid_transactions, catalog, product_mapping, title_index):
+        from utils.api_handler import enrich_sales_data
+
         print("\n[7/10] Enriching sales data...")
-        enriched_transactions = enrich_sales_data(valid_transactions, product_mapping)
+        enriched_transactions = enrich_sales_data(
+            valid_transactions, product_mapping, provider=catalog, title_index=title_index
+        )
         enriched_count = sum(1 for t in enriched_transactions if t.get("API_Match"))
-        success_rate = (enriched_count / len(valid_transactions)) * 100
+        success_rate = (enriched_count / len(valid_transactions)) * 100 if valid_transactions else 0
         print(f"✓ Enriched {enriched_count}/{len(valid_transactions)} transactions ({success_rate:.1f}%)")
+        return enriched_transactions
+
+    # ------------------------------------------------
+    # [8/10] SAVE ENRICHED DATA
+    # ------------------------------------------------
+    @pipeline.stage(inputs=("enriched_transactions",))
+    def save(enriched_transactions):
+        from utils.api_handler import save_enriched_data, save_enriched_partitions
+
+        if enriched_transactions is None:
+            print("\n[8/10] Saving enriched data skipped (no enrichment)")
+            return
 
-        # ------------------------------------------------
-        # [8/10] SAVE ENRICHED DATA
-        # ------------------------------------------------
         print("\n[8/10] Saving enriched data...")
         save_enriched_data(enriched_transactions)
         print("✓ Saved to: data/enriched_sales_data.txt")
 
-        # ------------------------------------------------
-        # [9/10] GENERATE REPORT
-        # ------------------------------------------------
+        if PARTITION_DIR:
+            manifest = save_enriched_partitions(enriched_transactions, PARTITION_DIR)
+            print(f"✓ Saved {len(manifest['partitions'])} partitions to: {PARTITION_DIR}")
+
+    # ------------------------------------------------
+    # [9/10] GENERATE REPORT
+    # ------------------------------------------------
+    @pipeline.stage(inputs=("valid_transactions", "enriched_transactions", "analysis",
+                            "anomalies", "basket_pairs", "memory_budget"))
+    def report(valid_transactions, enriched_transactions, analysis, anomalies, basket_pairs, memory_budget):
+        from utils.report_generator import generate_sales_report
+
         print("\n[9/10] Generating report...")
-        generate_sales_report(valid_transactions, enriched_transactions)
+        generate_sales_report(
+            valid_transactions,
+            enriched_transactions,
+            memory_budget=memory_budget,
+            anomalies=anomalies,
+            basket_pairs=basket_pairs,
+            analysis=analysis
+        )
         print("✓ Report saved to: output/sales_report.txt")
 
+    return pipeline
+
+
+def main(stages=OPTIONAL_STAGES, dedup_state_dir=DEDUP_STATE_DIR):
+    """
+    Main execution function
+
+    stages: optional stages to run (see OPTIONAL_STAGES); saving needs
+    enrichment, so it is skipped when enrichment is
+    dedup_state_dir: directory remembering ingested TransactionIDs
+    (incremental runs); only the IDs of analyzed rows are recorded
+    """
+
+    skipped = [name for group, names in STAGE_GROUPS.items() if group not in stages for name in names]
+
+    try:
+        from utils.memo import ResultCache
+        from utils.spill import parse_memory_budget
+
+        # ------------------------------------------------
+        # HEADER
+        # ------------------------------------------------
+        print("=" * 40)
+        print("SALES ANALYTICS SYSTEM")
+        print("=" * 40)
+
+        skipped_groups = [group for group in OPTIONAL_STAGES if group not in stages]
+        if skipped_groups:
+            print(f"Skipping stages: {', '.join(skipped_groups)}")
+
+        pipeline = build_pipeline(
+            max_workers=PIPELINE_WORKERS,
+            cache=ResultCache(disk_dir=CACHE_DIR),
+            dedup_state_dir=dedup_state_dir
+        )
+        values = pipeline.run(
+            {"data_file": "data/sales_data.txt", "memory_budget": parse_memory_budget(MEMORY_BUDGET_SPEC)},
+            skip=skipped
+        )
+
+        # Only a successful run marks TransactionIDs as ingested, and only
+        # those of the analyzed rows: rows dropped by the filter or by
+        # validation are processed again by a later run
+        if dedup_state_dir:
+            from utils.dedup import record_transaction_ids, transaction_ids
+
+            analyzed_ids = transaction_ids(values["valid_transactions"])
+            record_transaction_ids(analyzed_ids, dedup_state_dir)
+            print(f"✓ Recorded {len(analyzed_ids)} TransactionIDs in {dedup_state_dir}")
+
         # ------------------------------------------------
         # [10/10] COMPLETE
         # ------------------------------------------------
         print("\n[10/10] Process Complete!")
+        print(pipeline.summary())
         print("=" * 40)
 
+    except NothingToProcess as note:
+        print(f"\n⚠ {note}")
+
     except FileNotFoundError:
         print("❌ ERROR: Sales data file not found. Please check file path.")
 
@@ -154,8 +567,51 @@ def main():
         print("Details:", e)
 
 
+def _stage_list(text):
+    """
+    Parses a comma-separated list of optional stage names (argparse type)
+    """
+
+    names = [name.strip().lower() for name in text.split(",") if name.strip()]
+    unknown = [name for name in names if name not in OPTIONAL_STAGES]
+    if unknown:
+        raise argparse.ArgumentTypeError(
+            f"unknown stage(s) {', '.join(unknown)}; choose from {', '.join(OPTIONAL_STAGES)}"
+        )
+    return names
+
+
+def parse_args(argv=None):
+    """
+    Parses command line options
+    """
+
+    parser = argparse.ArgumentParser(description="Sales Analytics System")
+    parser.add_argument("--serve", action="store_true",
+                        help="run the local HTTP/JSON query service instead of the report pipeline")
+    parser.add_argument("--host", default="127.0.0.1", help="query service host (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8000, help="query service port (default: 8000)")
+    parser.add_argument("--data", default="data/sales_data.txt", help="sales data file for the query service")
+    parser.add_argument("--stages", type=_stage_list, default=list(OPTIONAL_STAGES),
+                        help=f"optional stages to run (default: {','.join(OPTIONAL_STAGES)})")
+    parser.add_argument("--skip", type=_stage_list, default=[],
+                        help="optional stages to skip, e.g. --skip filter,enrich")
+    parser.add_argument("--incremental", metavar="DIR", default=DEDUP_STATE_DIR,
+                        help="remember ingested TransactionIDs in DIR and drop replays "
+                             "(default: $SALES_DEDUP_STATE). Only rows that pass validation "
+                             "and the filter are recorded, after a successful run; filtered "
+                             "out or invalid rows are processed again by later runs")
+    return parser.parse_args(argv)
+
+
 # ------------------------------------------------
 # ENTRY POINT
 # ------------------------------------------------
 if __name__ == "__main__":
-    main()
+    args = parse_args()
+
+    if args.serve:
+        from utils.query_service import serve
+        serve(args.data, args.host, args.port)
+    else:
+        main([stage for stage in args.stages if stage not in args.skip], dedup_state_dir=args.incremental)
@@ -0,0 +1,66 @@
+"""
+File: conftest.py
+Purpose: Shared fixtures for the test suite (small deterministic sales data)
+"""
+import os
+import random
+import sys
+
+import pytest
+
+# Make the project root importable (utils package and main.py)
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+
+PRODUCTS = [
+    ("P101", "Laptop", "45000"), ("P102", "Mouse", "500"),
+    ("P103", "Keyboard", "1500"), ("P104", "Monitor", "12000"),
+    ("P105", "Webcam", "3000"), ("P107", "USB Cable", "175.50"),
+    ("P110", "Laptop Charger", "1900")
+]
+REGIONS = ["North", "South", "East", "West"]
+
+
+def make_lines(count, customers=40, seed=7):
+    """
+    Builds `count` clean pipe-delimited sales lines over December 2024
+    (few customers, so customers, days and baskets repeat)
+    """
+
+    rng = random.Random(seed)
+    lines = []
+
+    for i in range(count):
+        product_id, name, price = rng.choice(PRODUCTS)
+        lines.append(
+            f"T{i:05d}|2024-12-{rng.randint(1, 28):02d}|{product_id}|{name}|"
+            f"{rng.randint(1, 9)}|{price}|C{rng.randint(1, customers):03d}|{rng.choice(REGIONS)}"
+        )
+
+    return lines
+
+
+@pytest.fixture
+def lines():
+    return make_lines(600)
+
+
+@pytest.fixture
+def transactions(lines):
+    from utils.file_handler import parse_transactions
+
+    return parse_transactions(lines)
+
+
+@pytest.fixture
+def sales_file(tmp_path, lines):
+    """
+    Writes the sample lines (with a header) to a sales data file
+    """
+
+    path = tmp_path / "sales_data.txt"
+    header = "TransactionID|Date|ProductID|ProductName|Quantity|UnitPrice|CustomerID|Region"
+    path.write_text("\n".join([header] + lines) + "\n", encoding="utf-8")
+    return path
@@ -0,0 +1,63 @@
+"""
+File: test_anomaly.py
+Purpose: Streaming revenue anomaly detection, zero-filled days and state
+"""
+from utils.anomaly import RevenueAnomalyDetector, daily_revenue_series, detect_revenue_anomalies
+
+
+def _txn(date, region="North", product="Laptop", quantity=1, paise=100000):
+    return {"Date": date, "Region": region, "ProductName": product,
+            "Quantity": quantity, "UnitPrice": paise / 100, "UnitPricePaise": paise}
+
+
+def _december(days, **fields):
+    return [_txn(f"2024-12-{day:02d}", quantity=10 + day % 3, **fields) for day in days]
+
+
+def test_days_without_sales_are_zero_observations():
+    rows = _december([1, 2, 5], product="Mouse")
+
+    series = [(date, revenue) for date, name, revenue in daily_revenue_series(rows) if name == "product:Mouse"]
+
+    assert series == [("2024-12-01", 1100000), ("2024-12-02", 1200000), ("2024-12-03", 0),
+                      ("2024-12-04", 0), ("2024-12-05", 1200000)]
+
+
+def test_drop_to_zero_is_flagged():
+    # Mouse sells daily until the 15th and then stops; Laptop keeps going
+    rows = _december(range(1, 16), product="Mouse") + _december(range(1, 21), region="South")
+
+    anomalies = detect_revenue_anomalies(rows)
+
+    flagged = {(a["date"], a["series"]) for a in anomalies}
+    assert ("2024-12-16", "product:Mouse") in flagged
+    assert all(a["revenue"] == 0 for a in anomalies if a["series"] == "product:Mouse")
+
+
+def test_series_missing_from_a_later_batch_is_filled_from_state(tmp_path):
+    state_file = str(tmp_path / "state.json")
+
+    detect_revenue_anomalies(_december(range(1, 15), product="Mouse"), state_file)
+    anomalies = detect_revenue_anomalies(_december([20], product="Laptop"), state_file)
+
+    assert ("2024-12-15", "product:Mouse") in {(a["date"], a["series"]) for a in anomalies}
+    assert RevenueAnomalyDetector.load(state_file).series["product:Mouse"]["last_date"] == "2024-12-20"
+
+
+def test_state_skips_days_already_seen(tmp_path):
+    state_file = str(tmp_path / "state.json")
+    rows = _december(range(1, 11))
+
+    detect_revenue_anomalies(rows, state_file)
+    count = RevenueAnomalyDetector.load(state_file).series["total"]["count"]
+    detect_revenue_anomalies(rows, state_file)
+
+    assert RevenueAnomalyDetector.load(state_file).series["total"]["count"] == count == 10
+
+
+def test_spike_is_flagged_with_ewma():
+    rows = _december(range(1, 20)) + [_txn("2024-12-20", quantity=200)]
+
+    anomalies = detect_revenue_anomalies(rows, alpha=0.3)
+
+    assert {(a["date"], a["series"]) for a in anomalies} >= {("2024-12-20", "total")}
@@ -0,0 +1,125 @@
+"""
+File: test_catalog.py
+Purpose: Catalog providers, batched cached lookups and enrichment
+"""
+import json
+
+import pytest
+
+from utils.api_handler import create_product_mapping, enrich_sales_data
+from utils.catalog import (
+    CatalogError,
+    CatalogProvider,
+    HttpCatalogProvider,
+    JsonFileCatalogProvider,
+    SqliteCatalogProvider,
+    catalog_provider_from_spec,
+    write_catalog_sqlite
+)
+
+
+PRODUCTS = [
+    {"id": i, "title": f"Product {i}", "category": "misc", "brand": "Acme", "price": 10.0 * i,
+     "rating": 4.5, "stock": 3}
+    for i in range(100, 131)
+]
+
+
+class CountingProvider(CatalogProvider):
+    """
+    In-memory provider that records the batches it is asked for
+    """
+
+    def __init__(self, products, batch_size=4, fail=False):
+        super().__init__(batch_size=batch_size, max_workers=3)
+        self.products = {p["id"]: p for p in products}
+        self.batches = []
+        self.fail = fail
+
+    def fetch_all(self):
+        return list(self.products.values())
+
+    def fetch_batch(self, ids):
+        self.batches.append(list(ids))
+        if self.fail:
+            raise CatalogError("catalog down")
+        return {i: self.products[i] for i in ids if i in self.products}
+
+
+@pytest.fixture
+def json_catalog(tmp_path):
+    path = tmp_path / "catalog.json"
+    path.write_text(json.dumps({"products": PRODUCTS}), encoding="utf-8")
+    return str(path)
+
+
+def test_base_class_is_abstract():
+    with pytest.raises(TypeError):
+        CatalogProvider()
+
+    class Incomplete(CatalogProvider):
+        def fetch_all(self):
+            return []
+
+    with pytest.raises(TypeError):
+        Incomplete()
+
+
+def test_lookup_deduplicates_batches_and_caches_misses():
+    provider = CountingProvider(PRODUCTS[:5])
+
+    found = provider.lookup([100, 101, 100, 999, None, 102, 103, 104, 998])
+
+    assert sorted(found) == [100, 101, 102, 103, 104]
+    assert sorted(i for batch in provider.batches for i in batch) == [100, 101, 102, 103, 104, 998, 999]
+    assert all(len(batch) <= 4 for batch in provider.batches)
+
+    # Found products and confirmed misses are not fetched again
+    provider.batches.clear()
+    assert provider.lookup([100, 999]) == {100: PRODUCTS[0]}
+    assert provider.batches == []
+
+
+def test_failed_batches_raise_catalog_error():
+    with pytest.raises(CatalogError):
+        CountingProvider(PRODUCTS, fail=True).lookup(list(range(100, 120)))
+
+
+def test_json_and_sqlite_providers_agree(tmp_path, json_catalog):
+    db_path = str(tmp_path / "catalog.db")
+    json_provider = JsonFileCatalogProvider(json_catalog, bulk_limit=10)
+    products = JsonFileCatalogProvider(json_catalog).fetch_all()
+    write_catalog_sqlite(products, db_path)
+    sqlite_provider = SqliteCatalogProvider(db_path, bulk_limit=10)
+
+    assert json_provider.fetch_all() == sqlite_provider.fetch_all() == products[:10]
+    assert "stock" not in products[0]
+    assert json_provider.lookup([125, 500]) == sqlite_provider.lookup([125, 500]) == {125: products[25]}
+
+
+def test_unreadable_catalogs_raise_catalog_error(tmp_path):
+    with pytest.raises(CatalogError):
+        JsonFileCatalogProvider(str(tmp_path / "missing.json")).fetch_all()
+    with pytest.raises(CatalogError):
+        SqliteCatalogProvider(str(tmp_path / "empty.db")).fetch_all()
+
+
+def test_provider_from_spec(json_catalog):
+    assert isinstance(catalog_provider_from_spec("http"), HttpCatalogProvider)
+    assert catalog_provider_from_spec("https://example.test").base_url == "https://example.test"
+    assert isinstance(catalog_provider_from_spec(json_catalog), JsonFileCatalogProvider)
+    assert isinstance(catalog_provider_from_spec("products.sqlite"), SqliteCatalogProvider)
+
+    with pytest.raises(ValueError):
+        catalog_provider_from_spec("catalog.csv")
+
+
+def test_enrichment_looks_up_products_missing_from_the_bulk_load(json_catalog, transactions):
+    provider = JsonFileCatalogProvider(json_catalog, bulk_limit=3)
+    mapping = create_product_mapping(provider.fetch_all())
+
+    enriched = enrich_sales_data(transactions, mapping, provider=provider)
+
+    matched = {t["ProductID"] for t in enriched if t["API_Match"]}
+    assert matched == {t["ProductID"] for t in transactions if 100 <= int(t["ProductID"][1:]) <= 130}
+    assert len(enriched) == len(transactions)
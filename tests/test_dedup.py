@@ -0,0 +1,89 @@
+"""
+File: test_dedup.py
+Purpose: Bloom-filter dedup, check-then-record state and incremental runs
+"""
+import builtins
+
+import main
+from utils.dedup import (
+    BloomFilter,
+    TransactionDeduplicator,
+    record_transaction_ids,
+    remove_duplicate_transactions
+)
+from utils.file_handler import EncodedTransactions, parse_transactions_encoded
+
+
+def test_bloom_filter_has_no_false_negatives(tmp_path):
+    bloom = BloomFilter(1000)
+    for i in range(1000):
+        bloom.add(f"T{i}")
+
+    path = str(tmp_path / "ids.bloom")
+    bloom.save(path)
+    loaded = BloomFilter.load(path)
+
+    assert all(f"T{i}" in loaded for i in range(1000))
+    assert sum(f"X{i}" in loaded for i in range(1000)) < 50
+
+
+def test_duplicates_within_a_batch_are_dropped(transactions):
+    unique, duplicates = remove_duplicate_transactions(transactions + transactions[:5])
+
+    assert unique == transactions
+    assert duplicates == transactions[:5]
+
+
+def test_encoded_view_is_deduplicated_on_its_id_column(lines):
+    view = EncodedTransactions(parse_transactions_encoded(lines + lines[:3]))
+
+    unique, duplicates = remove_duplicate_transactions(view)
+
+    assert isinstance(unique, EncodedTransactions)
+    assert len(unique) == len(lines)
+    assert len(duplicates) == 3
+
+
+def test_check_only_then_record(tmp_path, transactions):
+    state_dir = str(tmp_path / "state")
+    first, rest = transactions[:100], transactions[100:]
+
+    # Checking does not record: the same batch is still new
+    unique, _ = remove_duplicate_transactions(first, state_dir=state_dir, record=False)
+    unique, _ = remove_duplicate_transactions(first, state_dir=state_dir, record=False)
+    assert unique == first
+
+    record_transaction_ids((t["TransactionID"] for t in first), state_dir)
+
+    unique, duplicates = remove_duplicate_transactions(transactions, state_dir=state_dir, record=False)
+    assert unique == rest
+    assert duplicates == first
+
+    deduplicator = TransactionDeduplicator(state_dir=state_dir)
+    try:
+        assert deduplicator.seen(first[0]["TransactionID"])
+        assert not deduplicator.seen(rest[0]["TransactionID"])
+    finally:
+        deduplicator.close(save=False)
+
+
+def test_filtered_incremental_run_records_only_analyzed_rows(tmp_path, monkeypatch, sales_file, transactions):
+    (tmp_path / "data").mkdir()
+    (tmp_path / "output").mkdir()
+    (tmp_path / "data" / "sales_data.txt").write_text(sales_file.read_text(encoding="utf-8"), encoding="utf-8")
+    monkeypatch.chdir(tmp_path)
+
+    # Filter to North with the region/amount prompts
+    answers = iter(["y", "", "North", "0", "100000000"])
+    monkeypatch.setattr(builtins, "input", lambda prompt="": next(answers))
+
+    state_dir = str(tmp_path / "state")
+    main.main(["filter", "analyze", "report"], dedup_state_dir=state_dir)
+
+    deduplicator = TransactionDeduplicator(state_dir=state_dir)
+    try:
+        seen = {t["TransactionID"] for t in transactions if deduplicator.seen(t["TransactionID"])}
+    finally:
+        deduplicator.close(save=False)
+
+    assert seen == {t["TransactionID"] for t in transactions if t["Region"] == "North"}
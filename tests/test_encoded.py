@@ -0,0 +1,70 @@
+"""
+File: test_encoded.py
+Purpose: Dictionary-encoded parsing and backend match the memory backend
+"""
+import pytest
+
+import main
+from conftest import make_lines
+from utils.file_handler import (
+    EncodedTransactions,
+    parse_transactions,
+    parse_transactions_encoded,
+    validate_and_filter
+)
+
+
+def test_encoded_rows_decode_to_parsed_rows(lines, transactions):
+    view = EncodedTransactions(parse_transactions_encoded(lines))
+
+    assert len(view) == len(transactions)
+    assert list(view) == transactions
+    assert view.column("CustomerID") == [t["CustomerID"] for t in transactions]
+
+
+def test_encoded_backend_matches_memory(lines, transactions):
+    view = EncodedTransactions(parse_transactions_encoded(lines))
+
+    memory = main.analyze_sales(transactions, "memory")
+    encoded = main.analyze_sales(view, "encoded")
+
+    assert encoded == memory
+    assert list(encoded["customers"]) == list(memory["customers"])
+
+
+def test_encoded_validation_matches_memory():
+    lines = make_lines(200) + [
+        "X00001|2024-12-01|P101|Laptop|1|45000|C001|North",
+        "T99999|2024-12-01|P101|Laptop|0|45000|C001|North",
+        "T99998|2024-12-01|Q101|Laptop|1|45000|C001|North"
+    ]
+
+    valid, invalid, _ = validate_and_filter(parse_transactions(lines), verbose=False)
+    valid_view, invalid_view, _ = validate_and_filter(
+        EncodedTransactions(parse_transactions_encoded(lines)), verbose=False
+    )
+
+    assert invalid_view == invalid == 3
+    assert list(valid_view) == valid
+
+
+@pytest.mark.parametrize("line", [
+    "T90001|2024-12-01|P101|Laptop|99999999999999999999|45000|C001|North",
+    "T90002|2024-12-01|P101|Laptop|99999999999|99999999999|C001|North",
+    "T90003|2024-12-01|P101|Laptop|1|999999999999999999999|C001|North"
+])
+@pytest.mark.parametrize("backend", ["memory", "encoded", "sqlite"])
+def test_out_of_range_rows_are_rejected_by_every_backend(line, backend):
+    lines = make_lines(50) + [line]
+    rejects = []
+
+    if backend == "encoded":
+        transactions = EncodedTransactions(parse_transactions_encoded(lines, rejects=rejects))
+    else:
+        transactions = parse_transactions(lines, rejects=rejects)
+
+    assert [reject["line"] for reject in rejects] == [line]
+    assert "out of range" in rejects[0]["reason"]
+
+    # The remaining rows analyze without errors
+    main.analyze_sales(transactions, backend)
@@ -0,0 +1,57 @@
+"""
+File: test_filter_expr.py
+Purpose: Filter expression parsing, compiled predicates and index use
+"""
+import pytest
+
+from utils.file_handler import EncodedTransactions, parse_transactions_encoded, validate_and_filter
+from utils.filter_expr import build_index, compile_filter
+from utils.money import amount_paise
+
+
+@pytest.mark.parametrize("expression, predicate", [
+    ("region = North", lambda t: t["Region"] == "North"),
+    ("region in [North, East] and qty >= 5", lambda t: t["Region"] in ("North", "East") and t["Quantity"] >= 5),
+    ("not (product ~ '^USB' or customer = C005)",
+     lambda t: not (t["ProductName"].startswith("USB") or t["CustomerID"] == "C005")),
+    ("amount >= 10000.50 and date >= 2024-12-10", lambda t: amount_paise(t) >= 1000050 and t["Date"] >= "2024-12-10"),
+    ("price = 175.50", lambda t: t["UnitPricePaise"] == 17550),
+    ("REGION NOT IN ['North'] OR Quantity < 2", lambda t: t["Region"] != "North" or t["Quantity"] < 2)
+])
+def test_compiled_predicate_matches_python(transactions, expression, predicate):
+    expected = [t for t in transactions if predicate(t)]
+
+    assert compile_filter(expression).filter(transactions) == expected
+    assert expected
+
+
+def test_indexes_narrow_rows_without_changing_results(transactions):
+    expression = compile_filter("region in [North, South] and customer = C001 and qty > 2")
+    indexes = {field: build_index(transactions, field) for field in ("Region", "CustomerID")}
+
+    assert expression.filter(transactions, indexes) == expression.filter(transactions)
+
+
+@pytest.mark.parametrize("expression", [
+    "region",
+    "region = ",
+    "colour = red",
+    "qty >= many",
+    "amount >= 1e400",
+    "amount >= inf",
+    "(region = North",
+    "product ~ '('"
+])
+def test_invalid_expressions_raise_value_error(expression):
+    with pytest.raises(ValueError):
+        compile_filter(expression)
+
+
+def test_expression_filter_on_encoded_view(lines, transactions):
+    text = "region = East and amount > 5000"
+    view = EncodedTransactions(parse_transactions_encoded(lines))
+
+    expected, _, _ = validate_and_filter(transactions, verbose=False, expression=text)
+    filtered, _, _ = validate_and_filter(view, verbose=False, expression=text)
+
+    assert list(filtered) == expected
@@ -0,0 +1,81 @@
+"""
+File: test_market_basket.py
+Purpose: Pair counting is exact at any max_pairs and matches a brute force
+"""
+import math
+from itertools import combinations
+
+import pytest
+
+from utils.market_basket import build_baskets, frequently_bought_together
+
+
+def _brute_force_counts(transactions, basket_by):
+    baskets, names = build_baskets(transactions, basket_by)
+    counts = {}
+    for basket in baskets:
+        for a, b in combinations(sorted(basket), 2):
+            pair = (names[a], names[b])
+            counts[pair] = counts.get(pair, 0) + 1
+    return counts, len(baskets)
+
+
+@pytest.mark.parametrize("basket_by, min_support", [("customer", 0.05), ("customer_date", 0.0)])
+@pytest.mark.parametrize("max_pairs", [1, 3, 100_000])
+def test_pairs_match_brute_force(transactions, basket_by, min_support, max_pairs):
+    counts, basket_count = _brute_force_counts(transactions, basket_by)
+
+    pairs = frequently_bought_together(transactions, basket_by=basket_by, min_support=min_support,
+                                       min_count=2, top_n=None, max_pairs=max_pairs)
+
+    threshold = max(2, math.ceil(min_support * basket_count))
+    expected = {pair: count for pair, count in counts.items() if count >= threshold}
+
+    assert {pair["products"]: pair["count"] for pair in pairs} == expected
+    assert expected
+
+
+def test_top_pairs_are_sorted_by_count(transactions):
+    pairs = frequently_bought_together(transactions, basket_by="customer", top_n=3)
+
+    assert len(pairs) == 3
+    assert [p["count"] for p in pairs] == sorted((p["count"] for p in pairs), reverse=True)
+
+
+def test_metrics():
+    rows = [
+        {"CustomerID": "C1", "Date": "d", "ProductName": "A"},
+        {"CustomerID": "C1", "Date": "d", "ProductName": "B"},
+        {"CustomerID": "C2", "Date": "d", "ProductName": "A"},
+        {"CustomerID": "C2", "Date": "d", "ProductName": "B"},
+        {"CustomerID": "C3", "Date": "d", "ProductName": "A"},
+        {"CustomerID": "C4", "Date": "d", "ProductName": "C"}
+    ]
+
+    [pair] = frequently_bought_together(rows, min_support=0, min_count=2)
+
+    assert pair["products"] == ("A", "B")
+    assert pair["count"] == 2
+    assert pair["support"] == 0.5
+    assert pair["confidence_a_to_b"] == round(2 / 3, 4)
+    assert pair["confidence_b_to_a"] == 1.0
+    assert pair["lift"] == round(2 * 4 / (3 * 2), 4)
+
+
+def test_unknown_basket_key_is_rejected(transactions):
+    with pytest.raises(ValueError):
+        frequently_bought_together(transactions, basket_by="region")
+
+
+def test_report_lists_the_pairs(tmp_path, transactions):
+    from utils.report_generator import generate_sales_report
+
+    pairs = frequently_bought_together(transactions, basket_by="customer", top_n=2)
+    path = tmp_path / "report.txt"
+
+    generate_sales_report(transactions, [], output_file=str(path), basket_pairs=pairs)
+
+    report = path.read_text(encoding="utf-8")
+    assert "FREQUENTLY BOUGHT TOGETHER" in report
+    first, second = pairs[0]["products"]
+    assert f" - {first} + {second}: {pairs[0]['count']} baskets" in report
@@ -0,0 +1,76 @@
+"""
+File: test_memo.py
+Purpose: Dataset versions and the two-tier result cache
+"""
+import time
+
+import main
+from utils.file_handler import EncodedTransactions, parse_transactions_encoded
+from utils.memo import ResultCache, cached_call, dataset_version
+
+
+def test_version_changes_with_content_and_parameters(transactions):
+    base = dataset_version(transactions)
+
+    assert dataset_version(list(transactions)) == base
+    assert dataset_version(transactions[1:]) != base
+    assert dataset_version(transactions, region="North") != base
+    assert dataset_version(transactions, memory_budget=1024) != dataset_version(transactions, memory_budget=None)
+
+    changed = [dict(t) for t in transactions]
+    changed[0]["UnitPricePaise"] += 1
+    assert dataset_version(changed) != base
+
+
+def test_encoded_version_follows_the_rows(lines):
+    view = EncodedTransactions(parse_transactions_encoded(lines))
+
+    assert dataset_version(view) == dataset_version(EncodedTransactions(parse_transactions_encoded(lines)))
+    assert dataset_version(view[1:]) != dataset_version(view)
+
+
+def test_cache_keys_include_keyword_arguments():
+    cache = ResultCache()
+    calls = []
+
+    def analysis(transactions, n=5):
+        calls.append(n)
+        return n
+
+    assert cached_call(cache, "v1", analysis, [], n=3) == 3
+    assert cached_call(cache, "v1", analysis, [], n=4) == 4
+    assert cached_call(cache, "v1", analysis, [], n=3) == 3
+    assert calls == [3, 4]
+
+
+def test_disk_tier_is_shared_and_bounded(tmp_path):
+    disk_dir = str(tmp_path / "cache")
+    first = ResultCache(disk_dir=disk_dir, max_disk_entries=3, version="code1")
+
+    # Eviction goes by file modification time, so keep the writes apart
+    for i in range(5):
+        first.get_or_compute("v", f"analysis{i}", lambda i=i: i)
+        time.sleep(0.02)
+
+    assert len(list((tmp_path / "cache").glob("*.pkl"))) == 3
+
+    # A new process (cache) reads the newest results back from disk
+    second = ResultCache(disk_dir=disk_dir, version="code1")
+    assert second.get_or_compute("v", "analysis4", lambda: "recomputed") == 4
+    assert second.hits == 1
+
+    # Results of a different code version are never reused
+    third = ResultCache(disk_dir=disk_dir, version="code2")
+    assert third.get_or_compute("v", "analysis4", lambda: "recomputed") == "recomputed"
+
+
+def test_budgeted_and_unbudgeted_runs_do_not_share_results(tmp_path, transactions):
+    disk_dir = str(tmp_path / "cache")
+
+    full = main.analyze_sales(transactions, "memory", None, cache=ResultCache(disk_dir=disk_dir))
+    budgeted = main.analyze_sales(transactions, "memory", 1024, cache=ResultCache(disk_dir=disk_dir))
+    again = main.analyze_sales(transactions, "memory", None, cache=ResultCache(disk_dir=disk_dir))
+
+    assert len(budgeted["customers"]) == main.TOP_CUSTOMERS
+    assert len(full["customers"]) > main.TOP_CUSTOMERS
+    assert again == full
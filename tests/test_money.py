@@ -0,0 +1,62 @@
+"""
+File: test_money.py
+Purpose: Integer-paise parsing, conversion and formatting
+"""
+import pytest
+
+from utils.money import (
+    MAX_PAISE,
+    divide_paise,
+    format_rupees,
+    parse_paise,
+    to_paise
+)
+
+
+@pytest.mark.parametrize("text, paise", [
+    ("1916", 191600),
+    ("45.5", 4550),
+    ("45.05", 4505),
+    ("0.1", 10),
+    ("-12.34", -1234),
+    ("1.005", 101),
+    ("1e3", 100000)
+])
+def test_parse_paise(text, paise):
+    assert parse_paise(text) == paise
+
+
+@pytest.mark.parametrize("text", ["abc", "", "1e30", "1e999999999", "inf", "nan", "1.2.3"])
+def test_parse_paise_rejects_invalid_and_out_of_range(text):
+    with pytest.raises(ValueError):
+        parse_paise(text)
+
+
+def test_to_paise_is_exact_for_floats_and_strings():
+    assert to_paise(0.1) == 10
+    assert to_paise(19.99) == 1999
+    assert to_paise("1,916") == 191600
+    assert to_paise(7) == 700
+
+    with pytest.raises(ValueError):
+        to_paise(float("inf"))
+    with pytest.raises(ValueError):
+        to_paise(MAX_PAISE)
+
+
+def test_sums_are_order_independent():
+    prices = ["0.10", "0.20", "0.30"] * 1000
+    forward = sum(parse_paise(p) for p in prices)
+    backward = sum(parse_paise(p) for p in reversed(prices))
+
+    assert forward == backward == 60000
+
+
+def test_divide_and_format():
+    assert divide_paise(1000, 3) == 333
+    assert divide_paise(1001, 2) == 501
+    assert divide_paise(5, 0) == 0
+
+    assert format_rupees(352780800) == "3,527,808.00"
+    assert format_rupees(4550, 0) == "46"
+    assert format_rupees(-1234) == "-12.34"
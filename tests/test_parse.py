@@ -0,0 +1,69 @@
+"""
+File: test_parse.py
+Purpose: Fault-tolerant parsing: fast path, dirty rows and rejects
+"""
+from utils.file_handler import parse_transactions, read_sales_data, stream_transactions
+
+
+def test_clean_and_dirty_rows_parse_the_same():
+    clean = parse_transactions(["T001|2024-12-01|P101|Mouse Wireless|1200|1916|C001|North"])
+    dirty = parse_transactions(["T001|2024-12-01|P101|Mouse,Wireless|1,200|₹ 1,916|C001|North"])
+
+    assert clean == dirty
+    assert clean[0]["Quantity"] == 1200
+    assert clean[0]["UnitPricePaise"] == 191600
+    assert clean[0]["UnitPrice"] == 1916.0
+
+
+def test_decimal_prices_keep_exact_paise():
+    [txn] = parse_transactions(["T001|2024-12-01|P107|USB Cable|3|175.50|C001|North"])
+
+    assert txn["UnitPricePaise"] == 17550
+    assert txn["UnitPrice"] == 175.5
+
+
+def test_malformed_rows_go_to_rejects():
+    lines = [
+        "T001|2024-12-01|P101|Laptop|2|45000|C001|North",
+        "T002|2024-12-01|P101|Laptop|two|45000|C001|North",
+        "T003|2024-12-01|P101|Laptop|2|C001|North",
+        "T004|2024-12-01|P101|Laptop|2|1e400|C001|North"
+    ]
+    rejects = []
+
+    parsed = parse_transactions(lines, rejects=rejects)
+
+    assert [t["TransactionID"] for t in parsed] == ["T001"]
+    assert [r["line_number"] for r in rejects] == [2, 3, 4]
+    assert "Quantity" in rejects[0]["reason"]
+    assert "expected 8 fields" in rejects[1]["reason"]
+
+
+def test_rejects_report_file_line_numbers(tmp_path):
+    path = tmp_path / "sales.txt"
+    path.write_text(
+        "header\n"
+        "T001|2024-12-01|P101|Laptop|2|45000|C001|North\n"
+        "\n"
+        "T002|2024-12-01|P101|Laptop|x|45000|C001|North\n",
+        encoding="utf-8"
+    )
+    line_numbers = []
+    rejects = []
+
+    parse_transactions(read_sales_data(str(path), line_numbers=line_numbers),
+                       rejects=rejects, line_numbers=line_numbers)
+
+    assert [r["line_number"] for r in rejects] == [4]
+
+
+def test_repeated_text_values_are_interned(transactions):
+    regions = {}
+    for txn in transactions:
+        regions.setdefault(txn["Region"], set()).add(id(txn["Region"]))
+
+    assert all(len(ids) == 1 for ids in regions.values())
+
+
+def test_stream_matches_list_parse(sales_file, transactions):
+    assert list(stream_transactions(str(sales_file))) == transactions
@@ -0,0 +1,101 @@
+"""
+File: test_partial_aggregates.py
+Purpose: Partial-aggregate merge laws, snapshot round trip and accuracy
+"""
+import itertools
+
+import pytest
+
+from utils import data_processor
+from utils.partial_aggregates import (
+    HyperLogLog,
+    build_partial,
+    empty_partial,
+    finalize_partial,
+    load_partial,
+    merge_partials,
+    save_partial
+)
+
+
+def _shards(transactions, count=3):
+    size = len(transactions) // count + 1
+    return [build_partial(transactions[i:i + size]) for i in range(0, len(transactions), size)]
+
+
+def test_merge_is_associative_and_commutative(transactions):
+    a, b, c = _shards(transactions)
+
+    left = merge_partials(merge_partials(a, b), c)
+    right = merge_partials(a, merge_partials(b, c))
+    assert left == right
+
+    results = {
+        repr(sorted(finalize_partial(merge_partials(*order))["customers"].items()))
+        for order in itertools.permutations((a, b, c))
+    }
+    assert len(results) == 1
+
+
+def test_empty_partial_is_identity(transactions):
+    partial = build_partial(transactions)
+
+    assert merge_partials(partial, empty_partial()) == merge_partials(partial)
+
+
+def test_merged_shards_match_single_pass(transactions):
+    merged = finalize_partial(merge_partials(*_shards(transactions)))
+    whole = finalize_partial(build_partial(transactions))
+
+    assert merged == whole
+    assert merged["total_revenue"] == data_processor.calculate_total_revenue(transactions)
+    assert merged["region_sales"] == data_processor.region_wise_sales(transactions)
+    assert merged["product_revenue_paise"] == data_processor.product_revenue_paise(transactions)
+
+
+def test_customer_stats_match_data_processor(transactions):
+    merged = finalize_partial(merge_partials(*_shards(transactions)))["customers"]
+    expected = data_processor.customer_analysis(transactions)
+
+    for customer_id, stats in expected.items():
+        assert merged[customer_id]["total_spent_paise"] == stats["total_spent_paise"]
+        assert merged[customer_id]["purchase_count"] == stats["purchase_count"]
+        assert sorted(merged[customer_id]["products_bought"]) == sorted(stats["products_bought"])
+
+
+def test_snapshot_round_trip(tmp_path, transactions):
+    partial = build_partial(transactions)
+    path = tmp_path / "shard.json"
+
+    save_partial(partial, str(path))
+
+    assert load_partial(str(path)) == partial
+
+
+def test_unsupported_snapshot_version_is_rejected(transactions):
+    partial = build_partial(transactions)
+    partial["version"] = 1
+
+    with pytest.raises(ValueError):
+        merge_partials(partial)
+
+
+@pytest.mark.parametrize("count", [1, 10, 300, 5000, 40000])
+def test_hyperloglog_estimate_is_close(count):
+    sketch = HyperLogLog()
+    for i in range(count):
+        sketch.add(f"C{i:06d}")
+
+    assert abs(len(sketch) - count) <= max(1, 0.05 * count)
+    assert HyperLogLog.from_text(sketch.to_text()) == sketch
+
+
+def test_hyperloglog_merge_equals_union():
+    left, right, both = HyperLogLog(), HyperLogLog(), HyperLogLog()
+    for i in range(3000):
+        (left if i % 2 else right).add(i)
+        both.add(i)
+
+    left.update(right)
+
+    assert left == both
@@ -0,0 +1,62 @@
+"""
+File: test_partitions.py
+Purpose: Partitioned enriched output, manifest pruning and stale cleanup
+"""
+import json
+
+import pytest
+
+from utils.api_handler import PARTITION_MANIFEST, save_enriched_partitions, select_partitions
+
+
+def _rows(transactions):
+    return [dict(t, API_Match=False) for t in transactions]
+
+
+def _partition_files(base_dir):
+    return sorted(p.relative_to(base_dir).as_posix() for p in base_dir.rglob("part-*.txt"))
+
+
+def test_partitions_hold_every_row_once(tmp_path, transactions):
+    base_dir = tmp_path / "parts"
+
+    manifest = save_enriched_partitions(_rows(transactions), str(base_dir))
+
+    assert manifest["total_rows"] == len(transactions)
+    assert _partition_files(base_dir) == sorted(entry["path"] for entry in manifest["partitions"])
+
+    data_rows = sum(len((base_dir / entry["path"]).read_text(encoding="utf-8").splitlines()) - 1
+                    for entry in manifest["partitions"])
+    assert data_rows == len(transactions)
+
+    saved = json.loads((base_dir / PARTITION_MANIFEST).read_text(encoding="utf-8"))
+    assert saved == manifest
+
+
+def test_select_partitions_prunes_by_region_and_date(tmp_path, transactions):
+    base_dir = tmp_path / "parts"
+    save_enriched_partitions(_rows(transactions), str(base_dir), date_granularity="month")
+
+    selected = select_partitions(str(base_dir), region="North", date_from="2024-12-10", date_to="2024-12-12")
+
+    assert len(selected) == 1
+    assert "region=North" in selected[0]
+    assert select_partitions(str(base_dir), date_from="2025-01-01") == []
+
+
+def test_stale_partitions_are_removed(tmp_path, transactions):
+    base_dir = tmp_path / "parts"
+    base_dir.mkdir()
+    (base_dir / "notes.txt").write_text("kept", encoding="utf-8")
+
+    save_enriched_partitions(_rows(transactions), str(base_dir))
+    north = [t for t in transactions if t["Region"] == "North"]
+    manifest = save_enriched_partitions(_rows(north), str(base_dir))
+
+    assert _partition_files(base_dir) == sorted(entry["path"] for entry in manifest["partitions"])
+    assert sorted(p.name for p in base_dir.iterdir()) == [PARTITION_MANIFEST, "notes.txt", "region=North"]
+
+
+def test_unknown_granularity_is_rejected(tmp_path, transactions):
+    with pytest.raises(ValueError):
+        save_enriched_partitions(_rows(transactions), str(tmp_path), date_granularity="week")
@@ -0,0 +1,155 @@
+"""
+File: test_pipeline.py
+Purpose: DAG stage scheduling, skipping, caching, errors and console order
+"""
+import threading
+import time
+
+import pytest
+
+from utils.memo import ResultCache
+from utils.pipeline import Pipeline
+
+
+def test_stages_run_after_their_inputs():
+    pipeline = Pipeline()
+    order = []
+
+    @pipeline.stage(inputs=("total",), outputs=("report",))
+    def report(total):
+        order.append("report")
+        return f"total={total}"
+
+    @pipeline.stage(inputs=("rows",), outputs=("total", "count"))
+    def aggregate(rows):
+        order.append("aggregate")
+        return sum(rows), len(rows)
+
+    values = pipeline.run({"rows": [1, 2, 3]})
+
+    assert order == ["aggregate", "report"]
+    assert values["report"] == "total=6"
+    assert values["count"] == 3
+
+
+def test_invalid_graphs_are_rejected():
+    pipeline = Pipeline()
+    pipeline.add("a", lambda b: b, inputs=("b",), outputs=("a",))
+    pipeline.add("b", lambda a: a, inputs=("a",), outputs=("b",))
+
+    with pytest.raises(ValueError):
+        pipeline.dependencies()
+    with pytest.raises(ValueError):
+        pipeline.add("c", lambda: 1, outputs=("a",))
+    with pytest.raises(ValueError):
+        pipeline.add("d", lambda rows: 1, inputs=("rows",), cache_key="version")
+
+    orphan = Pipeline()
+    orphan.add("e", lambda missing: 1, inputs=("missing",), outputs=("e",))
+    with pytest.raises(ValueError):
+        orphan.run()
+
+
+def test_skipped_stages_leave_outputs_none():
+    pipeline = Pipeline()
+    pipeline.add("fetch", lambda: {"P101": "Laptop"}, outputs=("catalog",))
+    pipeline.add("enrich", lambda catalog: catalog is None, inputs=("catalog",), outputs=("offline",))
+
+    values = pipeline.run(skip=("fetch",))
+
+    assert values["catalog"] is None
+    assert values["offline"] is True
+    assert pipeline.timings["fetch"]["status"] == "skipped"
+
+
+def test_independent_stages_overlap():
+    pipeline = Pipeline(max_workers=2)
+    barrier = threading.Barrier(2, timeout=5)
+
+    # Each stage waits for the other, which only finishes if both run at once
+    pipeline.add("analysis", lambda: barrier.wait() is not None, outputs=("analysis",))
+    pipeline.add("catalog", lambda: barrier.wait() is not None, outputs=("catalog",))
+
+    assert pipeline.run() == {"analysis": True, "catalog": True}
+
+
+def test_cache_key_reuses_outputs_per_version():
+    cache = ResultCache()
+    calls = []
+
+    def build():
+        pipeline = Pipeline(cache=cache)
+        pipeline.add("analyze", lambda rows, version: calls.append(version) or len(rows),
+                     inputs=("rows", "version"), outputs=("count",), cache_key="version")
+        return pipeline
+
+    assert build().run({"rows": [1, 2], "version": "v1"})["count"] == 2
+    second = build()
+    assert second.run({"rows": [1, 2], "version": "v1"})["count"] == 2
+    assert second.timings["analyze"]["status"] == "cached"
+    assert build().run({"rows": [1, 2, 3], "version": "v2"})["count"] == 3
+    assert calls == ["v1", "v2"]
+
+
+def test_first_error_is_raised_after_running_stages_finish():
+    pipeline = Pipeline(max_workers=2)
+    finished = []
+
+    def fail():
+        raise RuntimeError("catalog down")
+
+    def slow():
+        time.sleep(0.05)
+        finished.append("slow")
+        return 1
+
+    pipeline.add("fetch", fail, outputs=("catalog",))
+    pipeline.add("analysis", slow, outputs=("analysis",))
+    pipeline.add("enrich", lambda catalog: finished.append("enrich"), inputs=("catalog",), outputs=("enriched",))
+
+    with pytest.raises(RuntimeError, match="catalog down"):
+        pipeline.run()
+
+    assert finished == ["slow"]
+    assert pipeline.timings["fetch"]["status"] == "failed"
+    assert "enrich" not in pipeline.timings
+
+
+def test_console_output_follows_registration_order(capsys):
+    pipeline = Pipeline(max_workers=2)
+    first_started = threading.Event()
+
+    def first():
+        first_started.set()
+        print("first: start")
+        time.sleep(0.05)
+        print("first: done")
+
+    def second():
+        first_started.wait(5)
+        print("second: start")
+        print("second: done")
+
+    pipeline.add("first", first, title="[1/2] First")
+    pipeline.add("second", second, title="[2/2] Second")
+    pipeline.run()
+
+    assert capsys.readouterr().out.splitlines() == [
+        "[1/2] First", "first: start", "first: done",
+        "[2/2] Second", "second: start", "second: done"
+    ]
+
+
+def test_critical_path_and_summary():
+    pipeline = Pipeline(max_workers=3)
+    pipeline.add("load", lambda: time.sleep(0.02), outputs=("rows",))
+    pipeline.add("fetch", lambda: None, outputs=("catalog",))
+    pipeline.add("analyze", lambda rows: time.sleep(0.03), inputs=("rows",), outputs=("analysis",))
+    pipeline.add("report", lambda analysis, catalog: None, inputs=("analysis", "catalog"))
+    pipeline.run()
+
+    path, total = pipeline.critical_path()
+
+    assert path == ["load", "analyze", "report"]
+    assert total >= 0.05
+    assert "Critical path: load -> analyze -> report" in pipeline.summary()
@@ -0,0 +1,77 @@
+"""
+File: test_spill.py
+Purpose: Spill-to-disk grouping matches in-memory grouping at tiny budgets
+"""
+import pytest
+
+import main
+from utils.data_processor import customer_analysis, customer_analysis_spilling
+from utils.report_generator import generate_sales_report
+from utils.spill import SpillingGroupBy, parse_memory_budget
+
+
+def _sum(a, b):
+    return a + b
+
+
+@pytest.mark.parametrize("max_open_runs", [2, 3, 64])
+def test_spilled_groups_match_in_memory(tmp_path, max_open_runs):
+    pairs = [(f"K{i % 97:03d}", i) for i in range(2000)]
+
+    expected = {}
+    for key, value in pairs:
+        expected[key] = expected.get(key, 0) + value
+
+    groups = SpillingGroupBy(_sum, memory_budget=10, group_bytes=1,
+                             tmp_dir=str(tmp_path), max_open_runs=max_open_runs)
+    for key, value in pairs:
+        groups.add(key, value)
+
+    assert groups.spill_count > max_open_runs
+    assert list(groups.items()) == sorted(expected.items())
+
+    # Run files are cleaned up after the merge
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_customer_analysis_spilling_matches_in_memory(transactions):
+    expected = customer_analysis(transactions)
+    spilled = customer_analysis_spilling(transactions, memory_budget=1024)
+
+    assert spilled == expected
+
+
+def test_top_n_keeps_the_biggest_spenders(transactions):
+    expected = customer_analysis(transactions, include_product_list=False)
+    top = customer_analysis_spilling(transactions, memory_budget=1024, top_n=5,
+                                     include_product_list=False)
+
+    assert len(top) == 5
+    assert sorted(s["total_spent_paise"] for s in top.values()) == \
+        sorted(s["total_spent_paise"] for s in expected.values())[-5:]
+
+
+def test_budgeted_analysis_gives_the_same_report(tmp_path, transactions):
+    from utils.memo import ResultCache
+
+    reports = []
+    for budget in (None, 1024):
+        analysis = main.analyze_sales(transactions, "memory", budget, cache=ResultCache())
+        path = tmp_path / f"report_{budget}.txt"
+        generate_sales_report(transactions, [], output_file=str(path), memory_budget=budget, analysis=analysis)
+        reports.append([line for line in path.read_text(encoding="utf-8").splitlines()
+                        if not line.startswith("Generated:")])
+
+    assert reports[0] == reports[1]
+
+
+@pytest.mark.parametrize("text, size", [
+    ("512", 512 * 1024 ** 2),
+    ("64MB", 64 * 1024 ** 2),
+    ("1500KB", 1500 * 1024),
+    ("2G", 2 * 1024 ** 3),
+    ("", None),
+    (None, None)
+])
+def test_parse_memory_budget(text, size):
+    assert parse_memory_budget(text) == size
@@ -0,0 +1,48 @@
+"""
+File: test_sqlite_store.py
+Purpose: SQLite backend matches the memory backend; database reuse
+"""
+import main
+from utils.sqlite_store import load_transactions_to_sqlite, open_transactions_db
+
+
+def test_sqlite_backend_matches_memory(transactions):
+    memory = main.analyze_sales(transactions, "memory")
+    sqlite = main.analyze_sales(transactions, "sqlite")
+
+    assert sqlite == memory
+    assert list(sqlite["customers"]) == list(memory["customers"])
+    assert list(sqlite["region_sales"]) == list(memory["region_sales"])
+
+
+def test_product_queries_use_product_name_index(transactions):
+    conn = load_transactions_to_sqlite(transactions)
+    try:
+        plan = conn.execute(
+            "EXPLAIN QUERY PLAN SELECT ProductName, SUM(Quantity) FROM transactions GROUP BY ProductName"
+        ).fetchall()
+    finally:
+        conn.close()
+
+    assert any("idx_txn_product" in row[-1] for row in plan)
+
+
+def test_open_transactions_db_reuses_same_version(tmp_path, transactions):
+    db_path = str(tmp_path / "sales.db")
+
+    conn, reused = open_transactions_db(transactions, db_path, "v1")
+    conn.close()
+    assert not reused
+
+    # The rows are not read again when the version matches
+    conn, reused = open_transactions_db([], db_path, "v1")
+    count = conn.execute("SELECT COUNT(*) FROM transactions").fetchone()[0]
+    conn.close()
+    assert reused
+    assert count == len(transactions)
+
+    conn, reused = open_transactions_db(transactions[:10], db_path, "v2")
+    count = conn.execute("SELECT COUNT(*) FROM transactions").fetchone()[0]
+    conn.close()
+    assert not reused
+    assert count == 10
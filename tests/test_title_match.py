@@ -0,0 +1,70 @@
+"""
+File: test_title_match.py
+Purpose: Trigram title matching thresholds, negatives and enrichment fallback
+"""
+import pytest
+
+from utils.api_handler import enrich_sales_data
+from utils.title_match import TitleIndex, normalize_title, trigrams
+
+
+def _index(*titles, **options):
+    return TitleIndex([{"id": i, "title": title} for i, title in enumerate(titles, 1)], **options)
+
+
+def test_normalize_and_trigrams():
+    assert normalize_title("  USB-C   Cable (2m)! ") == "usb c cable 2m"
+    assert trigrams("ab") == {"  a", " ab", "ab "}
+
+
+@pytest.mark.parametrize("titles, name", [
+    (["Laptop"], "Laptop Charger"),
+    (["Laptop"], "Laptop Premium"),
+    (["Mouse Pad"], "Mouse"),
+    (["USB Cable Pro", "USB Cable Plus"], "USB Cable"),
+    (["Wireless Keyboard"], "Office Chair"),
+    (["Laptop"], "   ")
+])
+def test_vague_contained_and_ambiguous_names_are_rejected(titles, name):
+    assert _index(*titles).match(name) is None
+
+
+def test_exact_title_matches_regardless_of_punctuation():
+    product, score = _index("USB Cable", "USB Cable Pro").match("usb-cable")
+
+    assert product["title"] == "USB Cable"
+    assert score == 1.0
+
+
+def test_close_title_matches_with_its_score():
+    product, score = _index("Wireless Mouse Pro", "Laptop Stand").match("Wireless Mouse")
+
+    assert product["title"] == "Wireless Mouse Pro"
+    assert 0.6 <= score < 1.0
+
+
+def test_only_identical_titles_score_one():
+    # "Laptop" is fully contained in "Laptop Stand" but is not the same product
+    assert _index("Laptop Stand").search("Laptop")[0][0] < 1.0
+    assert _index("Laptop Stand").search("laptop  stand") == [(1.0, {"id": 1, "title": "Laptop Stand"})]
+
+
+def test_threshold_is_configurable():
+    assert _index("Wireless Mouse Pro", threshold=0.95).match("Wireless Mouse") is None
+
+
+def test_enrichment_falls_back_to_titles_for_unknown_ids():
+    transactions = [
+        {"ProductID": "P900", "ProductName": "Wireless Mouse"},
+        {"ProductID": "P901", "ProductName": "Mouse"},
+        {"ProductID": "P101", "ProductName": "Anything"}
+    ]
+    index = TitleIndex([{"id": 5, "title": "Wireless Mouse Pro", "category": "accessories",
+                         "brand": "Acme", "rating": 4.1}])
+    mapping = {101: {"category": "laptops", "brand": "Dell", "rating": 4.7}}
+
+    enriched = enrich_sales_data(transactions, mapping, title_index=index)
+
+    assert [t["API_Match"] for t in enriched] == [True, False, True]
+    assert enriched[0]["API_Category"] == "accessories"
+    assert enriched[2]["API_Brand"] == "Dell"
@@ -0,0 +1,249 @@
+"""
+File: anomaly.py
+Purpose: Online anomaly detection on daily revenue per series
+
+A series is the daily revenue of the whole business ("total"), of one
+region ("region:North") or of one product ("product:Laptop"). Each series
+keeps O(1) running state: Welford mean/variance by default, or an
+exponentially weighted mean/variance (EWMA) when `alpha` is given.
+
+Every new daily value is scored against the state *before* it is added,
+and flagged when |z-score| exceeds the threshold. The state can be saved
+to a JSON file so incremental runs continue where the last one stopped
+(days already seen for a series are skipped).
+
+Days without sales are observed as zero revenue: a series is filled from
+the day after its last observed day (or its first sale) through the last
+day of the batch, so a drop to zero can be flagged.
+"""
+import json
+import math
+import os
+from datetime import date as Date, timedelta
+
+from utils.money import amount_paise, paise_to_rupees
+
+
+class RevenueAnomalyDetector:
+    """
+    Streaming z-score detector over many daily revenue series
+
+    Parameters:
+    - z_threshold: |z| above which a value is flagged
+    - min_history: days a series needs before it can be flagged
+    - alpha: EWMA smoothing factor (None = Welford running statistics)
+    """
+
+    def __init__(self, z_threshold=3.0, min_history=5, alpha=None):
+        self.z_threshold = z_threshold
+        self.min_history = min_history
+        self.alpha = alpha
+        self.series = {}
+
+    def _score(self, state, value):
+        """
+        Returns the z-score of value against the current state, or None
+        if there is not enough history or no variance yet
+        """
+
+        if state["count"] < self.min_history:
+            return None
+
+        if self.alpha is None:
+            variance = state["m2"] / (state["count"] - 1)
+        else:
+            variance = state["m2"]
+
+        if variance <= 0:
+            return None
+
+        return (value - state["mean"]) / math.sqrt(variance)
+
+    def _update(self, state, value):
+        """
+        Adds one value to the running state in O(1)
+        """
+
+        state["count"] += 1
+
+        if self.alpha is None:
+            # Welford's online algorithm
+            delta = value - state["mean"]
+            state["mean"] += delta / state["count"]
+            state["m2"] += delta * (value - state["mean"])
+        elif state["count"] == 1:
+            state["mean"] = value
+            state["m2"] = 0.0
+        else:
+            # Exponentially weighted mean and variance
+            delta = value - state["mean"]
+            state["mean"] += self.alpha * delta
+            state["m2"] = (1 - self.alpha) * (state["m2"] + self.alpha * delta * delta)
+
+    def observe(self, series, date, value):
+        """
+        Feeds one daily value of a series
+
+        Returns:
+        anomaly dictionary if the value is flagged, otherwise None
+        (also None for days this series has already seen)
+        """
+
+        state = self.series.get(series)
+        if state is None:
+            state = self.series[series] = {"count": 0, "mean": 0.0, "m2": 0.0, "last_date": None}
+
+        if state["last_date"] is not None and date <= state["last_date"]:
+            return None
+
+        z_score = self._score(state, value)
+        anomaly = None
+
+        if z_score is not None and abs(z_score) > self.z_threshold:
+            std = (value - state["mean"]) / z_score
+            anomaly = {
+                "date": date,
+                "series": series,
+                "revenue": paise_to_rupees(value),
+                "expected": paise_to_rupees(round(state["mean"])),
+                "std": paise_to_rupees(round(std)),
+                "z_score": round(z_score, 2)
+            }
+
+        self._update(state, value)
+        state["last_date"] = date
+        return anomaly
+
+    def save(self, filename):
+        """
+        Persists the per-series state to a JSON file
+        """
+
+        directory = os.path.dirname(filename)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        with open(filename, "w", encoding="utf-8") as file:
+            json.dump(
+                {"z_threshold": self.z_threshold, "min_history": self.min_history,
+                 "alpha": self.alpha, "series": self.series},
+                file
+            )
+
+    @classmethod
+    def load(cls, filename, **defaults):
+        """
+        Restores a detector saved with save(); returns a fresh detector
+        (built from `defaults`) if the file does not exist yet
+        """
+
+        if not os.path.exists(filename):
+            return cls(**defaults)
+
+        with open(filename, "r", encoding="utf-8") as file:
+            saved = json.load(file)
+
+        detector = cls(saved["z_threshold"], saved["min_history"], saved["alpha"])
+        detector.series = saved["series"]
+        return detector
+
+
+def _days_between(first, last):
+    """
+    Returns the ISO dates from `first` through `last` (inclusive)
+    """
+
+    day = Date.fromisoformat(first)
+    end = Date.fromisoformat(last)
+    days = []
+    while day <= end:
+        days.append(day.isoformat())
+        day += timedelta(days=1)
+    return days
+
+
+def daily_revenue_series(transactions, last_dates=None):
+    """
+    Aggregates daily revenue (paise) per series
+
+    Days without sales are filled with zero revenue from the day after the
+    series' entry in `last_dates` ({series: last observed date}, e.g. from
+    the detector state) or from its first sale in the batch, through the
+    batch's last date. Series in `last_dates` with no sales in the batch
+    are filled too. Filling is skipped if a date is not YYYY-MM-DD.
+
+    Returns:
+    list of (date, series, revenue_paise) sorted by date, then series
+    """
+
+    totals = {}
+    first_dates = {}
+
+    for txn in transactions:
+        amount = amount_paise(txn)
+        date = txn["Date"]
+
+        for series in ("total", "region:" + txn["Region"], "product:" + txn["ProductName"]):
+            key = (date, series)
+            totals[key] = totals.get(key, 0) + amount
+            if series not in first_dates or date < first_dates[series]:
+                first_dates[series] = date
+
+    if totals:
+        last_date = max(date for date, _ in totals)
+        starts = dict(first_dates)
+        for series, seen in (last_dates or {}).items():
+            if seen is not None and seen < last_date:
+                starts[series] = seen
+
+        try:
+            missing = []
+            for series, start in starts.items():
+                days = _days_between(start, last_date)
+
+                # A date from the state was already observed
+                if start != first_dates.get(series):
+                    days = days[1:]
+
+                missing.extend((day, series) for day in days if (day, series) not in totals)
+        except ValueError:
+            missing = []
+
+        for key in missing:
+            totals[key] = 0
+
+    return [(date, series, revenue) for (date, series), revenue in sorted(totals.items())]
+
+
+def detect_revenue_anomalies(transactions, state_file=None, z_threshold=3.0,
+                             min_history=5, alpha=None):
+    """
+    Runs the streaming detector over the daily series of a batch
+
+    Parameters:
+    - state_file: optional JSON file with detector state; it is loaded
+      before and saved after the batch (incremental runs)
+
+    Returns:
+    list of anomaly dictionaries in date order
+    """
+
+    settings = {"z_threshold": z_threshold, "min_history": min_history, "alpha": alpha}
+
+    if state_file:
+        detector = RevenueAnomalyDetector.load(state_file, **settings)
+    else:
+        detector = RevenueAnomalyDetector(**settings)
+
+    last_dates = {series: state["last_date"] for series, state in detector.series.items()}
+
+    anomalies = []
+    for date, series, revenue in daily_revenue_series(transactions, last_dates):
+        anomaly = detector.observe(series, date, revenue)
+        if anomaly is not None:
+            anomalies.append(anomaly)
+
+    if state_file:
+        detector.save(state_file)
+
+    return anomalies
@@ -1,62 +1,47 @@
 ## Task 3.1: Fetch Product Details ##
 # a) Fetch Products from DummyJSON API
-# install dependencies: requests (python -m pip install requests)
-import requests  # Used to make HTTP requests to the API
+import glob
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import quote
 
+from utils.catalog import CatalogError, HttpCatalogProvider
 
-def fetch_all_products():
+
+def fetch_all_products(provider=None):
     """
-    Fetches all products from DummyJSON API
+    Fetches all products from a catalog provider
+    (default: the DummyJSON API, see utils/catalog.py)
 
     Returns:
     list of product dictionaries
 
-    If API call fails:
+    If the catalog cannot be read:
     - Returns empty list
     - Prints failure message
     """
 
-    # Base URL for DummyJSON products API
-    url = "https://dummyjson.com/products?limit=100"
+    # Step 1: Default to the DummyJSON API
+    if provider is None:
+        provider = HttpCatalogProvider()
 
     try:
-        # Step 1: Send GET request to the API
-        response = requests.get(url, timeout=10)
-
-        # Step 2: Raise exception for HTTP error codes (4xx, 5xx)
-        response.raise_for_status()
-
-        # Step 3: Convert response to JSON
-        data = response.json()
-
-        # Step 4: Extract products list from response
-        products = data.get("products", [])
-
-        # Step 5: Prepare cleaned product list
-        cleaned_products = []
+        # Step 2: Bulk-load cleaned products from the provider
+        cleaned_products = provider.fetch_all()
 
-        for product in products:
-            cleaned_products.append({
-                "id": product.get("id"),
-                "title": product.get("title"),
-                "category": product.get("category"),
-                "brand": product.get("brand"),
-                "price": product.get("price"),
-                "rating": product.get("rating")
-            })
-
-        # Step 6: Print success message
-        print(f"API SUCCESS: Fetched {len(cleaned_products)} products")
+        # Step 3: Print success message
+        print(f"API SUCCESS: Fetched {len(cleaned_products)} products ({provider.name} catalog)")
 
-        # Step 7: Return cleaned product list
+        # Step 4: Return cleaned product list
         return cleaned_products
 
-    except requests.exceptions.RequestException as e:
-        # Handles network errors, timeout errors, HTTP errors
+    except CatalogError as e:
+        # Handles network, HTTP, file and database errors
         print("API FAILURE: Unable to fetch products")
         print("Error:", e)
 
-        # Step 8: Return empty list on failure
+        # Step 5: Return empty list on failure
         return []
 
 
@@ -97,13 +82,32 @@ def create_product_mapping(api_products):
     return product_mapping
 
 ## Task 3.2: Enrich Transactions with Product Info ##
-def enrich_sales_data(transactions, product_mapping):
+def _api_product_id(product_id_raw):
+    """
+    Extracts the numeric part of a ProductID (P101 -> 101), or None
+    """
+
+    if product_id_raw.startswith("P"):
+        try:
+            return int(product_id_raw[1:])
+        except ValueError:
+            return None
+    return None
+
+
+def enrich_sales_data(transactions, product_mapping, provider=None, title_index=None):
     """
     Enriches sales transactions with API product information
 
     Parameters:
     - transactions: list of transaction dictionaries
     - product_mapping: dictionary from create_product_mapping()
+    - provider: optional catalog provider; product IDs missing from
+      product_mapping are looked up through it (batched, deduplicated
+      and cached) before enriching
+    - title_index: optional TitleIndex (utils/title_match.py); products
+      still unmatched by ID are matched by ProductName, once per distinct
+      name
 
     Returns:
     - list of enriched transaction dictionaries
@@ -111,26 +115,61 @@ def enrich_sales_data(transactions, product_mapping):
 
     enriched_transactions = []
 
+    # Step 1: Convert each distinct ProductID once
+    api_ids = {}
+    for txn in transactions:
+        product_id_raw = txn.get("ProductID", "")
+        if product_id_raw not in api_ids:
+            api_ids[product_id_raw] = _api_product_id(product_id_raw)
+
+    # Step 2: Look up IDs the bulk load missed
+    if provider is not None:
+        missed = [
+            api_id for api_id in api_ids.values()
+            if api_id is not None and api_id not in product_mapping
+        ]
+
+        if missed:
+            try:
+                found = provider.lookup(missed)
+            except CatalogError as e:
+                print("API WARNING: Lookup of missing products failed:", e)
+                found = {}
+
+            if found:
+                product_mapping = {**product_mapping, **create_product_mapping(found.values())}
+                print(f"API LOOKUP: Found {len(found)} of {len(missed)} missing products")
+
+    # Step 3: Fuzzy title fallback for products still unmatched by ID
+    title_matches = {}
+    if title_index is not None:
+        for txn in transactions:
+            name = txn.get("ProductName", "")
+            if name in title_matches or api_ids[txn.get("ProductID", "")] in product_mapping:
+                continue
+
+            match = title_index.match(name)
+            title_matches[name] = match[0] if match else None
+
+        matched_names = sum(1 for match in title_matches.values() if match is not None)
+        if title_matches:
+            print(f"TITLE MATCH: Matched {matched_names} of {len(title_matches)} product names")
+
     # Loop through each transaction
     for txn in transactions:
 
         # Create a copy to avoid modifying original data
         enriched_txn = txn.copy()
 
-        # Extract numeric part of ProductID (P101 -> 101)
-        product_id_raw = txn.get("ProductID", "")
-        api_product_id = None
-
-        if product_id_raw.startswith("P"):
-            try:
-                api_product_id = int(product_id_raw[1:])
-            except ValueError:
-                api_product_id = None
+        # Numeric part of ProductID (P101 -> 101)
+        api_product_id = api_ids[txn.get("ProductID", "")]
 
-        # Check if product exists in API mapping
-        if api_product_id in product_mapping:
-            api_info = product_mapping[api_product_id]
+        # Check if product exists in API mapping (by ID, then by title)
+        api_info = product_mapping.get(api_product_id)
+        if api_info is None:
+            api_info = title_matches.get(txn.get("ProductName", ""))
 
+        if api_info is not None:
             enriched_txn["API_Category"] = api_info.get("category")
             enriched_txn["API_Brand"] = api_info.get("brand")
             enriched_txn["API_Rating"] = api_info.get("rating")
@@ -147,6 +186,35 @@ def enrich_sales_data(transactions, product_mapping):
 
     return enriched_transactions
 
+# Columns of the enriched output files (original + API fields)
+ENRICHED_HEADERS = [
+    "TransactionID",
+    "Date",
+    "ProductID",
+    "ProductName",
+    "Quantity",
+    "UnitPrice",
+    "CustomerID",
+    "Region",
+    "API_Category",
+    "API_Brand",
+    "API_Rating",
+    "API_Match"
+]
+
+
+def _format_enriched_row(txn):
+    """
+    Formats one enriched transaction as a pipe-delimited line
+    """
+
+    row = [
+        str(txn.get(col, "")) if txn.get(col) is not None else ""
+        for col in ENRICHED_HEADERS
+    ]
+    return "|".join(row) + "\n"
+
+
 #Saving enriched data to a file
 def save_enriched_data(enriched_transactions, filename="data/enriched_sales_data.txt"):
     """
@@ -157,34 +225,164 @@ def save_enriched_data(enriched_transactions, filename="data/enriched_sales_data
     - filename: output file path
     """
 
-    # Define header columns (original + API fields)
-    headers = [
-        "TransactionID",
-        "Date",
-        "ProductID",
-        "ProductName",
-        "Quantity",
-        "UnitPrice",
-        "CustomerID",
-        "Region",
-        "API_Category",
-        "API_Brand",
-        "API_Rating",
-        "API_Match"
-    ]
-
     # Open file for writing
     with open(filename, "w", encoding="utf-8") as file:
 
         # Write header row
-        file.write("|".join(headers) + "\n")
+        file.write("|".join(ENRICHED_HEADERS) + "\n")
 
         # Write each enriched transaction
         for txn in enriched_transactions:
-            row = [
-                str(txn.get(col, "")) if txn.get(col) is not None else ""
-                for col in headers
-            ]
-            file.write("|".join(row) + "\n")
+            file.write(_format_enriched_row(txn))
 
     print(f"Enriched data saved successfully to {filename}")
+
+
+## Partitioned output ##
+PARTITION_MANIFEST = "_manifest.json"
+
+
+def _partition_value(value):
+    """
+    Makes a column value safe to use inside a directory name
+    """
+
+    return quote(str(value), safe="") or "__empty__"
+
+
+def _write_partition(path, rows):
+    """
+    Writes one partition file (header + rows); runs in a worker thread
+
+    Returns:
+    number of rows written
+    """
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    with open(path, "w", encoding="utf-8") as file:
+        file.write("|".join(ENRICHED_HEADERS) + "\n")
+        file.writelines(_format_enriched_row(txn) for txn in rows)
+
+    return len(rows)
+
+
+def _remove_stale_partitions(base_dir, current_paths):
+    """
+    Deletes region=*/date=*/part-*.txt files not listed in current_paths
+    (manifest-style relative paths) and the partition directories this
+    leaves empty
+    """
+
+    root = glob.escape(base_dir)
+
+    for path in glob.glob(os.path.join(root, "region=*", "date=*", "part-*.txt")):
+        relative_path = os.path.relpath(path, base_dir).replace(os.sep, "/")
+        if relative_path not in current_paths:
+            os.remove(path)
+
+    # Deepest directories first, so emptied region dirs go too
+    for directory in sorted(glob.glob(os.path.join(root, "region=*", "date=*")) +
+                            glob.glob(os.path.join(root, "region=*")), reverse=True):
+        if os.path.isdir(directory) and not os.listdir(directory):
+            os.rmdir(directory)
+
+
+def save_enriched_partitions(enriched_transactions, base_dir="data/enriched_partitions",
+                             date_granularity="day", max_workers=4):
+    """
+    Saves enriched transactions as region=<R>/date=<D>/part-0000.txt
+    partitions, written concurrently from a thread pool
+
+    Parameters:
+    - date_granularity: "day" (YYYY-MM-DD) or "month" (YYYY-MM) partitions
+    - max_workers: number of writer threads
+
+    A manifest (_manifest.json) lists every partition with its row count
+    and min/max dates so readers can skip irrelevant partitions.
+    Partition files left by earlier runs that are not in the new
+    manifest are deleted afterwards (other files in base_dir are kept).
+
+    Returns:
+    manifest dictionary
+    """
+
+    if date_granularity not in ("day", "month"):
+        raise ValueError(f"date_granularity must be 'day' or 'month', got {date_granularity!r}")
+
+    key_length = 10 if date_granularity == "day" else 7
+
+    # Step 1: Group rows by (region, date partition)
+    partitions = {}
+    for txn in enriched_transactions:
+        key = (txn.get("Region", ""), str(txn.get("Date", ""))[:key_length])
+        partitions.setdefault(key, []).append(txn)
+
+    # Step 2: Write all partitions concurrently
+    entries = []
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {}
+        for (region, date_key), rows in sorted(partitions.items()):
+            relative_path = os.path.join(
+                f"region={_partition_value(region)}",
+                f"date={_partition_value(date_key)}",
+                "part-0000.txt"
+            )
+            future = executor.submit(_write_partition, os.path.join(base_dir, relative_path), rows)
+            futures[future] = (region, date_key, relative_path, rows)
+
+        for future, (region, date_key, relative_path, rows) in futures.items():
+            dates = [txn["Date"] for txn in rows]
+            entries.append({
+                "path": relative_path.replace(os.sep, "/"),
+                "region": region,
+                "date": date_key,
+                "rows": future.result(),
+                "min_date": min(dates),
+                "max_date": max(dates)
+            })
+
+    # Step 3: Write the manifest last, so it only lists complete partitions
+    manifest = {
+        "headers": ENRICHED_HEADERS,
+        "date_granularity": date_granularity,
+        "total_rows": sum(entry["rows"] for entry in entries),
+        "partitions": entries
+    }
+
+    manifest_path = os.path.join(base_dir, PARTITION_MANIFEST)
+    with open(manifest_path + ".tmp", "w", encoding="utf-8") as file:
+        json.dump(manifest, file, indent=2)
+    os.replace(manifest_path + ".tmp", manifest_path)
+
+    # Step 4: Remove stale partitions of earlier runs
+    _remove_stale_partitions(base_dir, {entry["path"] for entry in entries})
+
+    print(f"Enriched data saved to {len(entries)} partitions under {base_dir}")
+
+    return manifest
+
+
+def select_partitions(base_dir, region=None, date_from=None, date_to=None):
+    """
+    Uses the manifest to pick only the partitions a reader needs
+
+    Returns:
+    list of partition file paths whose region matches and whose
+    [min_date, max_date] overlaps [date_from, date_to]
+    """
+
+    with open(os.path.join(base_dir, PARTITION_MANIFEST), "r", encoding="utf-8") as file:
+        manifest = json.load(file)
+
+    selected = []
+    for entry in manifest["partitions"]:
+        if region is not None and entry["region"] != region:
+            continue
+        if date_from and entry["max_date"] < date_from:
+            continue
+        if date_to and entry["min_date"] > date_to:
+            continue
+        selected.append(os.path.join(base_dir, entry["path"]))
+
+    return selected
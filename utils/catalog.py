@@ -0,0 +1,300 @@
+"""
+File: catalog.py
+Purpose: Product-catalog providers used for enrichment
+
+A provider supplies product records from one source:
+- HttpCatalogProvider: the DummyJSON REST API (default)
+- JsonFileCatalogProvider: a local JSON file (offline stand-in for CI
+  and benchmarks)
+- SqliteCatalogProvider: a products table in a SQLite database
+
+Every provider offers a bulk load (fetch_all) and a lookup of specific
+IDs (lookup). lookup() removes duplicate IDs, skips IDs that are already
+cached and fetches the rest in batches on a thread pool. Found products
+and confirmed misses are both cached on the provider.
+
+Product records are always cleaned to:
+{"id", "title", "category", "brand", "price", "rating"}
+"""
+import json
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+
+
+PRODUCT_FIELDS = ("id", "title", "category", "brand", "price", "rating")
+
+DUMMYJSON_URL = "https://dummyjson.com"
+
+
+class CatalogError(Exception):
+    """
+    Raised when a provider cannot reach or read its catalog
+    """
+
+
+def clean_product(product):
+    """
+    Keeps only the product fields used by enrichment
+    """
+
+    return {field: product.get(field) for field in PRODUCT_FIELDS}
+
+
+class CatalogProvider(ABC):
+    """
+    Abstract base class for catalog providers
+
+    Subclasses must implement fetch_all() and fetch_batch(ids); the base
+    cannot be instantiated on its own.
+
+    Parameters:
+    - batch_size: IDs per lookup batch
+    - max_workers: concurrent lookup batches
+    """
+
+    name = "catalog"
+
+    def __init__(self, batch_size=20, max_workers=4):
+        self.batch_size = batch_size
+        self.max_workers = max_workers
+        self.cache = {}
+        self.lock = threading.Lock()
+
+    @abstractmethod
+    def fetch_all(self):
+        """
+        Returns the bulk product list (cleaned product dictionaries)
+        """
+
+    @abstractmethod
+    def fetch_batch(self, ids):
+        """
+        Returns {id: product} for the IDs of one batch that exist
+        """
+
+    def _fetch_batch_cached(self, ids):
+        found = self.fetch_batch(ids)
+
+        with self.lock:
+            for product_id in ids:
+                # None marks a confirmed miss, so it is not asked for again
+                self.cache[product_id] = found.get(product_id)
+
+        return found
+
+    def lookup(self, ids):
+        """
+        Looks up product IDs, fetching only the ones not cached yet
+
+        Returns:
+        dictionary {id: product} for the IDs that exist
+
+        Raises:
+        CatalogError if any batch fails (batches that succeeded are
+        cached anyway)
+        """
+
+        wanted = list(dict.fromkeys(product_id for product_id in ids if product_id is not None))
+
+        with self.lock:
+            missing = [product_id for product_id in wanted if product_id not in self.cache]
+
+        batches = [missing[i:i + self.batch_size] for i in range(0, len(missing), self.batch_size)]
+
+        if len(batches) == 1:
+            self._fetch_batch_cached(batches[0])
+        elif batches:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                # list() re-raises the first failed batch
+                list(executor.map(self._fetch_batch_cached, batches))
+
+        with self.lock:
+            return {
+                product_id: self.cache[product_id]
+                for product_id in wanted
+                if self.cache.get(product_id) is not None
+            }
+
+
+class HttpCatalogProvider(CatalogProvider):
+    """
+    DummyJSON-style REST catalog
+
+    Bulk load: GET {base_url}/products?limit=N
+    Lookup: GET {base_url}/products/{id} (one request per ID, batches
+    run concurrently; 404 means the product does not exist)
+    """
+
+    name = "http"
+
+    def __init__(self, base_url=DUMMYJSON_URL, limit=100, timeout=10, batch_size=10, max_workers=8):
+        super().__init__(batch_size, max_workers)
+        self.base_url = base_url.rstrip("/")
+        self.limit = limit
+        self.timeout = timeout
+
+    def fetch_all(self):
+        # Imported on first use: requests is slow to import and only the
+        # HTTP provider needs it
+        # install dependencies: requests (python -m pip install requests)
+        import requests
+
+        try:
+            response = requests.get(f"{self.base_url}/products?limit={self.limit}", timeout=self.timeout)
+            response.raise_for_status()
+            products = response.json().get("products", [])
+        except (requests.exceptions.RequestException, ValueError) as error:
+            raise CatalogError(error) from error
+
+        return [clean_product(product) for product in products]
+
+    def fetch_batch(self, ids):
+        import requests
+
+        found = {}
+
+        with requests.Session() as session:
+            for product_id in ids:
+                try:
+                    response = session.get(f"{self.base_url}/products/{product_id}", timeout=self.timeout)
+                    if response.status_code == 404:
+                        continue
+                    response.raise_for_status()
+                    found[product_id] = clean_product(response.json())
+                except (requests.exceptions.RequestException, ValueError) as error:
+                    raise CatalogError(error) from error
+
+        return found
+
+
+class JsonFileCatalogProvider(CatalogProvider):
+    """
+    Catalog stored in a local JSON file, either a list of products or
+    {"products": [...]} as returned by DummyJSON
+
+    Parameters:
+    - bulk_limit: only the first N products are returned by fetch_all(),
+      like a paged API; the rest are reachable through lookup()
+    """
+
+    name = "json"
+
+    def __init__(self, path, bulk_limit=None, batch_size=100, max_workers=2):
+        super().__init__(batch_size, max_workers)
+        self.path = path
+        self.bulk_limit = bulk_limit
+        self.products = None
+
+    def _load(self):
+        if self.products is None:
+            try:
+                with open(self.path, "r", encoding="utf-8") as file:
+                    data = json.load(file)
+            except (OSError, ValueError) as error:
+                raise CatalogError(f"Cannot read catalog {self.path}: {error}") from error
+
+            if isinstance(data, dict):
+                data = data.get("products", [])
+
+            self.products = {product.get("id"): clean_product(product) for product in data}
+
+        return self.products
+
+    def fetch_all(self):
+        products = list(self._load().values())
+        return products if self.bulk_limit is None else products[:self.bulk_limit]
+
+    def fetch_batch(self, ids):
+        products = self._load()
+        return {product_id: products[product_id] for product_id in ids if product_id in products}
+
+
+class SqliteCatalogProvider(CatalogProvider):
+    """
+    Catalog stored in a SQLite table with the PRODUCT_FIELDS columns
+    (see write_catalog_sqlite)
+
+    Lookups use one "WHERE id IN (...)" query per batch.
+    """
+
+    name = "sqlite"
+
+    def __init__(self, db_path, table="products", bulk_limit=None, batch_size=500, max_workers=2):
+        super().__init__(batch_size, max_workers)
+        self.db_path = db_path
+        self.table = table
+        self.bulk_limit = bulk_limit
+
+    def _query(self, sql, params=()):
+        # One connection per call: lookups run on worker threads
+        try:
+            conn = sqlite3.connect(self.db_path)
+            try:
+                rows = conn.execute(sql, params).fetchall()
+            finally:
+                conn.close()
+        except sqlite3.Error as error:
+            raise CatalogError(f"Cannot read catalog {self.db_path}: {error}") from error
+
+        return [dict(zip(PRODUCT_FIELDS, row)) for row in rows]
+
+    def fetch_all(self):
+        sql = f"SELECT {', '.join(PRODUCT_FIELDS)} FROM {self.table} ORDER BY rowid"
+        if self.bulk_limit is not None:
+            sql += f" LIMIT {int(self.bulk_limit)}"
+        return self._query(sql)
+
+    def fetch_batch(self, ids):
+        placeholders = ", ".join("?" for _ in ids)
+        rows = self._query(
+            f"SELECT {', '.join(PRODUCT_FIELDS)} FROM {self.table} WHERE id IN ({placeholders})",
+            list(ids)
+        )
+        return {row["id"]: row for row in rows}
+
+
+def write_catalog_sqlite(products, db_path, table="products"):
+    """
+    Writes product dictionaries into a SQLite catalog table (replacing it)
+    """
+
+    conn = sqlite3.connect(db_path)
+    try:
+        with conn:
+            conn.execute(f"DROP TABLE IF EXISTS {table}")
+            conn.execute(
+                f"CREATE TABLE {table} (id INTEGER PRIMARY KEY, title TEXT, category TEXT, "
+                f"brand TEXT, price REAL, rating REAL)"
+            )
+            conn.executemany(
+                f"INSERT INTO {table} VALUES (?, ?, ?, ?, ?, ?)",
+                [tuple(product.get(field) for field in PRODUCT_FIELDS) for product in products]
+            )
+    finally:
+        conn.close()
+
+
+def catalog_provider_from_spec(spec=None):
+    """
+    Builds a provider from a short spec (e.g. the SALES_CATALOG variable):
+    - None, "" or "http": DummyJSON
+    - "http://..." / "https://...": DummyJSON-compatible API at that URL
+    - "*.json": JsonFileCatalogProvider
+    - "*.db", "*.sqlite", "*.sqlite3": SqliteCatalogProvider
+    """
+
+    if not spec or spec == "http":
+        return HttpCatalogProvider()
+
+    if spec.startswith(("http://", "https://")):
+        return HttpCatalogProvider(base_url=spec)
+
+    if spec.endswith(".json"):
+        return JsonFileCatalogProvider(spec)
+
+    if spec.endswith((".db", ".sqlite", ".sqlite3")):
+        return SqliteCatalogProvider(spec)
+
+    raise ValueError(f"Unknown catalog spec {spec!r} (use http, a URL, a .json file or a SQLite file)")
@@ -0,0 +1,174 @@
+"""
+File: customer_analytics.py
+Purpose: RFM (recency / frequency / monetary) scoring and first-purchase
+         month cohort retention
+
+Both analyses group transactions with a single sort on (CustomerID, Date)
+followed by one linear pass, instead of nested per-customer loops.
+"""
+from bisect import bisect_left
+from datetime import date, timedelta
+from itertools import groupby
+from operator import itemgetter
+
+from utils.money import amount_paise, paise_to_rupees
+
+
+def _customer_histories(transactions):
+    """
+    Sorts (CustomerID, Date, amount_paise) rows once and groups them
+
+    Yields:
+    (customer_id, list of (date_string, amount_paise) in date order)
+    """
+
+    rows = sorted(
+        ((t["CustomerID"], t["Date"], amount_paise(t)) for t in transactions),
+        key=itemgetter(0, 1)
+    )
+
+    for customer_id, group in groupby(rows, key=itemgetter(0)):
+        yield customer_id, [(row[1], row[2]) for row in group]
+
+
+def _quantile_scores(values, bins):
+    """
+    Scores each value 1..bins by its quantile (higher value = higher score)
+
+    Equal values always get the same score.
+    """
+
+    ordered = sorted(values)
+    count = len(ordered)
+
+    return [bisect_left(ordered, value) * bins // count + 1 for value in values]
+
+
+## RFM ##
+def rfm_analysis(transactions, as_of=None, bins=5):
+    """
+    Computes recency / frequency / monetary metrics and quantile scores
+
+    Parameters:
+    - as_of: reference date (YYYY-MM-DD); defaults to the day after the
+      latest transaction
+    - bins: number of quantile bins (5 gives scores 1-5)
+
+    Returns:
+    dictionary {CustomerID: {
+        "recency_days", "frequency", "monetary",
+        "first_purchase", "last_purchase",
+        "r_score", "f_score", "m_score", "rfm_score"
+    }} sorted by rfm_score (best first)
+    """
+
+    histories = list(_customer_histories(transactions))
+    if not histories:
+        return {}
+
+    # Parse each distinct date string once
+    parsed_dates = {}
+
+    def to_date(text):
+        value = parsed_dates.get(text)
+        if value is None:
+            value = parsed_dates[text] = date.fromisoformat(text)
+        return value
+
+    if as_of is None:
+        reference = max(to_date(history[-1][0]) for _, history in histories) + timedelta(days=1)
+    else:
+        reference = to_date(as_of)
+
+    customer_ids = []
+    recency = []
+    frequency = []
+    monetary = []
+
+    for customer_id, history in histories:
+        customer_ids.append(customer_id)
+        recency.append((reference - to_date(history[-1][0])).days)
+        frequency.append(len(history))
+        monetary.append(sum(amount for _, amount in history))
+
+    # Recent customers should score high, so bin the negated recency
+    r_scores = _quantile_scores([-days for days in recency], bins)
+    f_scores = _quantile_scores(frequency, bins)
+    m_scores = _quantile_scores(monetary, bins)
+
+    results = {}
+    for i, (customer_id, history) in enumerate(histories):
+        results[customer_id] = {
+            "recency_days": recency[i],
+            "frequency": frequency[i],
+            "monetary": paise_to_rupees(monetary[i]),
+            "first_purchase": history[0][0],
+            "last_purchase": history[-1][0],
+            "r_score": r_scores[i],
+            "f_score": f_scores[i],
+            "m_score": m_scores[i],
+            "rfm_score": f"{r_scores[i]}{f_scores[i]}{m_scores[i]}"
+        }
+
+    # Best customers first (stable, so ties keep CustomerID order)
+    return dict(
+        sorted(
+            results.items(),
+            key=lambda item: (item[1]["r_score"], item[1]["f_score"], item[1]["m_score"]),
+            reverse=True
+        )
+    )
+
+
+## Cohorts ##
+def _month_index(date_text):
+    """
+    Converts "YYYY-MM-DD" into a running month number (year * 12 + month)
+    """
+
+    return int(date_text[:4]) * 12 + int(date_text[5:7]) - 1
+
+
+def cohort_retention(transactions):
+    """
+    Builds a first-purchase-month cohort retention table
+
+    Returns:
+    dictionary sorted by cohort month:
+    {"YYYY-MM": {
+        "customers": cohort size,
+        "active": {months_since_first_purchase: active customers},
+        "retention": {months_since_first_purchase: percentage}
+    }}
+    """
+
+    cohorts = {}
+
+    for _, history in _customer_histories(transactions):
+
+        # History is date-sorted, so the first row is the first purchase
+        first_month = _month_index(history[0][0])
+        cohort_key = history[0][0][:7]
+
+        cohort = cohorts.setdefault(cohort_key, {"customers": 0, "active": {}})
+        cohort["customers"] += 1
+
+        # Each active month counts once per customer
+        active = cohort["active"]
+        for offset in {_month_index(day) - first_month for day, _ in history}:
+            active[offset] = active.get(offset, 0) + 1
+
+    table = {}
+    for cohort_key in sorted(cohorts):
+        cohort = cohorts[cohort_key]
+        active = dict(sorted(cohort["active"].items()))
+        table[cohort_key] = {
+            "customers": cohort["customers"],
+            "active": active,
+            "retention": {
+                offset: round(count / cohort["customers"] * 100, 2)
+                for offset, count in active.items()
+            }
+        }
+
+    return table
@@ -1,4 +1,12 @@
 ## Task 2.1 : sales summary calculator ##
+# All money is accumulated in exact integer paise (see utils/money.py)
+# and converted back to rupees only when the result is returned.
+import heapq
+import operator
+
+from utils.money import amount_paise, divide_paise, paise_to_rupees
+from utils.spill import DEFAULT_MEMORY_BUDGET, SpillingGroupBy
+
 
 #a) Calculate Total Revenue
 def calculate_total_revenue(transactions):
@@ -9,21 +17,21 @@ def calculate_total_revenue(transactions):
     float: total revenue (sum of Quantity * UnitPrice)
     """
 
-    # Step 1: Initialize total revenue to 0
-    total_revenue = 0.0
+    # Step 1: Initialize total revenue (in paise) to 0
+    total_revenue = 0
 
     # Step 2: Loop through each transaction dictionary
     for txn in transactions:
 
         # Step 3: Calculate revenue for one transaction
         # Revenue = Quantity * UnitPrice
-        transaction_revenue = txn["Quantity"] * txn["UnitPrice"]
+        transaction_revenue = amount_paise(txn)
 
         # Step 4: Add transaction revenue to total revenue
         total_revenue += transaction_revenue
 
-    # Step 5: Return final total revenue
-    return total_revenue
+    # Step 5: Return final total revenue in rupees
+    return paise_to_rupees(total_revenue)
 
 #b) Calculate Revenue by Region
 def region_wise_sales(transactions):
@@ -31,18 +39,19 @@ def region_wise_sales(transactions):
     Analyzes sales by region
 
     Returns:
-    dictionary containing region-wise statistics
+    dictionary containing region-wise statistics (total_sales in rupees
+    plus the exact "total_sales_paise")
     """
 
     # Step 1: Dictionary to store region-wise aggregation
     region_stats = {}
 
-    # Step 2: Calculate total sales across all regions
-    total_sales = 0.0
+    # Step 2: Calculate total sales (paise) across all regions
+    total_sales = 0
 
     for txn in transactions:
         # Calculate transaction amount
-        amount = txn["Quantity"] * txn["UnitPrice"]
+        amount = amount_paise(txn)
 
         # Add to overall total sales
         total_sales += amount
@@ -53,7 +62,7 @@ def region_wise_sales(transactions):
         # Step 3: Initialize region entry if not present
         if region not in region_stats:
             region_stats[region] = {
-                "total_sales": 0.0,
+                "total_sales": 0,
                 "transaction_count": 0
             }
 
@@ -62,9 +71,12 @@ def region_wise_sales(transactions):
         region_stats[region]["transaction_count"] += 1
 
     # Step 5: Calculate percentage contribution per region
+    # and convert sales back to rupees
     for region in region_stats:
         percentage = (region_stats[region]["total_sales"] / total_sales) * 100
         region_stats[region]["percentage"] = round(percentage, 2)
+        region_stats[region]["total_sales_paise"] = region_stats[region]["total_sales"]
+        region_stats[region]["total_sales"] = paise_to_rupees(region_stats[region]["total_sales"])
 
     # Step 6: Sort regions by total_sales in descending order
     sorted_region_stats = dict(
@@ -97,16 +109,15 @@ def top_selling_products(transactions, n=5):
         # Extract required fields
         product_name = txn["ProductName"]
         quantity = txn["Quantity"]
-        unit_price = txn["UnitPrice"]
 
-        # Calculate revenue for this transaction
-        revenue = quantity * unit_price
+        # Calculate revenue (paise) for this transaction
+        revenue = amount_paise(txn)
 
         # Step 3: Initialize product entry if not already present
         if product_name not in product_stats:
             product_stats[product_name] = {
                 "total_quantity": 0,
-                "total_revenue": 0.0
+                "total_revenue": 0
             }
 
         # Step 4: Aggregate quantity and revenue
@@ -118,7 +129,7 @@ def top_selling_products(transactions, n=5):
         (
             product,
             stats["total_quantity"],
-            stats["total_revenue"]
+            paise_to_rupees(stats["total_revenue"])
         )
         for product, stats in product_stats.items()
     ]
@@ -129,15 +140,63 @@ def top_selling_products(transactions, n=5):
     # Step 7: Return top n products
     return product_list[:n]
 
+# Exact product revenue (parallel to the rupee floats in the tuples above)
+def product_revenue_paise(transactions):
+    """
+    Totals revenue per product in exact integer paise
+
+    Returns:
+    dictionary {ProductName: revenue in paise}; the report reads product
+    revenue from here instead of converting the rupee floats back
+    """
+
+    revenue = {}
+    for txn in transactions:
+        revenue[txn["ProductName"]] = revenue.get(txn["ProductName"], 0) + amount_paise(txn)
+    return revenue
+
 #d) Customer Purchase Analysis
-def customer_analysis(transactions):
+# Product membership per customer is stored as an integer bitmap:
+# bit i is set when the customer bought the product with code i.
+def popcount(mask):
+    """
+    Counts the set bits of a product bitmap (number of distinct products)
+    """
+
+    return mask.bit_count() if hasattr(mask, "bit_count") else bin(mask).count("1")
+
+
+def decode_product_mask(mask, product_codes):
+    """
+    Converts a product bitmap back into a list of product names
+
+    Parameters:
+    - mask: integer bitmap from customer_analysis()
+    - product_codes: dictionary {product name: bit index}
+    """
+
+    return [name for name, code in product_codes.items() if mask >> code & 1]
+
+
+def customer_analysis(transactions, product_codes=None, include_product_list=True):
     """
     Analyzes customer purchase patterns
 
+    Parameters:
+    - product_codes: optional dictionary {product name: bit index}; it is
+      filled in place so callers can decode or query the bitmaps
+    - include_product_list: also expand each bitmap into "products_bought"
+
     Returns:
-    dictionary of customer statistics sorted by total_spent (descending)
+    dictionary of customer statistics sorted by total_spent (descending),
+    each with "products_mask" (bitmap), "distinct_products" (popcount)
+    and the exact "total_spent_paise"
     """
 
+    # Product name -> bit index dictionary
+    if product_codes is None:
+        product_codes = {}
+
     #Dictionary to store customer-level aggregation
     customer_stats = {}
 
@@ -147,18 +206,22 @@ def customer_analysis(transactions):
         # Extract required fields
         customer_id = txn["CustomerID"]
         product_name = txn["ProductName"]
-        quantity = txn["Quantity"]
-        unit_price = txn["UnitPrice"]
 
-        # Calculate transaction amount
-        transaction_amount = quantity * unit_price
+        # Calculate transaction amount (paise)
+        transaction_amount = amount_paise(txn)
+
+        # Look up (or assign) the product's bit
+        product_code = product_codes.get(product_name)
+        if product_code is None:
+            product_code = len(product_codes)
+            product_codes[product_name] = product_code
 
         #Initialize customer entry if not already present
         if customer_id not in customer_stats:
             customer_stats[customer_id] = {
-                "total_spent": 0.0,
+                "total_spent": 0,
                 "purchase_count": 0,
-                "products_bought": set()   # set ensures uniqueness
+                "products_mask": 0   # bitmap ensures uniqueness
             }
 
         #Update total spent
@@ -167,24 +230,29 @@ def customer_analysis(transactions):
         # Increment purchase count
         customer_stats[customer_id]["purchase_count"] += 1
 
-        # Add product to set (avoids duplicates)
-        customer_stats[customer_id]["products_bought"].add(product_name)
+        # Set the product's bit (avoids duplicates)
+        customer_stats[customer_id]["products_mask"] |= 1 << product_code
 
-    # Calculate average order value and convert set to list
+    # Calculate average order value and distinct product count
     for customer_id in customer_stats:
-        total_spent = customer_stats[customer_id]["total_spent"]
-        purchase_count = customer_stats[customer_id]["purchase_count"]
+        stats = customer_stats[customer_id]
+        total_spent = stats["total_spent"]
+        purchase_count = stats["purchase_count"]
 
-        # Calculate average order value
-        avg_order_value = total_spent / purchase_count
+        # Calculate average order value (exact paise, rounded half up)
+        avg_order_value = divide_paise(total_spent, purchase_count)
 
-        # Store average order value
-        customer_stats[customer_id]["avg_order_value"] = round(avg_order_value, 2)
+        # Store total spent and average order value in rupees
+        stats["total_spent"] = paise_to_rupees(total_spent)
+        stats["total_spent_paise"] = total_spent
+        stats["avg_order_value"] = paise_to_rupees(avg_order_value)
 
-        # Convert products set to list for final output
-        customer_stats[customer_id]["products_bought"] = list(
-            customer_stats[customer_id]["products_bought"]
-        )
+        # Distinct products bought = number of set bits
+        stats["distinct_products"] = popcount(stats["products_mask"])
+
+        # Expand the bitmap into a product list on demand
+        if include_product_list:
+            stats["products_bought"] = decode_product_mask(stats["products_mask"], product_codes)
 
     # Sort customers by total_spent in descending order
     sorted_customer_stats = dict(
@@ -198,6 +266,131 @@ def customer_analysis(transactions):
     # Return sorted customer statistics
     return sorted_customer_stats
 
+
+def product_customer_bitmaps(customer_stats, product_codes):
+    """
+    Inverts per-customer product bitmaps into per-product customer bitmaps
+
+    Returns:
+    tuple (customer_ids, {product name: bitmap over customer positions})
+    """
+
+    customer_ids = list(customer_stats)
+    product_bitmaps = {name: 0 for name in product_codes}
+    names_by_code = {code: name for name, code in product_codes.items()}
+
+    for position, customer_id in enumerate(customer_ids):
+        mask = customer_stats[customer_id]["products_mask"]
+        customer_bit = 1 << position
+
+        # Walk only the set bits of the customer's product bitmap
+        while mask:
+            lowest = mask & -mask
+            product_bitmaps[names_by_code[lowest.bit_length() - 1]] |= customer_bit
+            mask ^= lowest
+
+    return customer_ids, product_bitmaps
+
+
+def customers_who_bought(bitmaps, products, match="all"):
+    """
+    Finds customers who bought all (or any) of the given products
+
+    Parameters:
+    - bitmaps: result of product_customer_bitmaps()
+    - products: list of product names
+    - match: "all" (AND of the bitmaps) or "any" (OR of the bitmaps)
+
+    Returns:
+    list of customer IDs (in customer_analysis() order)
+    """
+
+    customer_ids, product_bitmaps = bitmaps
+
+    if match not in ("all", "any"):
+        raise ValueError(f"match must be 'all' or 'any', got {match!r}")
+
+    if not products:
+        return []
+
+    # Combine whole bitmaps at once instead of testing customers one by one
+    combined = product_bitmaps.get(products[0], 0)
+    for name in products[1:]:
+        if match == "all":
+            combined &= product_bitmaps.get(name, 0)
+        else:
+            combined |= product_bitmaps.get(name, 0)
+
+    result = []
+    while combined:
+        lowest = combined & -combined
+        result.append(customer_ids[lowest.bit_length() - 1])
+        combined ^= lowest
+
+    return result
+
+def _merge_customer_state(a, b):
+    """
+    Combines two [spent_paise, purchase_count, products_mask] states
+    """
+
+    return [a[0] + b[0], a[1] + b[1], a[2] | b[2]]
+
+
+def customer_analysis_spilling(transactions, memory_budget=DEFAULT_MEMORY_BUDGET,
+                               top_n=None, product_codes=None, include_product_list=True):
+    """
+    Memory-budgeted version of customer_analysis()
+
+    Per-customer state is grouped with SpillingGroupBy, so customer counts
+    far beyond RAM spill sorted runs to temporary files and finish with an
+    external merge. `transactions` may be any iterable (e.g. a stream).
+
+    Parameters:
+    - memory_budget: bytes of customer state held in memory
+    - top_n: keep only the n biggest spenders (bounded output size)
+
+    Returns:
+    dictionary shaped like customer_analysis(); ties on total_spent are
+    ordered by CustomerID
+    """
+
+    if product_codes is None:
+        product_codes = {}
+
+    groups = SpillingGroupBy(_merge_customer_state, memory_budget)
+
+    for txn in transactions:
+        product_name = txn["ProductName"]
+        product_code = product_codes.get(product_name)
+        if product_code is None:
+            product_code = len(product_codes)
+            product_codes[product_name] = product_code
+
+        groups.add(txn["CustomerID"], [amount_paise(txn), 1, 1 << product_code])
+
+    def finalized():
+        for customer_id, (total_spent, purchase_count, mask) in groups.items():
+            stats = {
+                "total_spent": paise_to_rupees(total_spent),
+                "total_spent_paise": total_spent,
+                "purchase_count": purchase_count,
+                "products_mask": mask,
+                "avg_order_value": paise_to_rupees(divide_paise(total_spent, purchase_count)),
+                "distinct_products": popcount(mask)
+            }
+            if include_product_list:
+                stats["products_bought"] = decode_product_mask(mask, product_codes)
+            yield customer_id, stats
+
+    # Only the top n customers are kept in memory when top_n is given
+    if top_n is not None:
+        ranked = heapq.nlargest(top_n, finalized(), key=lambda item: item[1]["total_spent"])
+    else:
+        ranked = sorted(finalized(), key=lambda item: item[1]["total_spent"], reverse=True)
+
+    return dict(ranked)
+
 ## Task 2.2. Date-based analysis ##
 # a) Daily Sales Trend
 def daily_sales_trend(transactions):
@@ -206,7 +399,7 @@ def daily_sales_trend(transactions):
 
     Returns:
     dictionary sorted by date containing:
-    - revenue
+    - revenue (rupees) and revenue_paise (exact)
     - transaction_count
     - unique_customers
     """
@@ -220,16 +413,14 @@ def daily_sales_trend(transactions):
         # Extract required fields
         date = txn["Date"]
         customer_id = txn["CustomerID"]
-        quantity = txn["Quantity"]
-        unit_price = txn["UnitPrice"]
 
-        # Calculate transaction revenue
-        revenue = quantity * unit_price
+        # Calculate transaction revenue (paise)
+        revenue = amount_paise(txn)
 
         # Initialize date entry if not present
         if date not in daily_summary:
             daily_summary[date] = {
-                "revenue": 0.0,
+                "revenue": 0,
                 "transaction_count": 0,
                 "unique_customers": set()  # set ensures uniqueness
             }
@@ -243,11 +434,13 @@ def daily_sales_trend(transactions):
         # Track unique customers
         daily_summary[date]["unique_customers"].add(customer_id)
 
-    # Convert customer sets to counts
+    # Convert customer sets to counts and revenue to rupees
     for date in daily_summary:
         daily_summary[date]["unique_customers"] = len(
             daily_summary[date]["unique_customers"]
         )
+        daily_summary[date]["revenue_paise"] = daily_summary[date]["revenue"]
+        daily_summary[date]["revenue"] = paise_to_rupees(daily_summary[date]["revenue"])
 
     # Sort dictionary by date (chronologically)
     daily_summary_sorted = dict(sorted(daily_summary.items()))
@@ -257,16 +450,20 @@ def daily_sales_trend(transactions):
 
 
 # b) find Peak Sales Day
-def find_peak_sales_day(transactions):
+def find_peak_sales_day(transactions, daily_summary=None):
     """
     Identifies the date with highest revenue
 
+    daily_summary: optional precomputed daily_sales_trend() result
+    (e.g. from the result cache) so it is not recomputed
+
     Returns:
     tuple (date, revenue, transaction_count)
     """
 
     # Reuse daily sales trend
-    daily_summary = daily_sales_trend(transactions)
+    if daily_summary is None:
+        daily_summary = daily_sales_trend(transactions)
 
     #Track peak values
     peak_date = None
@@ -304,16 +501,15 @@ def low_performing_products(transactions, threshold=10):
         # Extract required fields
         product_name = txn["ProductName"]
         quantity = txn["Quantity"]
-        unit_price = txn["UnitPrice"]
 
-        # Calculate revenue for this transaction
-        revenue = quantity * unit_price
+        # Calculate revenue (paise) for this transaction
+        revenue = amount_paise(txn)
 
         # Initialize product entry if not already present
         if product_name not in product_summary:
             product_summary[product_name] = {
                 "total_quantity": 0,
-                "total_revenue": 0.0
+                "total_revenue": 0
             }
 
         # Accumulate quantity
@@ -331,7 +527,7 @@ def low_performing_products(transactions, threshold=10):
                 (
                     product_name,
                     stats["total_quantity"],
-                    round(stats["total_revenue"], 2)
+                    paise_to_rupees(stats["total_revenue"])
                 )
             )
 
@@ -340,3 +536,221 @@ def low_performing_products(transactions, threshold=10):
 
     # Return final list
     return low_performance_list
+
+## Dictionary-encoded variants ##
+# These take the table from parse_transactions_encoded() / encode_transactions()
+# and group on small integer codes (list indexes) instead of hashing strings.
+# They return exactly the same structures as the functions above.
+
+def calculate_total_revenue_encoded(encoded):
+    """
+    Calculates total revenue on a dictionary-encoded table
+
+    Returns:
+    float: total revenue (sum of Quantity * UnitPrice)
+    """
+
+    columns = encoded["columns"]
+    return paise_to_rupees(sum(map(operator.mul, columns["Quantity"], columns["UnitPricePaise"])))
+
+
+def _product_totals_encoded(encoded):
+    """
+    Aggregates quantity and revenue (paise) per ProductName code
+
+    Returns:
+    list of (ProductName, TotalQuantity, TotalRevenue in paise) in
+    first-seen product order
+    """
+
+    columns = encoded["columns"]
+    product_names = encoded["lookups"]["ProductName"]
+
+    quantities = [0] * len(product_names)
+    revenue = [0] * len(product_names)
+    counts = [0] * len(product_names)
+
+    for code, quantity, unit_price in zip(
+        columns["ProductName"], columns["Quantity"], columns["UnitPricePaise"]
+    ):
+        quantities[code] += quantity
+        revenue[code] += quantity * unit_price
+        counts[code] += 1
+
+    return [
+        (product, quantities[code], revenue[code])
+        for code, product in enumerate(product_names)
+        if counts[code]
+    ]
+
+
+def product_revenue_paise_encoded(encoded):
+    """
+    product_revenue_paise() on a dictionary-encoded table
+    """
+
+    return {product: revenue for product, _, revenue in _product_totals_encoded(encoded)}
+
+
+def top_selling_products_encoded(encoded, n=5):
+    """
+    Finds top n products by total quantity sold on a dictionary-encoded table
+
+    Returns:
+    list of tuples (ProductName, TotalQuantity, TotalRevenue)
+    """
+
+    product_list = _product_totals_encoded(encoded)
+    product_list.sort(key=lambda x: x[1], reverse=True)
+    return [(product, quantity, paise_to_rupees(revenue)) for product, quantity, revenue in product_list[:n]]
+
+
+def low_performing_products_encoded(encoded, threshold=10):
+    """
+    Identifies products with low sales performance on a dictionary-encoded table
+
+    Returns:
+    list of tuples (ProductName, TotalQuantity, TotalRevenue)
+    """
+
+    low_performance_list = [
+        (product, quantity, paise_to_rupees(revenue))
+        for product, quantity, revenue in _product_totals_encoded(encoded)
+        if quantity < threshold
+    ]
+    low_performance_list.sort(key=lambda x: x[1])
+    return low_performance_list
+
+
+def region_wise_sales_encoded(encoded):
+    """
+    Analyzes sales by region on a dictionary-encoded table
+
+    Returns:
+    dictionary containing region-wise statistics
+    """
+
+    columns = encoded["columns"]
+    region_names = encoded["lookups"]["Region"]
+
+    # One slot per region code
+    sales = [0] * len(region_names)
+    counts = [0] * len(region_names)
+
+    for code, quantity, unit_price in zip(
+        columns["Region"], columns["Quantity"], columns["UnitPricePaise"]
+    ):
+        sales[code] += quantity * unit_price
+        counts[code] += 1
+
+    total_sales = sum(sales)
+
+    region_stats = {}
+    for code, region in enumerate(region_names):
+        if counts[code] == 0:
+            continue
+        region_stats[region] = {
+            "total_sales": paise_to_rupees(sales[code]),
+            "total_sales_paise": sales[code],
+            "transaction_count": counts[code],
+            "percentage": round((sales[code] / total_sales) * 100, 2)
+        }
+
+    # Sort regions by total_sales in descending order
+    return dict(
+        sorted(
+            region_stats.items(),
+            key=lambda item: item[1]["total_sales"],
+            reverse=True
+        )
+    )
+
+
+def customer_analysis_encoded(encoded, include_product_list=True):
+    """
+    Analyzes customer purchase patterns on a dictionary-encoded table
+
+    The ProductName codes are used directly as bitmap bit indexes.
+
+    Returns:
+    dictionary of customer statistics sorted by total_spent (descending)
+    """
+
+    columns = encoded["columns"]
+    customer_ids = encoded["lookups"]["CustomerID"]
+    product_codes = {name: code for code, name in enumerate(encoded["lookups"]["ProductName"])}
+
+    spent = [0] * len(customer_ids)
+    counts = [0] * len(customer_ids)
+    masks = [0] * len(customer_ids)
+
+    for code, product_code, quantity, unit_price in zip(
+        columns["CustomerID"], columns["ProductName"],
+        columns["Quantity"], columns["UnitPricePaise"]
+    ):
+        spent[code] += quantity * unit_price
+        counts[code] += 1
+        masks[code] |= 1 << product_code
+
+    customer_stats = {}
+    for code, customer_id in enumerate(customer_ids):
+        if counts[code] == 0:
+            continue
+        customer_stats[customer_id] = {
+            "total_spent": paise_to_rupees(spent[code]),
+            "total_spent_paise": spent[code],
+            "purchase_count": counts[code],
+            "products_mask": masks[code],
+            "avg_order_value": paise_to_rupees(divide_paise(spent[code], counts[code])),
+            "distinct_products": popcount(masks[code])
+        }
+        if include_product_list:
+            customer_stats[customer_id]["products_bought"] = decode_product_mask(masks[code], product_codes)
+
+    # Sort customers by total_spent in descending order
+    return dict(
+        sorted(
+            customer_stats.items(),
+            key=lambda item: item[1]["total_spent"],
+            reverse=True
+        )
+    )
+
+
+def daily_sales_trend_encoded(encoded):
+    """
+    Analyzes sales trends by date on a dictionary-encoded table
+
+    Returns:
+    dictionary sorted by date containing revenue, transaction_count
+    and unique_customers
+    """
+
+    columns = encoded["columns"]
+    dates = encoded["lookups"]["Date"]
+
+    revenue = [0] * len(dates)
+    counts = [0] * len(dates)
+    customers = [set() for _ in dates]
+
+    for code, customer_code, quantity, unit_price in zip(
+        columns["Date"], columns["CustomerID"],
+        columns["Quantity"], columns["UnitPricePaise"]
+    ):
+        revenue[code] += quantity * unit_price
+        counts[code] += 1
+        customers[code].add(customer_code)
+
+    daily_summary = {}
+    for code, date in enumerate(dates):
+        if counts[code] == 0:
+            continue
+        daily_summary[date] = {
+            "revenue": paise_to_rupees(revenue[code]),
+            "revenue_paise": revenue[code],
+            "transaction_count": counts[code],
+            "unique_customers": len(customers[code])
+        }
+
+    # Sort dictionary by date (chronologically)
+    return dict(sorted(daily_summary.items()))
@@ -0,0 +1,291 @@
+"""
+File: dedup.py
+Purpose: Streaming duplicate-transaction detection during ingestion
+
+Every TransactionID is first checked against a Bloom filter (about 10 bits
+per transaction at a 1% false-positive rate). Only IDs the filter reports
+as "probably seen" are verified exactly against a SQLite table of seen
+IDs, so the in-memory cost stays a few bytes per transaction.
+
+With a state directory, the Bloom filter and the exact table are kept on
+disk so replayed batches are also caught across incremental runs.
+"""
+import hashlib
+import math
+import os
+import sqlite3
+
+from utils.file_handler import EncodedTransactions, select_transactions
+
+
+class BloomFilter:
+    """
+    Fixed-size Bloom filter over strings
+
+    Parameters:
+    - expected_items: number of items the filter is sized for
+    - false_positive_rate: target probability of a false "seen" answer
+    """
+
+    def __init__(self, expected_items, false_positive_rate=0.01):
+        expected_items = max(1, expected_items)
+
+        # Optimal bit count m = -n ln p / (ln 2)^2 and hash count k = m/n ln 2
+        self.bit_count = max(8, int(-expected_items * math.log(false_positive_rate) / (math.log(2) ** 2)))
+        self.hash_count = max(1, round(self.bit_count / expected_items * math.log(2)))
+        self.bits = bytearray((self.bit_count + 7) // 8)
+
+    def _positions(self, item):
+        """
+        Derives hash_count bit positions from one 128-bit digest
+        (double hashing: h1 + i * h2)
+        """
+
+        digest = hashlib.blake2b(item.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+
+        return [(h1 + i * h2) % self.bit_count for i in range(self.hash_count)]
+
+    def add(self, item):
+        """
+        Adds an item; returns True if it was possibly present already
+        """
+
+        present = True
+        for position in self._positions(item):
+            byte, bit = divmod(position, 8)
+            if not self.bits[byte] >> bit & 1:
+                present = False
+                self.bits[byte] |= 1 << bit
+        return present
+
+    def __contains__(self, item):
+        for position in self._positions(item):
+            byte, bit = divmod(position, 8)
+            if not self.bits[byte] >> bit & 1:
+                return False
+        return True
+
+    def save(self, filename):
+        """
+        Writes the filter parameters and bits to a file
+        """
+
+        with open(filename, "wb") as file:
+            file.write(self.bit_count.to_bytes(8, "little"))
+            file.write(self.hash_count.to_bytes(2, "little"))
+            file.write(self.bits)
+
+    @classmethod
+    def load(cls, filename):
+        """
+        Reads a filter written by save()
+        """
+
+        bloom = cls.__new__(cls)
+        with open(filename, "rb") as file:
+            bloom.bit_count = int.from_bytes(file.read(8), "little")
+            bloom.hash_count = int.from_bytes(file.read(2), "little")
+            bloom.bits = bytearray(file.read())
+        return bloom
+
+
+class TransactionDeduplicator:
+    """
+    Drops transactions whose TransactionID was already ingested
+
+    Parameters:
+    - expected_rows: rows the Bloom filter is sized for (all runs together)
+    - state_dir: directory for persistent state; None keeps it per run
+    - false_positive_rate: Bloom filter target false-positive rate
+    """
+
+    BLOOM_FILE = "seen_ids.bloom"
+    EXACT_FILE = "seen_ids.sqlite"
+
+    # New IDs are written to the exact store in batches of this size
+    FLUSH_SIZE = 10_000
+
+    def __init__(self, expected_rows=1_000_000, state_dir=None, false_positive_rate=0.01):
+        self.state_dir = state_dir
+        self.exact_checks = 0
+
+        bloom_path = self._state_path(self.BLOOM_FILE)
+        if bloom_path and os.path.exists(bloom_path):
+            self.bloom = BloomFilter.load(bloom_path)
+        else:
+            self.bloom = BloomFilter(expected_rows, false_positive_rate)
+
+        # Exact store of seen IDs, only queried on probable hits
+        # ("" = private temporary on-disk database, so IDs are not held in RAM)
+        if state_dir:
+            os.makedirs(state_dir, exist_ok=True)
+        self.conn = sqlite3.connect(self._state_path(self.EXACT_FILE) or "")
+        self.conn.execute("CREATE TABLE IF NOT EXISTS seen_ids (TransactionID TEXT PRIMARY KEY)")
+        self.pending = []
+
+    def _state_path(self, name):
+        return os.path.join(self.state_dir, name) if self.state_dir else None
+
+    def _flush(self):
+        """
+        Writes buffered new IDs to the exact store in one transaction
+        """
+
+        if self.pending:
+            with self.conn:
+                self.conn.executemany(
+                    "INSERT OR IGNORE INTO seen_ids VALUES (?)",
+                    ((tid,) for tid in self.pending)
+                )
+            self.pending = []
+
+    def is_duplicate(self, transaction_id):
+        """
+        Checks and records one TransactionID
+
+        Returns True if the ID was seen before (in this or an earlier run)
+        """
+
+        # Definitely new: the Bloom filter had at least one bit unset
+        if not self.bloom.add(transaction_id):
+            self.pending.append(transaction_id)
+            if len(self.pending) >= self.FLUSH_SIZE:
+                self._flush()
+            return False
+
+        # Probable hit: confirm against the exact store
+        self.exact_checks += 1
+        self._flush()
+        row = self.conn.execute(
+            "SELECT 1 FROM seen_ids WHERE TransactionID = ?", (transaction_id,)
+        ).fetchone()
+
+        if row is None:
+            # Bloom false positive
+            self.pending.append(transaction_id)
+            return False
+
+        return True
+
+    def seen(self, transaction_id):
+        """
+        Checks one TransactionID against the stored IDs without recording it
+        """
+
+        if transaction_id not in self.bloom:
+            return False
+
+        self.exact_checks += 1
+        self._flush()
+        row = self.conn.execute(
+            "SELECT 1 FROM seen_ids WHERE TransactionID = ?", (transaction_id,)
+        ).fetchone()
+        return row is not None
+
+    def filter(self, transactions):
+        """
+        Splits transactions into unique and duplicate ones
+
+        Returns:
+        tuple (unique_transactions, duplicate_transactions)
+        """
+
+        unique_positions = []
+        duplicate_positions = []
+
+        for position, transaction_id in enumerate(transaction_ids(transactions)):
+            if self.is_duplicate(transaction_id):
+                duplicate_positions.append(position)
+            else:
+                unique_positions.append(position)
+
+        self._flush()
+        return (select_transactions(transactions, unique_positions),
+                select_transactions(transactions, duplicate_positions))
+
+    def close(self, save=True):
+        """
+        Persists the state (if a state_dir was given and save is True)
+        and closes the store
+        """
+
+        if save:
+            self._flush()
+            bloom_path = self._state_path(self.BLOOM_FILE)
+            if bloom_path:
+                self.bloom.save(bloom_path)
+        self.conn.close()
+
+
+def transaction_ids(transactions):
+    """
+    Returns the TransactionIDs in order (read from the ID column for an
+    EncodedTransactions view, so rows are not decoded)
+    """
+
+    if isinstance(transactions, EncodedTransactions):
+        return transactions.column("TransactionID")
+    return [txn["TransactionID"] for txn in transactions]
+
+
+def remove_duplicate_transactions(transactions, state_dir=None, expected_rows=None, record=True):
+    """
+    Removes replayed transactions (duplicate TransactionIDs)
+
+    Parameters:
+    - transactions: list of parsed transaction dictionaries or an
+      EncodedTransactions view (the result is then a view too)
+    - state_dir: optional directory to remember IDs across incremental runs
+    - expected_rows: Bloom filter sizing (defaults to 10x this batch)
+    - record: False only checks against state_dir without adding this
+      batch's IDs; call record_transaction_ids() once the run succeeded,
+      so a failed run does not mark its rows as ingested
+
+    Returns:
+    tuple (unique_transactions, duplicate_transactions)
+    """
+
+    if expected_rows is None:
+        expected_rows = max(1000, len(transactions) * 10)
+
+    if record or not state_dir:
+        deduplicator = TransactionDeduplicator(expected_rows, state_dir)
+        try:
+            return deduplicator.filter(transactions)
+        finally:
+            deduplicator.close()
+
+    # Check-only: earlier runs from state_dir, this batch in a private store
+    stored = TransactionDeduplicator(expected_rows, state_dir)
+    batch = TransactionDeduplicator(expected_rows)
+    unique_positions = []
+    duplicate_positions = []
+
+    try:
+        for position, transaction_id in enumerate(transaction_ids(transactions)):
+            if stored.seen(transaction_id) or batch.is_duplicate(transaction_id):
+                duplicate_positions.append(position)
+            else:
+                unique_positions.append(position)
+    finally:
+        stored.close(save=False)
+        batch.close()
+
+    return (select_transactions(transactions, unique_positions),
+            select_transactions(transactions, duplicate_positions))
+
+
+def record_transaction_ids(transaction_ids, state_dir, expected_rows=1_000_000):
+    """
+    Adds TransactionIDs to the persistent state of state_dir
+    (the commit step after remove_duplicate_transactions(record=False))
+    """
+
+    deduplicator = TransactionDeduplicator(expected_rows, state_dir)
+    try:
+        for transaction_id in transaction_ids:
+            deduplicator.is_duplicate(transaction_id)
+    finally:
+        deduplicator.close()
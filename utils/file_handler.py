@@ -2,13 +2,29 @@
 File: file_handler.py
 Purpose: Handles file reading with encoding and error management
 """
+from array import array
+
+from utils.filter_expr import compile_filter
+from utils.money import MAX_PAISE, PAISE_PER_RUPEE, parse_paise, price_paise, paise_to_rupees
+
+
+# Field order of one pipe-delimited sales record
+TRANSACTION_FIELDS = [
+    "TransactionID", "Date", "ProductID", "ProductName",
+    "Quantity", "UnitPrice", "CustomerID", "Region"
+]
+
 ## Task 1.1: Read sales data with encoding handling ##
-def read_sales_data(filename):
+def read_sales_data(filename, line_numbers=None):
     """
     Reads sales data from file handling encoding issues
 
     Returns: list of raw lines (strings)
 
+    If a `line_numbers` list is passed, it is filled with the 1-based file
+    line number of each returned line (the header is line 1), so parse
+    rejects can point at the real line.
+
     Expected Output Format:
     ['T001|2024-12-01|P101|Laptop|2|45000|C001|North', ...]
     """
@@ -20,11 +36,18 @@ def read_sales_data(filename):
             with open(filename, 'r', encoding=encoding) as file:
                 lines = file.readlines()
 
-                # Skip header row
-                lines = lines[1:]
+                # Skip header row, remove empty lines and strip newline
+                # characters (remembering each kept line's file position)
+                cleaned_lines = []
+                kept_numbers = []
+                for number, line in enumerate(lines[1:], start=2):
+                    line = line.strip()
+                    if line:
+                        cleaned_lines.append(line)
+                        kept_numbers.append(number)
 
-                # Remove empty lines and strip newline characters
-                cleaned_lines = [line.strip() for line in lines if line.strip()]
+                if line_numbers is not None:
+                    line_numbers[:] = kept_numbers
 
                 return cleaned_lines
 
@@ -41,76 +64,530 @@ def read_sales_data(filename):
     return []
 
 ## Task 1.2: Parse and Clean Data ##
-def parse_transactions(raw_lines):
+
+# Low-cardinality text columns that are interned / dictionary-encoded
+ENCODED_COLUMNS = ["Date", "ProductID", "ProductName", "CustomerID", "Region"]
+
+
+# Largest Quantity a quantity column can hold (SQLite INTEGER / array "q")
+MAX_QUANTITY = 2 ** 63 - 1
+
+
+# Characters stripped from numeric fields on the slow (dirty) path,
+# e.g. "1,916", "₹ 45000" or "1_000"
+NUMBER_NOISE = (",", "₹", "_", " ")
+
+
+def _clean_number(text):
+    """
+    Removes thousands separators, currency symbols and spaces from a
+    numeric field (only the ones actually present are replaced)
+    """
+
+    text = text.strip()
+    for symbol in NUMBER_NOISE:
+        if symbol in text:
+            text = text.replace(symbol, "")
+    return text
+
+
+def _split_and_clean(line):
+    """
+    Splits one raw line and cleans its fields
+
+    Clean numeric fields (plain digits) take a fast path straight to int;
+    only fields that fail that check go through _clean_number().
+    Quantity, UnitPrice and their product must fit a 64-bit integer
+    column, so every backend accepts or rejects the same rows.
+
+    Returns:
+    tuple of 8 cleaned values (UnitPrice in integer paise)
+
+    Raises ValueError describing the problem if the row is malformed
+    """
+
+    # Split the line using pipe delimiter
+    fields = line.split("|")
+
+    # Reject rows that do not have exactly 8 fields
+    if len(fields) != 8:
+        raise ValueError(f"expected 8 fields, found {len(fields)}")
+
+    # Unpack fields into variables
+    transaction_id, date, product_id, product_name, quantity, unit_price, customer_id, region = fields
+
+    # Clean ProductName
+    # Remove commas (e.g., Mouse,Wireless → Mouse Wireless)
+    if "," in product_name:
+        product_name = product_name.replace(",", " ")
+
+    # Clean and convert Quantity
+    # Fast path: plain digits; otherwise remove commas/noise first
+    try:
+        if quantity.isdigit():
+            quantity = int(quantity)
+        else:
+            quantity = int(_clean_number(quantity))
+    except ValueError:
+        raise ValueError(f"invalid Quantity {quantity!r}") from None
+    if not -MAX_QUANTITY <= quantity <= MAX_QUANTITY:
+        raise ValueError(f"Quantity out of range: {quantity}")
+
+    # Clean and convert UnitPrice to exact integer paise
+    # Fast path: plain digits; otherwise remove commas/noise first
+    try:
+        if unit_price.isdigit():
+            unit_price_paise = int(unit_price) * PAISE_PER_RUPEE
+        else:
+            unit_price_paise = parse_paise(_clean_number(unit_price))
+    except ValueError:
+        raise ValueError(f"invalid UnitPrice {unit_price!r}") from None
+    if unit_price_paise > MAX_PAISE:
+        raise ValueError(f"UnitPrice out of range: {unit_price!r}")
+    if not -MAX_PAISE <= quantity * unit_price_paise <= MAX_PAISE:
+        raise ValueError(f"amount out of range: {quantity} x {unit_price!r}")
+
+    return (transaction_id, date, product_id, product_name,
+            quantity, unit_price_paise, customer_id, region)
+
+
+def _record_reject(rejects, line_number, line, error):
+    """
+    Adds one malformed row to the rejects channel (if one was given)
+    """
+
+    if rejects is not None:
+        rejects.append({
+            "line_number": line_number,
+            "line": line,
+            "reason": str(error)
+        })
+
+
+def parse_transactions(raw_lines, rejects=None, line_numbers=None):
     """
     Parses raw transaction lines into a clean list of dictionaries
+
+    Malformed rows never raise: they are skipped and, if a `rejects`
+    list is passed, recorded there as
+    {"line_number": int, "line": str, "reason": str}
+
+    line_number is the file line when `line_numbers` (filled by
+    read_sales_data) is given, otherwise the 1-based position in raw_lines.
+
+    Repeated values of the ENCODED_COLUMNS are interned through
+    per-column dictionaries, so all rows share one string object
+    per distinct Region / ProductName / ProductID / CustomerID / Date.
+
+    UnitPrice is kept as a float for display and filtering, and as exact
+    integer paise in "UnitPricePaise" for all money arithmetic.
+
+    Clean rows are converted inline; only rows that need cleaning (or
+    are malformed) go through _split_and_clean().
     """
 
     # List to store cleaned transaction dictionaries
     parsed_transactions = []
+    append = parsed_transactions.append
+
+    # One intern table per low-cardinality column
+    intern_tables = {column: {} for column in ENCODED_COLUMNS}
+    intern_date = intern_tables["Date"].setdefault
+    intern_product_id = intern_tables["ProductID"].setdefault
+    intern_product_name = intern_tables["ProductName"].setdefault
+    intern_customer_id = intern_tables["CustomerID"].setdefault
+    intern_region = intern_tables["Region"].setdefault
 
     # Loop through each raw transaction line
-    for line in raw_lines:
+    for line_number, line in zip(line_numbers or range(1, len(raw_lines) + 1), raw_lines):
 
-        # Split the line using pipe delimiter
         fields = line.split("|")
 
-        # Skip rows that do not have exactly 8 fields
-        if len(fields) != 8:
+        # Fast path: 8 fields, plain-digit numbers and a comma-free name
+        # (the common case) are converted inline
+        if len(fields) == 8:
+            transaction_id, date, product_id, product_name, quantity, unit_price, customer_id, region = fields
+
+            if quantity.isdigit() and unit_price.isdigit() and "," not in product_name:
+                quantity = int(quantity)
+                unit_price = int(unit_price)
+                unit_price_paise = unit_price * PAISE_PER_RUPEE
+
+                if quantity <= MAX_QUANTITY and unit_price_paise <= MAX_PAISE and quantity * unit_price_paise <= MAX_PAISE:
+                    append({
+                        "TransactionID": transaction_id,
+                        "Date": intern_date(date, date),
+                        "ProductID": intern_product_id(product_id, product_id),
+                        "ProductName": intern_product_name(product_name, product_name),
+                        "Quantity": quantity,
+                        "UnitPrice": float(unit_price),
+                        "UnitPricePaise": unit_price_paise,
+                        "CustomerID": intern_customer_id(customer_id, customer_id),
+                        "Region": intern_region(region, region)
+                    })
+                    continue
+
+        # Slow path: noisy numbers, commas in the name or malformed rows
+        try:
+            values = _split_and_clean(line)
+        except ValueError as error:
+            _record_reject(rejects, line_number, line, error)
             continue
 
-        # Unpack fields into variables
-        transaction_id, date, product_id, product_name, quantity, unit_price, customer_id, region = fields
+        transaction_id, date, product_id, product_name, quantity, unit_price_paise, customer_id, region = values
 
-        # Clean ProductName
-        # Remove commas (e.g., Mouse,Wireless → Mouse Wireless)
-        product_name = product_name.replace(",", " ")
+        # Create cleaned transaction dictionary (text columns interned)
+        append({
+            "TransactionID": transaction_id,
+            "Date": intern_date(date, date),
+            "ProductID": intern_product_id(product_id, product_id),
+            "ProductName": intern_product_name(product_name, product_name),
+            "Quantity": quantity,
+            "UnitPrice": paise_to_rupees(unit_price_paise),
+            "UnitPricePaise": unit_price_paise,
+            "CustomerID": intern_customer_id(customer_id, customer_id),
+            "Region": intern_region(region, region)
+        })
 
-        # Clean and convert Quantity
-        # Remove commas and convert to int
-       
-        quantity = quantity.replace(",", "")
-        quantity = int(quantity)
+    # Return list of cleaned transaction dictionaries
+    return parsed_transactions
 
-       # Clean and convert UnitPrice
-        # Remove commas and convert to float
-        unit_price = unit_price.replace(",", "")
-        unit_price = float(unit_price)
 
-        # Create cleaned transaction dictionary
-        transaction = {
-            "TransactionID": transaction_id,
-            "Date": date,
-            "ProductID": product_id,
-            "ProductName": product_name,
-            "Quantity": quantity,
-            "UnitPrice": unit_price,
-            "CustomerID": customer_id,
-            "Region": region
+def stream_transactions(filename, rejects=None, encoding="utf-8"):
+    """
+    Yields cleaned transaction dictionaries one line at a time
+
+    Unlike read_sales_data() + parse_transactions(), the file is never
+    held in memory, so this can feed memory-budgeted analyses such as
+    customer_analysis_spilling(). Malformed rows go to `rejects`.
+    """
+
+    with open(filename, "r", encoding=encoding) as file:
+
+        # Skip header row
+        next(file, None)
+
+        # Line 1 is the header
+        for line_number, line in enumerate(file, start=2):
+            line = line.strip()
+            if not line:
+                continue
+
+            try:
+                values = _split_and_clean(line)
+            except ValueError as error:
+                _record_reject(rejects, line_number, line, error)
+                continue
+
+            transaction = dict(zip(TRANSACTION_FIELDS, values))
+            transaction["UnitPricePaise"] = transaction["UnitPrice"]
+            transaction["UnitPrice"] = paise_to_rupees(transaction["UnitPricePaise"])
+            yield transaction
+
+
+## Dictionary-encoded (columnar) transactions ##
+def _new_encoded_table():
+    """
+    Creates an empty dictionary-encoded transaction table
+
+    Layout:
+    {
+        "row_count": int,
+        "columns": {column: array/list of values or integer codes},
+                    (money is stored only as integer "UnitPricePaise")
+        "lookups": {column: list of distinct values (index = code)}
+    }
+    """
+
+    columns = {
+        "TransactionID": [],
+        "Quantity": array("q"),
+        "UnitPricePaise": array("q")
+    }
+    for column in ENCODED_COLUMNS:
+        columns[column] = array("i")
+
+    return {
+        "row_count": 0,
+        "columns": columns,
+        "lookups": {column: [] for column in ENCODED_COLUMNS},
+        "_codes": {column: {} for column in ENCODED_COLUMNS}
+    }
+
+
+def _append_encoded_row(table, values):
+    """
+    Appends one row (dict keyed by column name) to an encoded table
+    """
+
+    columns = table["columns"]
+    columns["TransactionID"].append(values["TransactionID"])
+    columns["Quantity"].append(values["Quantity"])
+    columns["UnitPricePaise"].append(price_paise(values))
+
+    for column in ENCODED_COLUMNS:
+        value = values[column]
+        codes = table["_codes"][column]
+        code = codes.get(value)
+
+        # New distinct value: assign the next code (first-seen order)
+        if code is None:
+            code = len(codes)
+            codes[value] = code
+            table["lookups"][column].append(value)
+
+        columns[column].append(code)
+
+    table["row_count"] += 1
+
+
+def _finish_encoded_table(table):
+    """
+    Drops the build-time reverse dictionaries and returns the table
+    """
+
+    del table["_codes"]
+    return table
+
+
+def parse_transactions_encoded(raw_lines, rejects=None, line_numbers=None):
+    """
+    Parses raw transaction lines directly into a dictionary-encoded table
+    (malformed rows go to `rejects` exactly as in parse_transactions,
+    numbered by `line_numbers` when given)
+
+    No per-row dictionaries are built; wrap the result in
+    EncodedTransactions to use it where a transaction list is expected.
+
+    Returns:
+    dictionary with "row_count", "columns" and "lookups" where the
+    ENCODED_COLUMNS hold integer codes into their lookup lists
+    """
+
+    table = _new_encoded_table()
+    columns = table["columns"]
+    transaction_ids = columns["TransactionID"]
+    quantities = columns["Quantity"]
+    unit_prices = columns["UnitPricePaise"]
+
+    # (code column, value -> code, lookup list) in _split_and_clean order
+    encoders = [
+        (columns[column], table["_codes"][column], table["lookups"][column])
+        for column in ("Date", "ProductID", "ProductName", "CustomerID", "Region")
+    ]
+
+    for line_number, line in zip(line_numbers or range(1, len(raw_lines) + 1), raw_lines):
+
+        try:
+            values = _split_and_clean(line)
+        except ValueError as error:
+            _record_reject(rejects, line_number, line, error)
+            continue
+
+        transaction_ids.append(values[0])
+        quantities.append(values[4])
+        unit_prices.append(values[5])
+
+        for (codes, code_of, lookup), value in zip(encoders, (values[1], values[2], values[3], values[6], values[7])):
+            code = code_of.get(value)
+
+            # New distinct value: assign the next code (first-seen order)
+            if code is None:
+                code = len(lookup)
+                code_of[value] = code
+                lookup.append(value)
+
+            codes.append(code)
+
+    table["row_count"] = len(transaction_ids)
+
+    return _finish_encoded_table(table)
+
+
+def encode_transactions(transactions):
+    """
+    Dictionary-encodes a list of transaction dictionaries
+    (e.g. the output of validate_and_filter)
+
+    Returns:
+    encoded table in the same layout as parse_transactions_encoded()
+    """
+
+    table = _new_encoded_table()
+
+    for txn in transactions:
+        _append_encoded_row(table, txn)
+
+    return _finish_encoded_table(table)
+
+
+def decode_transactions(encoded):
+    """
+    Converts an encoded table back into a list of transaction dictionaries
+    """
+
+    return list(EncodedTransactions(encoded))
+
+
+def _take_encoded_rows(encoded, rows):
+    """
+    Builds a new encoded table from the given row indexes
+
+    Codes are renumbered in first-seen order of the kept rows, so the
+    table is identical to encode_transactions() of the same rows.
+    """
+
+    columns = encoded["columns"]
+    lookups = encoded["lookups"]
+
+    table = _new_encoded_table()
+    table["columns"]["TransactionID"] = [columns["TransactionID"][i] for i in rows]
+    table["columns"]["Quantity"] = array("q", (columns["Quantity"][i] for i in rows))
+    table["columns"]["UnitPricePaise"] = array("q", (columns["UnitPricePaise"][i] for i in rows))
+
+    for column in ENCODED_COLUMNS:
+        source = columns[column]
+        old_lookup = lookups[column]
+        new_lookup = table["lookups"][column]
+        codes = table["columns"][column]
+        renumbered = {}
+
+        for i in rows:
+            code = renumbered.get(source[i])
+            if code is None:
+                code = len(new_lookup)
+                renumbered[source[i]] = code
+                new_lookup.append(old_lookup[source[i]])
+            codes.append(code)
+
+    table["row_count"] = len(rows)
+
+    return _finish_encoded_table(table)
+
+
+class EncodedTransactions:
+    """
+    Read-only list view of the rows of an encoded table
+
+    Rows are decoded to transaction dictionaries (the same layout as
+    parse_transactions) only when they are accessed, so stages that need
+    dictionaries can use the view like a list while the encoded backend
+    groups on the integer codes. Row selections (deduplication,
+    validation, filters) return new views over the same table.
+
+    Parameters:
+    - table: encoded table from parse_transactions_encoded()
+    - rows: optional table row indexes in the view (default: all rows)
+    """
+
+    def __init__(self, table, rows=None):
+        self.table = table
+        self.rows = range(table["row_count"]) if rows is None else rows
+        self._compact = None
+
+    def __len__(self):
+        return len(self.rows)
+
+    def _decode(self, i):
+        columns = self.table["columns"]
+        lookups = self.table["lookups"]
+        unit_price_paise = columns["UnitPricePaise"][i]
+
+        return {
+            "TransactionID": columns["TransactionID"][i],
+            "Date": lookups["Date"][columns["Date"][i]],
+            "ProductID": lookups["ProductID"][columns["ProductID"][i]],
+            "ProductName": lookups["ProductName"][columns["ProductName"][i]],
+            "Quantity": columns["Quantity"][i],
+            "UnitPrice": paise_to_rupees(unit_price_paise),
+            "UnitPricePaise": unit_price_paise,
+            "CustomerID": lookups["CustomerID"][columns["CustomerID"][i]],
+            "Region": lookups["Region"][columns["Region"][i]]
         }
 
-        # Add cleaned transaction to the result list
-        parsed_transactions.append(transaction)
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return EncodedTransactions(self.table, self.rows[index])
+        return self._decode(self.rows[index])
 
-    # Return list of cleaned transaction dictionaries
-    return parsed_transactions
+    def __iter__(self):
+        return map(self._decode, self.rows)
+
+    def column(self, name):
+        """
+        Returns the decoded values of one column for the rows in the view
+        """
+
+        values = self.table["columns"][name]
+        if name in ENCODED_COLUMNS:
+            lookup = self.table["lookups"][name]
+            return [lookup[values[i]] for i in self.rows]
+        return [values[i] for i in self.rows]
+
+    def select(self, positions):
+        """
+        Returns a view of the rows at the given positions of this view
+        """
+
+        return EncodedTransactions(self.table, [self.rows[position] for position in positions])
+
+    def to_table(self):
+        """
+        Returns the encoded table holding exactly the rows in the view
+        (the underlying table when the view covers all of it)
+        """
+
+        if isinstance(self.rows, range) and self.rows == range(self.table["row_count"]):
+            return self.table
+
+        if self._compact is None:
+            self._compact = _take_encoded_rows(self.table, self.rows)
+
+        return self._compact
+
+
+def select_transactions(transactions, positions):
+    """
+    Returns the transactions at the given positions: a view for
+    EncodedTransactions, otherwise a list
+    """
+
+    if isinstance(transactions, EncodedTransactions):
+        return transactions.select(positions)
+    return [transactions[position] for position in positions]
 
 ## Task 1.3: Data Validation and Filtering ##
 
-def validate_and_filter(transactions, region=None, min_amount=None, max_amount=None):
+def validate_and_filter(transactions, region=None, min_amount=None, max_amount=None,
+                        verbose=True, expression=None):
     """
     Validates transactions and applies optional filters
+    (verbose=False suppresses the filter info printout)
+
+    `expression` is an optional filter expression (string or compiled
+    FilterExpression, see utils/filter_expr.py), applied after the
+    region and amount filters.
+
+    An EncodedTransactions view is validated on its columns and the
+    result is a view as well (see _validate_and_filter_encoded).
 
     Returns:
     (valid_transactions, invalid_count, filter_summary)
     """
 
+    if isinstance(transactions, EncodedTransactions):
+        return _validate_and_filter_encoded(transactions, region, min_amount, max_amount,
+                                            verbose, expression)
+
     valid_transactions = []
     invalid_count = 0
 
     # Counters for summary
     filtered_by_region = 0
     filtered_by_amount = 0
+    filtered_by_expression = 0
+
+    predicate = compile_filter(expression).predicate if expression else None
 
     total_input = len(transactions)
 
@@ -167,14 +644,19 @@ def validate_and_filter(transactions, region=None, min_amount=None, max_amount=N
             continue
 
         # Apply amount filters
-        if min_amount and transaction_amount < min_amount:
+        if min_amount is not None and transaction_amount < min_amount:
             filtered_by_amount += 1
             continue
 
-        if max_amount and transaction_amount > max_amount:
+        if max_amount is not None and transaction_amount > max_amount:
             filtered_by_amount += 1
             continue
 
+        # Apply filter expression
+        if predicate is not None and not predicate(txn):
+            filtered_by_expression += 1
+            continue
+
         filtered_transactions.append(txn)
 
    
@@ -185,15 +667,105 @@ def validate_and_filter(transactions, region=None, min_amount=None, max_amount=N
         "invalid": invalid_count,
         "filtered_by_region": filtered_by_region,
         "filtered_by_amount": filtered_by_amount,
+        "filtered_by_expression": filtered_by_expression,
         "final_count": len(filtered_transactions)
     }
 
 
     # Display filter info
    
-    print("Available regions:", sorted(set(t["Region"] for t in transactions)))
-    print(f"Transaction amount filter: min={min_amount}, max={max_amount}")
-    print(f"Records after filtering: {len(filtered_transactions)}")
+    if verbose:
+        _print_filter_info(set(t["Region"] for t in transactions), min_amount, max_amount,
+                           expression, len(filtered_transactions))
 
     return filtered_transactions, invalid_count, filter_summary
+
+
+def _print_filter_info(regions, min_amount, max_amount, expression, final_count):
+    """
+    Prints the filter info of validate_and_filter (verbose mode)
+    """
+
+    print("Available regions:", sorted(regions))
+    print(f"Transaction amount filter: min={min_amount}, max={max_amount}")
+    if expression:
+        print(f"Filter expression: {expression if isinstance(expression, str) else expression.text}")
+    print(f"Records after filtering: {final_count}")
+
+
+def _validate_and_filter_encoded(transactions, region, min_amount, max_amount, verbose, expression):
+    """
+    validate_and_filter() for an EncodedTransactions view
+
+    The text rules are checked once per distinct value (lookup lists)
+    and the numeric rules on the integer columns; rows are decoded only
+    for a filter expression.
+
+    Returns:
+    (view of the kept rows, invalid_count, filter_summary)
+    """
+
+    columns = transactions.table["columns"]
+    lookups = transactions.table["lookups"]
+    predicate = compile_filter(expression).predicate if expression else None
+
+    # Step 1: Rule results per distinct value (the list index is the code)
+    product_ok = [bool(value) and value.startswith("P") for value in lookups["ProductID"]]
+    customer_ok = [bool(value) and value.startswith("C") for value in lookups["CustomerID"]]
+    region_ok = [bool(value) for value in lookups["Region"]]
+    region_wanted = [not region or value == region for value in lookups["Region"]]
+
+    transaction_ids = columns["TransactionID"]
+    quantities = columns["Quantity"]
+    unit_prices = columns["UnitPricePaise"]
+    product_codes = columns["ProductID"]
+    customer_codes = columns["CustomerID"]
+    region_codes = columns["Region"]
+
+    kept = []
+    invalid_count = 0
+    filtered_by_region = 0
+    filtered_by_amount = 0
+    filtered_by_expression = 0
+
+    # Step 2: Validation and filters per row (same order as the
+    # dictionary version, so the counters match)
+    for position, i in enumerate(transactions.rows):
+        if not (transaction_ids[i].startswith("T") and quantities[i] > 0 and unit_prices[i] > 0
+                and product_ok[product_codes[i]] and customer_ok[customer_codes[i]]
+                and region_ok[region_codes[i]]):
+            invalid_count += 1
+            continue
+
+        if not region_wanted[region_codes[i]]:
+            filtered_by_region += 1
+            continue
+
+        if min_amount is not None or max_amount is not None:
+            transaction_amount = quantities[i] * paise_to_rupees(unit_prices[i])
+            if ((min_amount is not None and transaction_amount < min_amount)
+                    or (max_amount is not None and transaction_amount > max_amount)):
+                filtered_by_amount += 1
+                continue
+
+        if predicate is not None and not predicate(transactions[position]):
+            filtered_by_expression += 1
+            continue
+
+        kept.append(position)
+
+    filter_summary = {
+        "total_input": len(transactions),
+        "invalid": invalid_count,
+        "filtered_by_region": filtered_by_region,
+        "filtered_by_amount": filtered_by_amount,
+        "filtered_by_expression": filtered_by_expression,
+        "final_count": len(kept)
+    }
+
+    if verbose:
+        regions = {lookups["Region"][code] for code in set(region_codes[i] for i in transactions.rows)}
+        _print_filter_info(regions, min_amount, max_amount, expression, len(kept))
+
+    return transactions.select(kept), invalid_count, filter_summary
  
\ No newline at end of file
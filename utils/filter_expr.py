@@ -0,0 +1,365 @@
+"""
+File: filter_expr.py
+Purpose: Small filter expression language for transactions
+
+An expression is parsed once and compiled into a single Python predicate
+(one generated function, constants bound in its namespace), e.g.
+
+    region in [North, East] and amount >= 10000 and date >= 2024-12-05
+    not (product ~ '^USB' or customer = C005)
+
+Grammar (keywords are case-insensitive):
+    expr       := and_expr ("or" and_expr)*
+    and_expr   := not_expr ("and" not_expr)*
+    not_expr   := "not" not_expr | "(" expr ")" | comparison
+    comparison := field op value
+                | field ["not"] "in" "[" value ("," value)* "]"
+                | field "~" value                (regular expression search)
+    op         := "=" | "==" | "!=" | "<" | "<=" | ">" | ">="
+
+Values are quoted strings or bare words (North, 2024-12-05, 1500.50).
+Money fields (price, amount) are compared in exact paise.
+
+FilterExpression.filter() can also use hash indexes built with
+build_index(): equality / "in" tests on an indexed field in the top-level
+"and" narrow the rows before the predicate runs.
+"""
+import re
+
+from utils.money import price_paise, amount_paise, parse_paise
+
+
+# Field names accepted in expressions -> transaction field
+FIELD_ALIASES = {
+    "transactionid": "TransactionID", "transaction": "TransactionID",
+    "date": "Date",
+    "productid": "ProductID", "product_id": "ProductID",
+    "productname": "ProductName", "product": "ProductName",
+    "customerid": "CustomerID", "customer_id": "CustomerID", "customer": "CustomerID",
+    "region": "Region",
+    "quantity": "Quantity", "qty": "Quantity",
+    "unitprice": "UnitPrice", "price": "UnitPrice",
+    "amount": "Amount"
+}
+
+# Python expression reading each field from a transaction `t`
+FIELD_ACCESSORS = {
+    "TransactionID": 't["TransactionID"]',
+    "Date": 't["Date"]',
+    "ProductID": 't["ProductID"]',
+    "ProductName": 't["ProductName"]',
+    "CustomerID": 't["CustomerID"]',
+    "Region": 't["Region"]',
+    "Quantity": 't["Quantity"]',
+    "UnitPrice": "_price(t)",
+    "Amount": "_amount(t)"
+}
+
+NUMERIC_FIELDS = {"Quantity", "UnitPrice", "Amount"}
+MONEY_FIELDS = {"UnitPrice", "Amount"}
+
+COMPARISON_OPS = {"=": "==", "==": "==", "!=": "!=", "<": "<", "<=": "<=", ">": ">", ">=": ">="}
+KEYWORDS = {"and", "or", "not", "in"}
+
+TOKEN_PATTERN = re.compile(r"""
+    \s*(?:
+        (?P<string>'(?:[^'\\]|\\.)*'|"(?:[^"\\]|\\.)*")
+      | (?P<op>==|!=|<=|>=|=|<|>|~|\(|\)|\[|\]|,)
+      | (?P<word>[^\s'"=!<>~()\[\],]+)
+    )""", re.VERBOSE)
+
+
+def _tokenize(text):
+    """
+    Splits an expression into (kind, value, position) tokens
+    """
+
+    tokens = []
+    position = 0
+    text = text.rstrip()
+
+    while position < len(text):
+        match = TOKEN_PATTERN.match(text, position)
+        if match is None:
+            raise ValueError(f"Unexpected character {text[position]!r} at position {position}")
+
+        kind = match.lastgroup
+        value = match.group(kind)
+        start = match.start(kind)
+
+        if kind == "string":
+            value = re.sub(r"\\(.)", r"\1", value[1:-1])
+        elif kind == "word" and value.lower() in KEYWORDS:
+            kind = "keyword"
+            value = value.lower()
+
+        tokens.append((kind, value, start))
+        position = match.end()
+
+    return tokens
+
+
+class _Parser:
+    """
+    Recursive-descent parser producing a small tuple AST:
+    ("or", [nodes]), ("and", [nodes]), ("not", node),
+    ("cmp", field, op, value), ("in", field, values, negated),
+    ("match", field, pattern)
+    """
+
+    def __init__(self, text):
+        self.text = text
+        self.tokens = _tokenize(text)
+        self.index = 0
+
+    def _peek(self):
+        if self.index < len(self.tokens):
+            return self.tokens[self.index]
+        return (None, None, len(self.text))
+
+    def _next(self):
+        token = self._peek()
+        self.index += 1
+        return token
+
+    def _expect(self, kind, value=None):
+        token_kind, token_value, position = self._next()
+        if token_kind != kind or (value is not None and token_value != value):
+            found = "end of expression" if token_kind is None else repr(token_value)
+            raise ValueError(f"Expected {value or kind} but found {found} at position {position}")
+        return token_value
+
+    def _is(self, kind, value):
+        token_kind, token_value, _ = self._peek()
+        return token_kind == kind and token_value == value
+
+    def parse(self):
+        if not self.tokens:
+            raise ValueError("Empty filter expression")
+
+        node = self._or()
+
+        kind, value, position = self._peek()
+        if kind is not None:
+            raise ValueError(f"Unexpected {value!r} at position {position}")
+
+        return node
+
+    def _or(self):
+        nodes = [self._and()]
+        while self._is("keyword", "or"):
+            self._next()
+            nodes.append(self._and())
+        return nodes[0] if len(nodes) == 1 else ("or", nodes)
+
+    def _and(self):
+        nodes = [self._not()]
+        while self._is("keyword", "and"):
+            self._next()
+            nodes.append(self._not())
+        return nodes[0] if len(nodes) == 1 else ("and", nodes)
+
+    def _not(self):
+        if self._is("keyword", "not"):
+            self._next()
+            return ("not", self._not())
+
+        if self._is("op", "("):
+            self._next()
+            node = self._or()
+            self._expect("op", ")")
+            return node
+
+        return self._comparison()
+
+    def _value(self, field):
+        kind, value, position = self._next()
+        if kind not in ("word", "string"):
+            found = "end of expression" if kind is None else repr(value)
+            raise ValueError(f"Expected a value but found {found} at position {position}")
+
+        if field in NUMERIC_FIELDS:
+            # Money literals are parsed from their text straight to exact
+            # paise (no float rounding; out-of-range values are rejected)
+            try:
+                if field in MONEY_FIELDS:
+                    return parse_paise(value.replace(",", ""))
+                return float(value.replace(",", ""))
+            except ValueError as error:
+                raise ValueError(f"{field} needs a number, got {value!r} at position {position} ({error})") from None
+
+        return value
+
+    def _comparison(self):
+        kind, name, position = self._next()
+        if kind != "word":
+            found = "end of expression" if kind is None else repr(name)
+            raise ValueError(f"Expected a field name but found {found} at position {position}")
+
+        field = FIELD_ALIASES.get(name.lower())
+        if field is None:
+            raise ValueError(f"Unknown field {name!r} at position {position}")
+
+        negated = False
+        if self._is("keyword", "not"):
+            self._next()
+            negated = True
+            if not self._is("keyword", "in"):
+                _, value, position = self._peek()
+                raise ValueError(f"Expected 'in' after 'not' at position {position}")
+
+        if self._is("keyword", "in"):
+            self._next()
+            self._expect("op", "[")
+            values = [self._value(field)]
+            while self._is("op", ","):
+                self._next()
+                values.append(self._value(field))
+            self._expect("op", "]")
+            return ("in", field, values, negated)
+
+        kind, op, position = self._next()
+
+        if kind == "op" and op == "~":
+            if field in NUMERIC_FIELDS:
+                raise ValueError(f"Regular expressions need a text field, not {field} (position {position})")
+            pattern = self._value(field)
+            try:
+                return ("match", field, re.compile(pattern))
+            except re.error as error:
+                raise ValueError(f"Invalid regular expression {pattern!r}: {error}")
+
+        if kind != "op" or op not in COMPARISON_OPS:
+            found = "end of expression" if kind is None else repr(op)
+            raise ValueError(f"Expected a comparison after {name!r} but found {found} at position {position}")
+
+        return ("cmp", field, COMPARISON_OPS[op], self._value(field))
+
+
+class FilterExpression:
+    """
+    A parsed and compiled filter expression
+
+    Attributes:
+    - text: the original expression
+    - source: the generated Python expression (for debugging)
+    - predicate: function(transaction) -> bool
+    """
+
+    def __init__(self, text):
+        self.text = text
+        self.tree = _Parser(text).parse()
+
+        self.constants = {}
+        self.source = self._generate(self.tree)
+
+        namespace = {"_price": price_paise, "_amount": amount_paise, **self.constants}
+        exec(f"def _predicate(t):\n    return {self.source}\n", namespace)
+        self.predicate = namespace["_predicate"]
+
+    def _constant(self, value):
+        name = f"_c{len(self.constants)}"
+        self.constants[name] = value
+        return name
+
+    def _generate(self, node):
+        kind = node[0]
+
+        if kind in ("and", "or"):
+            return "(" + f" {kind} ".join(self._generate(child) for child in node[1]) + ")"
+
+        if kind == "not":
+            return f"(not {self._generate(node[1])})"
+
+        if kind == "cmp":
+            _, field, op, value = node
+            return f"({FIELD_ACCESSORS[field]} {op} {self._constant(value)})"
+
+        if kind == "in":
+            _, field, values, negated = node
+            op = "not in" if negated else "in"
+            return f"({FIELD_ACCESSORS[field]} {op} {self._constant(frozenset(values))})"
+
+        _, field, pattern = node
+        return f"({self._constant(pattern.search)}({FIELD_ACCESSORS[field]}) is not None)"
+
+    def __call__(self, txn):
+        return self.predicate(txn)
+
+    def __repr__(self):
+        return f"FilterExpression({self.text!r})"
+
+    def _index_candidates(self, indexes):
+        """
+        Returns sorted row positions allowed by the most selective indexed
+        equality / "in" test of the top-level "and", or None if no test
+        can use an index
+        """
+
+        terms = self.tree[1] if self.tree[0] == "and" else [self.tree]
+        best = None
+
+        for term in terms:
+            if term[0] == "cmp" and term[2] == "==":
+                field, values = term[1], [term[3]]
+            elif term[0] == "in" and not term[3]:
+                field, values = term[1], term[2]
+            else:
+                continue
+
+            index = indexes.get(field)
+            if index is None:
+                continue
+
+            positions = []
+            for value in set(values):
+                positions.extend(index.get(value, ()))
+
+            if best is None or len(positions) < len(best):
+                best = positions
+
+        if best is not None:
+            best.sort()
+        return best
+
+    def filter(self, transactions, indexes=None):
+        """
+        Returns the matching transactions in their original order
+
+        Parameters:
+        - indexes: optional {field: build_index(transactions, field)}
+        """
+
+        predicate = self.predicate
+
+        if indexes:
+            positions = self._index_candidates(indexes)
+            if positions is not None:
+                return [transactions[i] for i in positions if predicate(transactions[i])]
+
+        return [txn for txn in transactions if predicate(txn)]
+
+
+def compile_filter(expression):
+    """
+    Parses and compiles an expression (a FilterExpression is returned as is)
+
+    Raises:
+    ValueError with the position of the problem on syntax errors
+    """
+
+    if isinstance(expression, FilterExpression):
+        return expression
+
+    return FilterExpression(expression)
+
+
+def build_index(transactions, field):
+    """
+    Builds a hash index {value: [row positions]} on one text field
+    """
+
+    index = {}
+    for position, txn in enumerate(transactions):
+        index.setdefault(txn[field], []).append(position)
+    return index
@@ -0,0 +1,174 @@
+"""
+File: market_basket.py
+Purpose: "Frequently bought together" product pairs (market-basket analysis)
+
+Baskets are the distinct products a customer bought on one day (or over
+all days). Counting is Apriori-style in two passes:
+1. count in how many baskets each product appears and drop products below
+   the support threshold (a pair can never be more frequent than its
+   least frequent product)
+2. count pairs of the remaining products only, in a sparse dictionary
+   keyed by one integer per pair (built from interned product codes)
+
+Pass 2 is split by the pair's first product: each sweep over the baskets
+counts only the pairs whose first product falls in one slice of the
+frequent products, sized so that at most `max_pairs` counters can exist,
+and prunes them before the next slice. Memory is therefore bounded by
+max_pairs plus the pairs that pass pruning, and the counts stay exact.
+
+Support, confidence and lift are reported for the top pairs.
+"""
+import math
+
+
+# Default number of pair counters held at once (per slice of pass 2)
+DEFAULT_MAX_PAIRS = 100_000
+
+
+BASKET_KEYS = {
+    "customer_date": lambda t: (t["CustomerID"], t["Date"]),
+    "customer": lambda t: t["CustomerID"]
+}
+
+
+def build_baskets(transactions, basket_by="customer_date"):
+    """
+    Groups transactions into baskets of interned product codes
+
+    Returns:
+    tuple (list of baskets as sets of codes, list of product names by code)
+    """
+
+    if basket_by not in BASKET_KEYS:
+        raise ValueError(f"basket_by must be one of {sorted(BASKET_KEYS)}, got {basket_by!r}")
+
+    basket_key = BASKET_KEYS[basket_by]
+    product_codes = {}
+    product_names = []
+    baskets = {}
+
+    for txn in transactions:
+        name = txn["ProductName"]
+        code = product_codes.get(name)
+        if code is None:
+            code = product_codes[name] = len(product_names)
+            product_names.append(name)
+
+        baskets.setdefault(basket_key(txn), set()).add(code)
+
+    return list(baskets.values()), product_names
+
+
+def _pair_slices(frequent_codes, max_pairs):
+    """
+    Splits the sorted frequent product codes into slices of first
+    products whose possible pairs number at most max_pairs (a product
+    with more possible pairs than that gets a slice of its own)
+
+    Returns:
+    list of sets of product codes
+    """
+
+    slices = []
+    current = set()
+    possible = 0
+
+    for rank, code in enumerate(frequent_codes):
+        # Pairs (code, b) with b a later frequent product
+        pairs = len(frequent_codes) - rank - 1
+        if current and possible + pairs > max_pairs:
+            slices.append(current)
+            current = set()
+            possible = 0
+        current.add(code)
+        possible += pairs
+
+    if current:
+        slices.append(current)
+    return slices
+
+
+def frequently_bought_together(transactions, basket_by="customer_date",
+                               min_support=0.01, min_count=2, top_n=10,
+                               max_pairs=DEFAULT_MAX_PAIRS):
+    """
+    Finds product pairs that are often bought in the same basket
+
+    Parameters:
+    - basket_by: "customer_date" (one basket per customer per day)
+      or "customer" (one basket per customer)
+    - min_support: minimum share of baskets containing the pair
+    - min_count: minimum number of baskets containing the pair
+    - top_n: number of pairs to return (None = all that pass pruning)
+    - max_pairs: pair counters held at once before pruning (bounds the
+      memory of pass 2; smaller values mean more sweeps over the baskets)
+
+    Returns:
+    list of dictionaries sorted by count, then lift:
+    {"products": (A, B), "count", "support",
+     "confidence_a_to_b", "confidence_b_to_a", "lift"}
+    """
+
+    baskets, product_names = build_baskets(transactions, basket_by)
+    basket_count = len(baskets)
+    if basket_count == 0:
+        return []
+
+    threshold = max(min_count, math.ceil(min_support * basket_count))
+
+    # Pass 1: product support, prune infrequent products
+    item_counts = [0] * len(product_names)
+    for basket in baskets:
+        for code in basket:
+            item_counts[code] += 1
+
+    frequent = {code for code, count in enumerate(item_counts) if count >= threshold}
+
+    # Baskets reduced to their sorted frequent products (pairs need two)
+    frequent_baskets = []
+    for basket in baskets:
+        items = sorted(code for code in basket if code in frequent)
+        if len(items) >= 2:
+            frequent_baskets.append(items)
+
+    # Pass 2: sparse pair counts over frequent products only, one slice
+    # of first products per sweep, pruned before the next slice
+    # (pair key = a * product_count + b with a < b)
+    width = len(product_names)
+    kept = {}
+
+    for first_products in _pair_slices(sorted(frequent), max_pairs):
+        pair_counts = {}
+
+        for items in frequent_baskets:
+            for position, a in enumerate(items):
+                if a not in first_products:
+                    continue
+                base = a * width
+                for b in items[position + 1:]:
+                    key = base + b
+                    pair_counts[key] = pair_counts.get(key, 0) + 1
+
+        for key, count in pair_counts.items():
+            if count >= threshold:
+                kept[key] = count
+
+    # Compute metrics for the pairs that passed pruning
+    pairs = []
+    for key, count in kept.items():
+        a, b = divmod(key, width)
+        count_a = item_counts[a]
+        count_b = item_counts[b]
+
+        pairs.append({
+            "products": (product_names[a], product_names[b]),
+            "count": count,
+            "support": round(count / basket_count, 4),
+            "confidence_a_to_b": round(count / count_a, 4),
+            "confidence_b_to_a": round(count / count_b, 4),
+            "lift": round(count * basket_count / (count_a * count_b), 4)
+        })
+
+    pairs.sort(key=lambda pair: (pair["count"], pair["lift"]), reverse=True)
+
+    return pairs if top_n is None else pairs[:top_n]
@@ -0,0 +1,220 @@
+"""
+File: memo.py
+Purpose: Versioned memoization of analysis results
+
+Results are keyed on a dataset version (a content hash of the
+transactions plus the filter parameters that produced them), the
+analysis name and its extra arguments. The in-memory tier evicts least
+recently used entries past a size limit; an optional on-disk tier
+(pickle files) lets repeated runs over the same data reuse results.
+The disk tier is bounded too (least recently used files are deleted),
+and its keys include a code version (a hash of the analysis sources),
+so results computed by older code are never read back.
+
+Cached results are shared between callers and must not be modified.
+"""
+import glob
+import hashlib
+import os
+import pickle
+from collections import OrderedDict
+
+from utils.file_handler import EncodedTransactions
+from utils.money import price_paise
+
+
+# Fields hashed into the dataset version (in this order)
+VERSION_FIELDS = ("TransactionID", "Date", "ProductID", "ProductName",
+                  "Quantity", "CustomerID", "Region")
+
+
+def dataset_version(transactions, **filters):
+    """
+    Computes a version string for a list of transactions
+
+    The hash covers every row's fields (money as exact paise) in order,
+    plus the given filter parameters, e.g.
+    dataset_version(rows, region="North", min_amount=None)
+
+    An EncodedTransactions view is hashed from its code columns and
+    lookup lists instead of decoded rows (a different but equally
+    content-based version).
+    """
+
+    digest = hashlib.sha256()
+
+    if isinstance(transactions, EncodedTransactions):
+        table = transactions.to_table()
+        digest.update("\n".join(table["columns"]["TransactionID"]).encode("utf-8"))
+        for column, values in sorted(table["columns"].items()):
+            if column != "TransactionID":
+                digest.update(f"\n{column}:".encode("utf-8") + values.tobytes())
+        digest.update(repr(sorted(table["lookups"].items())).encode("utf-8"))
+    else:
+        for txn in transactions:
+            row = "|".join(str(txn[field]) for field in VERSION_FIELDS)
+            digest.update(f"{row}|{price_paise(txn)}\n".encode("utf-8"))
+
+    digest.update(repr(sorted(filters.items())).encode("utf-8"))
+
+    return digest.hexdigest()[:32]
+
+
+def code_version():
+    """
+    Hashes the source of main.py and the utils package
+
+    Returns:
+    short hex string that changes whenever the analysis code changes
+    """
+
+    package_dir = os.path.dirname(os.path.abspath(__file__))
+    paths = sorted(glob.glob(os.path.join(package_dir, "*.py")))
+    paths.append(os.path.join(os.path.dirname(package_dir), "main.py"))
+
+    digest = hashlib.sha256()
+    for path in paths:
+        try:
+            with open(path, "rb") as file:
+                digest.update(os.path.basename(path).encode("utf-8") + b"\0" + file.read())
+        except OSError:
+            continue
+
+    return digest.hexdigest()[:16]
+
+
+class ResultCache:
+    """
+    LRU cache of analysis results with an optional disk tier
+
+    Parameters:
+    - max_entries: in-memory entries kept before evicting the oldest
+    - disk_dir: optional directory for the persistent tier
+    - max_disk_entries: result files kept on disk; the least recently
+      used ones are deleted past it
+    - version: code version mixed into the disk keys (default:
+      code_version())
+    """
+
+    def __init__(self, max_entries=128, disk_dir=None, max_disk_entries=256, version=None):
+        self.max_entries = max_entries
+        self.disk_dir = disk_dir
+        self.max_disk_entries = max_disk_entries
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.version = version
+
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+            if self.version is None:
+                self.version = code_version()
+
+    def _disk_path(self, key):
+        name = hashlib.sha256(repr((self.version, key)).encode("utf-8")).hexdigest()
+        return os.path.join(self.disk_dir, name + ".pkl")
+
+    def _evict_disk(self):
+        """
+        Deletes the least recently used result files past max_disk_entries
+        (hits refresh a file's modification time)
+        """
+
+        paths = glob.glob(os.path.join(self.disk_dir, "*.pkl"))
+        if len(paths) <= self.max_disk_entries:
+            return
+
+        def last_used(path):
+            try:
+                return os.path.getmtime(path)
+            except OSError:
+                return 0.0
+
+        paths.sort(key=last_used)
+        for path in paths[:len(paths) - self.max_disk_entries]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def _remember(self, key, value):
+        self.entries[key] = value
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def get_or_compute(self, version, name, compute, *args, **kwargs):
+        """
+        Returns the cached result for (version, name, args, kwargs),
+        calling compute(*args, **kwargs) on a miss
+
+        `args`/`kwargs` must have stable reprs (numbers, strings); the
+        transactions themselves are represented by `version`.
+        """
+
+        key = (version, name, args, tuple(sorted(kwargs.items())))
+
+        # Memory tier
+        if key in self.entries:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return self.entries[key]
+
+        # Disk tier
+        if self.disk_dir:
+            path = self._disk_path(key)
+            if os.path.exists(path):
+                try:
+                    with open(path, "rb") as file:
+                        value = pickle.load(file)
+                except (OSError, pickle.UnpicklingError, EOFError):
+                    value = None
+                else:
+                    self.hits += 1
+                    self._remember(key, value)
+                    try:
+                        os.utime(path)
+                    except OSError:
+                        pass
+                    return value
+
+        # Miss: compute and store in both tiers
+        self.misses += 1
+        value = compute(*args, **kwargs)
+        self._remember(key, value)
+
+        if self.disk_dir:
+            temp_path = self._disk_path(key) + ".tmp"
+            with open(temp_path, "wb") as file:
+                pickle.dump(value, file, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temp_path, self._disk_path(key))
+            self._evict_disk()
+
+        return value
+
+    def clear(self):
+        """
+        Empties the in-memory tier (disk entries are kept)
+        """
+
+        self.entries.clear()
+
+
+def cached_call(cache, version, func, transactions, *args, **kwargs):
+    """
+    Calls func(transactions, *args, **kwargs) through the cache
+
+    With cache=None this is a plain call, so callers can make caching
+    optional without branching.
+    """
+
+    if cache is None:
+        return func(transactions, *args, **kwargs)
+
+    return cache.get_or_compute(
+        version,
+        func.__name__,
+        lambda *a, **k: func(transactions, *a, **k),
+        *args,
+        **kwargs
+    )
@@ -0,0 +1,149 @@
+"""
+File: money.py
+Purpose: Fixed-point money helpers. Amounts are carried as integer paise
+         (1 rupee = 100 paise) from parsing through aggregation, and only
+         converted to rupees when results are returned or rendered.
+"""
+from decimal import Decimal, DecimalException, ROUND_HALF_UP
+
+
+PAISE_PER_RUPEE = 100
+
+# Largest amount a price column can hold (SQLite INTEGER / array "q")
+MAX_PAISE = 2 ** 63 - 1
+
+
+def _check_range(paise, value):
+    """
+    Returns paise, or raises ValueError if it does not fit a price column
+    """
+
+    if -MAX_PAISE <= paise <= MAX_PAISE:
+        return paise
+    raise ValueError(f"money amount out of range: {value!r}")
+
+
+def parse_paise(text):
+    """
+    Converts a cleaned price string into integer paise
+
+    Example: "1916" -> 191600, "45.5" -> 4550
+
+    Raises ValueError if the text is not a valid number or is out of range
+    """
+
+    text = text.strip()
+
+    # Fast path: plain integer rupees
+    if text.isdigit():
+        return _check_range(int(text) * PAISE_PER_RUPEE, text)
+
+    whole, dot, fraction = text.partition(".")
+    digits = whole.lstrip("+-")
+
+    # Common path: up to two decimal places, no exponent
+    if dot and len(fraction) <= 2 and fraction.isdigit() and (digits == "" or digits.isdigit()):
+        sign = -1 if whole.startswith("-") else 1
+        paise = int(digits or "0") * PAISE_PER_RUPEE + int(fraction.ljust(2, "0"))
+        return _check_range(sign * paise, text)
+
+    # Anything else (more decimals, exponents, signs): exact decimal rounding
+    return _decimal_to_paise(text, text)
+
+
+def _decimal_to_paise(text, original):
+    """
+    Rounds a decimal rupee string to paise; every decimal error (bad
+    syntax, overflow, too many digits) becomes a ValueError
+    """
+
+    try:
+        value = Decimal(text)
+        if not value.is_finite():
+            raise ValueError(f"could not convert string to money: {original!r}")
+        paise = int(value.scaleb(2).quantize(Decimal(1), rounding=ROUND_HALF_UP))
+    except DecimalException:
+        raise ValueError(f"could not convert string to money: {original!r}") from None
+
+    return _check_range(paise, original)
+
+
+def to_paise(value):
+    """
+    Converts an int, float or string rupee amount into integer paise
+
+    Raises ValueError for non-finite or out-of-range amounts
+    """
+
+    if isinstance(value, str):
+        return parse_paise(value.replace(",", ""))
+
+    if isinstance(value, int):
+        return _check_range(value * PAISE_PER_RUPEE, value)
+
+    return _decimal_to_paise(repr(value), value)
+
+
+def price_paise(txn):
+    """
+    Returns the unit price of a transaction in paise
+
+    Uses the exact "UnitPricePaise" field set by parse_transactions(),
+    falling back to converting "UnitPrice" for hand-built records.
+    """
+
+    paise = txn.get("UnitPricePaise")
+    if paise is None:
+        paise = to_paise(txn["UnitPrice"])
+    return paise
+
+
+def amount_paise(txn):
+    """
+    Returns Quantity * UnitPrice of a transaction in paise
+    """
+
+    return txn["Quantity"] * price_paise(txn)
+
+
+def divide_paise(total, count):
+    """
+    Integer division of a paise amount, rounded half up
+
+    Used for averages so they stay in exact paise.
+    """
+
+    if count == 0:
+        return 0
+
+    quotient, remainder = divmod(total, count)
+    if remainder * 2 >= count:
+        quotient += 1
+    return quotient
+
+
+def paise_to_rupees(paise):
+    """
+    Converts integer paise to a float rupee value for output
+    """
+
+    return paise / PAISE_PER_RUPEE
+
+
+def format_rupees(paise, decimals=2):
+    """
+    Renders integer paise as a grouped rupee string without float rounding
+
+    Example: format_rupees(352780800) -> "3,527,808.00"
+             format_rupees(4550, 0)   -> "46"
+    """
+
+    sign = "-" if paise < 0 else ""
+    paise = abs(paise)
+
+    if decimals == 0:
+        rupees = (paise + PAISE_PER_RUPEE // 2) // PAISE_PER_RUPEE
+        return f"{sign}{rupees:,}"
+
+    rupees, fraction = divmod(paise, PAISE_PER_RUPEE)
+    return f"{sign}{rupees:,}.{fraction:02d}"
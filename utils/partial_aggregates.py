@@ -0,0 +1,532 @@
+"""
+File: partial_aggregates.py
+Purpose: Mergeable partial-aggregate snapshots for map-reduce over shards
+
+Each node builds a partial from its own shard, saves it as a small JSON
+snapshot, and a reducer merges the snapshots and finalizes them into the
+same output shapes as utils/data_processor.py.
+
+A partial only holds raw sums, counts, product bitmaps and cardinality
+sketches (money in integer paise):
+- each customer's products are a bitmap over the partial's own product
+  list, remapped to the merged list when partials are merged
+- each day's distinct customers are a HyperLogLog sketch, so daily
+  "unique_customers" is an estimate (about 1.6% standard error; exact
+  for the small counts where linear counting applies)
+Per-customer and per-product sums stay exact, since the customer and
+product analyses report them individually.
+
+merge_partials() is associative and commutative (sums are added, bitmaps
+OR-ed, sketch registers max-ed). Percentages, averages, sorting and top-n
+truncation happen in the finalize_* functions. Ties are broken by key so
+the result does not depend on shard order.
+
+Usage:
+python -m utils.partial_aggregates build data/sales_data.txt shard1.json
+python -m utils.partial_aggregates reduce shard1.json shard2.json ... > result.json
+"""
+import base64
+import hashlib
+import json
+import math
+import sys
+
+from utils.data_processor import popcount, decode_product_mask
+from utils.money import amount_paise, divide_paise, paise_to_rupees
+
+
+SNAPSHOT_VERSION = 2
+
+# Field order of each section's stats in a snapshot file
+SECTION_FIELDS = {
+    "regions": ("sales_paise", "count"),
+    "products": ("quantity", "revenue_paise"),
+    "customers": ("spent_paise", "count", "products_mask"),
+    "daily": ("revenue_paise", "count", "customers")
+}
+
+
+class HyperLogLog:
+    """
+    HyperLogLog cardinality sketch with sparse storage
+
+    Registers are kept as a dictionary {register index: rank}, so a
+    sketch of a few values stays small; snapshot files store it sparse
+    or as a dense base64 string, whichever is shorter.
+
+    Parameters:
+    - registers: optional {index: rank} to start from
+    """
+
+    PRECISION = 12
+    SIZE = 1 << PRECISION
+
+    def __init__(self, registers=None):
+        self.registers = dict(registers or {})
+
+    def add(self, value):
+        digest = hashlib.blake2b(str(value).encode("utf-8"), digest_size=8).digest()
+        hashed = int.from_bytes(digest, "big")
+
+        index = hashed >> (64 - self.PRECISION)
+        rest = hashed & ((1 << (64 - self.PRECISION)) - 1)
+        rank = (64 - self.PRECISION) - rest.bit_length() + 1
+
+        if rank > self.registers.get(index, 0):
+            self.registers[index] = rank
+
+    def update(self, other):
+        """
+        Merges another sketch into this one (register-wise maximum)
+        """
+
+        registers = self.registers
+        for index, rank in other.registers.items():
+            if rank > registers.get(index, 0):
+                registers[index] = rank
+
+    def copy(self):
+        return HyperLogLog(self.registers)
+
+    def __len__(self):
+        """
+        Estimated number of distinct values added
+        """
+
+        size = self.SIZE
+        zeros = size - len(self.registers)
+
+        # Small range: linear counting over the empty registers
+        if zeros:
+            estimate = size * math.log(size / zeros)
+            if estimate <= 2.5 * size:
+                return round(estimate)
+
+        alpha = 0.7213 / (1 + 1.079 / size)
+        harmonic = zeros + sum(2.0 ** -rank for rank in self.registers.values())
+        return round(alpha * size * size / harmonic)
+
+    def __eq__(self, other):
+        return isinstance(other, HyperLogLog) and self.registers == other.registers
+
+    def to_text(self):
+        """
+        Encodes the registers as "s" + 5 hex digits per set register,
+        or "d" + base64 of all registers when that is shorter
+        """
+
+        if len(self.registers) * 5 < self.SIZE * 4 // 3:
+            return "s" + "".join(f"{index:03x}{rank:02x}" for index, rank in sorted(self.registers.items()))
+
+        dense = bytes(self.registers.get(index, 0) for index in range(self.SIZE))
+        return "d" + base64.b64encode(dense).decode("ascii")
+
+    @classmethod
+    def from_text(cls, text):
+        if text.startswith("d"):
+            dense = base64.b64decode(text[1:])
+            return cls({index: rank for index, rank in enumerate(dense) if rank})
+
+        return cls({
+            int(text[i:i + 3], 16): int(text[i + 3:i + 5], 16)
+            for i in range(1, len(text), 5)
+        })
+
+
+def empty_partial():
+    """
+    Returns an empty partial aggregate (the identity element of merge)
+    """
+
+    return {
+        "version": SNAPSHOT_VERSION,
+        "row_count": 0,
+        "total_paise": 0,
+        "product_names": [],  # bit index -> product name
+        "regions": {},     # region -> {"sales_paise", "count"}
+        "products": {},    # product name -> {"quantity", "revenue_paise"}
+        "customers": {},   # customer id -> {"spent_paise", "count", "products_mask"}
+        "daily": {}        # date -> {"revenue_paise", "count", "customers": HyperLogLog}
+    }
+
+
+## Map side ##
+def build_partial(transactions):
+    """
+    Aggregates one shard of validated transactions into a partial
+
+    Returns:
+    partial aggregate dictionary (see empty_partial())
+    """
+
+    partial = empty_partial()
+    product_names = partial["product_names"]
+    regions = partial["regions"]
+    products = partial["products"]
+    customers = partial["customers"]
+    daily = partial["daily"]
+    product_codes = {}
+
+    for txn in transactions:
+        amount = amount_paise(txn)
+        partial["row_count"] += 1
+        partial["total_paise"] += amount
+
+        # Region sums
+        region = regions.setdefault(txn["Region"], {"sales_paise": 0, "count": 0})
+        region["sales_paise"] += amount
+        region["count"] += 1
+
+        # Product sums (and the product's bit, in first-seen order)
+        name = txn["ProductName"]
+        product = products.get(name)
+        if product is None:
+            product = products[name] = {"quantity": 0, "revenue_paise": 0}
+            product_codes[name] = len(product_names)
+            product_names.append(name)
+        product["quantity"] += txn["Quantity"]
+        product["revenue_paise"] += amount
+
+        # Customer sums and product bitmap
+        customer = customers.setdefault(
+            txn["CustomerID"], {"spent_paise": 0, "count": 0, "products_mask": 0}
+        )
+        customer["spent_paise"] += amount
+        customer["count"] += 1
+        customer["products_mask"] |= 1 << product_codes[name]
+
+        # Daily sums and customer sketch
+        day = daily.get(txn["Date"])
+        if day is None:
+            day = daily[txn["Date"]] = {"revenue_paise": 0, "count": 0, "customers": HyperLogLog()}
+        day["revenue_paise"] += amount
+        day["count"] += 1
+        day["customers"].add(txn["CustomerID"])
+
+    return partial
+
+
+## Reduce side ##
+def _remap_mask(mask, remap):
+    """
+    Moves every set bit i of a product bitmap to bit remap[i]
+    """
+
+    remapped = 0
+    while mask:
+        low = mask & -mask
+        remapped |= 1 << remap[low.bit_length() - 1]
+        mask ^= low
+    return remapped
+
+
+def _merge_groups(target, source, remap=None):
+    """
+    Adds every group of `source` into `target` (ints are summed, sketches
+    merged, product bitmaps remapped through `remap` and OR-ed); sketches
+    are copied so inputs are never shared
+    """
+
+    for key, stats in source.items():
+        existing = target.get(key)
+
+        if existing is None:
+            existing = target[key] = {}
+
+        for field, value in stats.items():
+            if field == "products_mask":
+                if remap is not None:
+                    value = _remap_mask(value, remap)
+                existing[field] = existing.get(field, 0) | value
+            elif isinstance(value, HyperLogLog):
+                if field in existing:
+                    existing[field].update(value)
+                else:
+                    existing[field] = value.copy()
+            else:
+                existing[field] = existing.get(field, 0) + value
+
+
+def merge_partials(*partials):
+    """
+    Merges any number of partials into a new partial
+
+    The inputs are not modified. merge(a, merge(b, c)) == merge(merge(a, b), c).
+    """
+
+    merged = empty_partial()
+    merged_names = merged["product_names"]
+    merged_codes = {}
+
+    for partial in partials:
+        if partial.get("version") != SNAPSHOT_VERSION:
+            raise ValueError(f"Unsupported snapshot version: {partial.get('version')}")
+
+        merged["row_count"] += partial["row_count"]
+        merged["total_paise"] += partial["total_paise"]
+
+        # Map this partial's product bits onto the merged product list
+        remap = []
+        for name in partial["product_names"]:
+            if name not in merged_codes:
+                merged_codes[name] = len(merged_names)
+                merged_names.append(name)
+            remap.append(merged_codes[name])
+        if remap == list(range(len(remap))):
+            remap = None
+
+        _merge_groups(merged["regions"], partial["regions"])
+        _merge_groups(merged["products"], partial["products"])
+        _merge_groups(merged["customers"], partial["customers"], remap)
+        _merge_groups(merged["daily"], partial["daily"])
+
+    return merged
+
+
+## Snapshot files ##
+def save_partial(partial, filename):
+    """
+    Writes a partial to a JSON snapshot file
+
+    Each group's stats are stored as a list in SECTION_FIELDS order, and
+    sketches in their compact text form.
+    """
+
+    snapshot = {key: value for key, value in partial.items() if key not in SECTION_FIELDS}
+    for section, fields in SECTION_FIELDS.items():
+        snapshot[section] = {
+            key: [
+                stats[field].to_text() if isinstance(stats[field], HyperLogLog) else stats[field]
+                for field in fields
+            ]
+            for key, stats in partial[section].items()
+        }
+
+    with open(filename, "w", encoding="utf-8") as file:
+        json.dump(snapshot, file, separators=(",", ":"))
+
+
+def load_partial(filename):
+    """
+    Reads a JSON snapshot file back into a partial
+    """
+
+    with open(filename, "r", encoding="utf-8") as file:
+        snapshot = json.load(file)
+
+    if snapshot.get("version") != SNAPSHOT_VERSION:
+        raise ValueError(f"Unsupported snapshot version: {snapshot.get('version')}")
+
+    partial = snapshot
+    for section, fields in SECTION_FIELDS.items():
+        partial[section] = {
+            key: dict(zip(fields, values))
+            for key, values in snapshot[section].items()
+        }
+
+    # Restore the text-encoded sketches
+    for stats in partial["daily"].values():
+        stats["customers"] = HyperLogLog.from_text(stats["customers"])
+
+    return partial
+
+
+## Finalize into the data_processor output shapes ##
+def finalize_total_revenue(partial):
+    """
+    Returns:
+    float: total revenue (same as calculate_total_revenue())
+    """
+
+    return paise_to_rupees(partial["total_paise"])
+
+
+def finalize_region_wise_sales(partial):
+    """
+    Returns:
+    dictionary shaped like region_wise_sales()
+    """
+
+    total_paise = partial["total_paise"]
+
+    ordered = sorted(
+        partial["regions"].items(),
+        key=lambda item: (-item[1]["sales_paise"], item[0])
+    )
+
+    return {
+        region: {
+            "total_sales": paise_to_rupees(stats["sales_paise"]),
+            "total_sales_paise": stats["sales_paise"],
+            "transaction_count": stats["count"],
+            "percentage": round((stats["sales_paise"] / total_paise) * 100, 2)
+        }
+        for region, stats in ordered
+    }
+
+
+def finalize_top_selling_products(partial, n=5):
+    """
+    Returns:
+    list of tuples shaped like top_selling_products()
+    """
+
+    ordered = sorted(
+        partial["products"].items(),
+        key=lambda item: (-item[1]["quantity"], item[0])
+    )
+
+    return [
+        (name, stats["quantity"], paise_to_rupees(stats["revenue_paise"]))
+        for name, stats in ordered[:n]
+    ]
+
+
+def finalize_product_revenue_paise(partial):
+    """
+    Returns:
+    dictionary shaped like product_revenue_paise()
+    """
+
+    return {name: stats["revenue_paise"] for name, stats in partial["products"].items()}
+
+
+def finalize_customer_analysis(partial, product_codes=None, include_product_list=True):
+    """
+    Returns:
+    dictionary shaped like customer_analysis(); product bits are assigned
+    in sorted product-name order (filled into `product_codes` if given)
+    """
+
+    if product_codes is None:
+        product_codes = {}
+    for name in sorted(partial["products"]):
+        product_codes.setdefault(name, len(product_codes))
+
+    # Partial bit index -> code in product_codes
+    remap = [product_codes[name] for name in partial["product_names"]]
+
+    ordered = sorted(
+        partial["customers"].items(),
+        key=lambda item: (-item[1]["spent_paise"], item[0])
+    )
+
+    customer_stats = {}
+    for customer_id, stats in ordered:
+        mask = _remap_mask(stats["products_mask"], remap)
+
+        customer_stats[customer_id] = {
+            "total_spent": paise_to_rupees(stats["spent_paise"]),
+            "total_spent_paise": stats["spent_paise"],
+            "purchase_count": stats["count"],
+            "products_mask": mask,
+            "avg_order_value": paise_to_rupees(
+                divide_paise(stats["spent_paise"], stats["count"])
+            ),
+            "distinct_products": popcount(mask)
+        }
+        if include_product_list:
+            customer_stats[customer_id]["products_bought"] = decode_product_mask(mask, product_codes)
+
+    return customer_stats
+
+
+def finalize_daily_sales_trend(partial):
+    """
+    Returns:
+    dictionary shaped like daily_sales_trend() ("unique_customers" is
+    the sketch estimate)
+    """
+
+    return {
+        date: {
+            "revenue": paise_to_rupees(stats["revenue_paise"]),
+            "revenue_paise": stats["revenue_paise"],
+            "transaction_count": stats["count"],
+            "unique_customers": len(stats["customers"])
+        }
+        for date, stats in sorted(partial["daily"].items())
+    }
+
+
+def finalize_peak_sales_day(partial):
+    """
+    Returns:
+    tuple shaped like find_peak_sales_day()
+    """
+
+    peak = (None, 0.0, 0)
+    max_revenue = 0
+
+    for date, stats in sorted(partial["daily"].items()):
+        if stats["revenue_paise"] > max_revenue:
+            max_revenue = stats["revenue_paise"]
+            peak = (date, paise_to_rupees(max_revenue), stats["count"])
+
+    return peak
+
+
+def finalize_low_performing_products(partial, threshold=10):
+    """
+    Returns:
+    list of tuples shaped like low_performing_products()
+    """
+
+    low_products = [
+        (name, stats["quantity"], paise_to_rupees(stats["revenue_paise"]))
+        for name, stats in sorted(partial["products"].items())
+        if stats["quantity"] < threshold
+    ]
+    low_products.sort(key=lambda x: x[1])
+
+    return low_products
+
+
+def finalize_partial(partial):
+    """
+    Finalizes every analysis at once
+
+    Returns:
+    dictionary keyed like main.analyze_sales()
+    """
+
+    return {
+        "total_revenue": finalize_total_revenue(partial),
+        "region_sales": finalize_region_wise_sales(partial),
+        "top_products": finalize_top_selling_products(partial),
+        "product_revenue_paise": finalize_product_revenue_paise(partial),
+        "customers": finalize_customer_analysis(partial),
+        "daily_trend": finalize_daily_sales_trend(partial),
+        "peak_day": finalize_peak_sales_day(partial),
+        "low_performers": finalize_low_performing_products(partial)
+    }
+
+
+## Command line ##
+def _cli(argv):
+    """
+    build <sales_file> <snapshot.json>   : map one shard to a snapshot
+    reduce <snapshot.json> ...           : merge snapshots, print results
+    """
+
+    if len(argv) == 3 and argv[0] == "build":
+        from utils.file_handler import read_sales_data, parse_transactions, validate_and_filter
+
+        transactions = parse_transactions(read_sales_data(argv[1]))
+        valid_transactions, _, _ = validate_and_filter(transactions)
+        save_partial(build_partial(valid_transactions), argv[2])
+        print(f"Snapshot saved to {argv[2]}", file=sys.stderr)
+        return 0
+
+    if len(argv) >= 2 and argv[0] == "reduce":
+        merged = merge_partials(*(load_partial(name) for name in argv[1:]))
+        json.dump(finalize_partial(merged), sys.stdout, indent=2)
+        print()
+        return 0
+
+    print(_cli.__doc__, file=sys.stderr)
+    return 2
+
+
+if __name__ == "__main__":
+    sys.exit(_cli(sys.argv[1:]))
@@ -0,0 +1,410 @@
+"""
+File: pipeline.py
+Purpose: Small DAG scheduler for the pipeline stages
+
+Each stage is a function registered with the names of the values it
+reads (inputs) and produces (outputs). The scheduler derives the
+dependency graph from those names, then runs every stage whose inputs
+are ready on a thread pool, so independent stages (e.g. the analysis and
+the catalog fetch) overlap.
+
+Stages run on threads rather than processes: they share large in-memory
+transaction lists, and the slow stages wait on I/O (network, disk).
+
+Console output of concurrent stages is kept in registration order:
+while stages run, sys.stdout is replaced by an OrderedConsole. The
+earliest unfinished stage writes straight through; later stages are
+buffered and printed as a whole once every stage before them finished,
+so lines never interleave and steps print in order.
+
+After a run, summary() lists per-stage timings and the critical path:
+the chain of dependent stages with the largest total duration, which
+bounds the wall time no matter how many workers are used.
+"""
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+
+class Stage:
+    """
+    One registered stage
+
+    - func(**inputs) returns the single output value, or a tuple with
+      one value per output
+    - after: names of stages that must finish first even though no
+      value is passed (ordering only)
+    - cache_key: name of an input whose value versions the stage's
+      inputs; with a pipeline cache the outputs are reused per version
+    - title: optional line printed by the scheduler when the stage
+      starts, also when its outputs come from the cache
+    """
+
+    def __init__(self, name, func, inputs=(), outputs=(), after=(), cache_key=None, title=None):
+        self.name = name
+        self.func = func
+        self.inputs = tuple(inputs)
+        self.outputs = tuple(outputs)
+        self.after = tuple(after)
+        self.cache_key = cache_key
+        self.title = title
+
+    def __repr__(self):
+        return f"Stage({self.name!r}, inputs={self.inputs}, outputs={self.outputs})"
+
+
+class OrderedConsole:
+    """
+    sys.stdout stand-in that keeps the output of concurrent stages apart
+
+    Writes of the earliest unfinished stage (in `order`) go straight to
+    the stream; writes of later stages are buffered until every stage
+    before them has finished. Writes from threads not running a stage
+    go straight through.
+    """
+
+    def __init__(self, stream, order):
+        self.stream = stream
+        self.order = list(order)
+        self.buffers = {name: [] for name in self.order}
+        self.finished = set()
+        self.head = 0
+        self.lock = threading.RLock()
+        self.local = threading.local()
+
+    def bind(self, name):
+        """
+        Marks the current thread as running stage `name` (None to unbind)
+        """
+
+        self.local.stage = name
+
+    def write(self, text):
+        name = getattr(self.local, "stage", None)
+
+        with self.lock:
+            if name is None or name not in self.buffers or self._is_head(name):
+                self.stream.write(text)
+                self.stream.flush()
+            else:
+                self.buffers[name].append(text)
+
+        return len(text)
+
+    def flush(self):
+        with self.lock:
+            self.stream.flush()
+
+    def _is_head(self, name):
+        return self.head < len(self.order) and self.order[self.head] == name
+
+    def finish(self, name):
+        """
+        Marks a stage as finished and prints the buffered output of the
+        stages that are now first in line
+        """
+
+        with self.lock:
+            self.finished.add(name)
+            while self.head < len(self.order) and self.order[self.head] in self.finished:
+                self.head += 1
+                if self.head < len(self.order):
+                    self._release(self.order[self.head])
+
+    def _release(self, name):
+        buffered = self.buffers[name]
+        if buffered:
+            self.stream.write("".join(buffered))
+            self.stream.flush()
+            buffered.clear()
+
+    def close(self):
+        """
+        Prints whatever is still buffered (e.g. after a failed run)
+        """
+
+        with self.lock:
+            for name in self.order:
+                self._release(name)
+
+    def __getattr__(self, attribute):
+        # encoding, isatty, fileno, ... of the real stream
+        return getattr(self.stream, attribute)
+
+
+class Pipeline:
+    """
+    Registry and scheduler of stages
+
+    Parameters:
+    - max_workers: threads running stages concurrently
+    - cache: optional ResultCache (utils/memo.py) for stages with a
+      cache_key
+    """
+
+    def __init__(self, max_workers=4, cache=None):
+        self.max_workers = max_workers
+        self.cache = cache
+        self.stages = {}
+        self.producers = {}
+        self.timings = {}
+        self.last_dependencies = {}
+        self.wall_seconds = 0.0
+
+    def add(self, name, func, inputs=(), outputs=(), after=(), cache_key=None, title=None):
+        """
+        Registers a stage (see Stage); output names must be unique
+        """
+
+        if name in self.stages:
+            raise ValueError(f"Duplicate stage name: {name}")
+
+        stage = Stage(name, func, inputs, outputs, after, cache_key, title)
+
+        if cache_key is not None and cache_key not in stage.inputs:
+            raise ValueError(f"Stage {name}: cache_key {cache_key!r} must be one of its inputs")
+
+        for output in stage.outputs:
+            if output in self.producers:
+                raise ValueError(f"Output {output!r} of stage {name} is already produced by "
+                                 f"stage {self.producers[output]}")
+            self.producers[output] = name
+
+        self.stages[name] = stage
+        return stage
+
+    def stage(self, name=None, inputs=(), outputs=(), after=(), cache_key=None, title=None):
+        """
+        Decorator form of add(); the stage name defaults to the function name
+        """
+
+        def register(func):
+            self.add(name or func.__name__, func, inputs, outputs, after, cache_key, title)
+            return func
+
+        return register
+
+    def dependencies(self, initial=()):
+        """
+        Returns {stage: set of stages it waits for}
+
+        Raises:
+        ValueError for unknown inputs/stages or dependency cycles
+        """
+
+        dependencies = {}
+
+        for stage in self.stages.values():
+            needed = set()
+
+            for value in stage.inputs:
+                if value in self.producers:
+                    needed.add(self.producers[value])
+                elif value not in initial:
+                    raise ValueError(f"Stage {stage.name}: no stage produces input {value!r}")
+
+            for other in stage.after:
+                if other not in self.stages:
+                    raise ValueError(f"Stage {stage.name}: unknown stage {other!r} in after")
+                needed.add(other)
+
+            dependencies[stage.name] = needed
+
+        # Cycle check (Kahn's algorithm)
+        remaining = {name: set(needed) for name, needed in dependencies.items()}
+        while remaining:
+            ready = [name for name, needed in remaining.items() if not needed]
+            if not ready:
+                raise ValueError(f"Dependency cycle between stages: {', '.join(sorted(remaining))}")
+            for name in ready:
+                del remaining[name]
+            for needed in remaining.values():
+                needed.difference_update(ready)
+
+        return dependencies
+
+    def _execute(self, stage, kwargs, console):
+        """
+        Runs one stage (through the cache when it has a cache_key) with
+        its console output routed through `console`
+
+        Returns:
+        (outputs dictionary, cached flag)
+        """
+
+        console.bind(stage.name)
+        try:
+            if stage.title:
+                print(stage.title)
+
+            if self.cache is not None and stage.cache_key is not None:
+                hits = self.cache.hits
+                result = self.cache.get_or_compute(
+                    kwargs[stage.cache_key], f"stage:{stage.name}",
+                    lambda: stage.func(**kwargs)
+                )
+                cached = self.cache.hits > hits
+            else:
+                result = stage.func(**kwargs)
+                cached = False
+
+            if cached:
+                print(f"✓ Reused cached {stage.name} results")
+        finally:
+            console.bind(None)
+
+        if len(stage.outputs) == 1:
+            result = (result,)
+        elif not stage.outputs:
+            result = ()
+
+        if len(result) != len(stage.outputs):
+            raise ValueError(f"Stage {stage.name} returned {len(result)} values "
+                             f"for outputs {stage.outputs}")
+
+        return dict(zip(stage.outputs, result)), cached
+
+    def run(self, initial=None, skip=()):
+        """
+        Runs all stages, each as soon as its dependencies have finished
+
+        Parameters:
+        - initial: dictionary of values available before any stage runs
+        - skip: stage names not to run; their outputs are set to None
+
+        Returns:
+        dictionary of all values (initial + stage outputs)
+
+        The first exception raised by a stage is re-raised after the
+        stages already running have finished.
+        """
+
+        values = dict(initial or {})
+        dependencies = self.dependencies(values)
+        pending = {name: set(needed) for name, needed in dependencies.items()}
+        self.last_dependencies = dependencies
+        self.timings = {}
+        run_start = time.perf_counter()
+
+        def finish(name):
+            for needed in pending.values():
+                needed.discard(name)
+
+        # Skipped stages complete immediately with None outputs
+        for name in skip:
+            if name in pending:
+                del pending[name]
+                values.update(dict.fromkeys(self.stages[name].outputs))
+                self.timings[name] = {"start": 0.0, "end": 0.0, "seconds": 0.0, "status": "skipped"}
+                finish(name)
+
+        running = {}
+        error = None
+
+        # Stage output in registration order (see OrderedConsole)
+        console = OrderedConsole(sys.stdout, [name for name in self.stages if name in pending])
+        sys.stdout = console
+
+        try:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                while pending or running:
+
+                    # Submit every stage whose dependencies are done
+                    if error is None:
+                        for name in [name for name, needed in pending.items() if not needed]:
+                            del pending[name]
+                            self.timings[name] = {"start": time.perf_counter() - run_start}
+                            stage = self.stages[name]
+                            kwargs = {value: values[value] for value in stage.inputs}
+                            running[executor.submit(self._execute, stage, kwargs, console)] = name
+
+                    if not running:
+                        break
+
+                    done, _ = wait(running, return_when=FIRST_COMPLETED)
+
+                    for future in done:
+                        name = running.pop(future)
+                        timing = self.timings[name]
+                        timing["end"] = time.perf_counter() - run_start
+                        timing["seconds"] = timing["end"] - timing["start"]
+                        console.finish(name)
+
+                        try:
+                            outputs, cached = future.result()
+                        except Exception as stage_error:
+                            timing["status"] = "failed"
+                            error = error or stage_error
+                            continue
+
+                        timing["status"] = "cached" if cached else "ok"
+                        values.update(outputs)
+                        finish(name)
+        finally:
+            sys.stdout = console.stream
+            console.close()
+
+        self.wall_seconds = time.perf_counter() - run_start
+
+        if error is not None:
+            raise error
+
+        return values
+
+    def critical_path(self):
+        """
+        Returns (list of stage names, total seconds) of the longest chain
+        of dependent stages in the last run
+        """
+
+        finish = {}
+        previous = {}
+
+        # Stages sorted by start time are in a valid dependency order
+        for name in sorted(self.timings, key=lambda n: (self.timings[n]["start"], n)):
+            if self.timings[name]["status"] in ("skipped", "failed"):
+                continue
+
+            best = None
+            for needed in self.last_dependencies.get(name, ()):
+                if needed in finish and (best is None or finish[needed] > finish[best]):
+                    best = needed
+            previous[name] = best
+            finish[name] = self.timings[name]["seconds"] + (finish[best] if best else 0.0)
+
+        if not finish:
+            return [], 0.0
+
+        name = max(finish, key=finish.get)
+        total = finish[name]
+        path = []
+        while name is not None:
+            path.append(name)
+            name = previous[name]
+
+        return path[::-1], total
+
+    def summary(self):
+        """
+        Formats per-stage timings and the critical path of the last run
+        """
+
+        lines = ["Stage timings (start -> end, seconds):"]
+
+        for name in sorted(self.timings, key=lambda n: (self.timings[n]["start"], n)):
+            timing = self.timings[name]
+            if timing["status"] == "skipped":
+                lines.append(f"  {name:<12} skipped")
+                continue
+            status = "" if timing["status"] == "ok" else f" ({timing['status']})"
+            lines.append(f"  {name:<12} {timing['start']:7.3f} -> {timing['end']:7.3f}  "
+                         f"{timing['seconds']:7.3f}{status}")
+
+        path, total = self.critical_path()
+        busy = sum(timing["seconds"] for timing in self.timings.values())
+
+        lines.append(f"Critical path: {' -> '.join(path)} ({total:.3f}s)")
+        lines.append(f"Wall time: {self.wall_seconds:.3f}s, stage time: {busy:.3f}s")
+
+        return "\n".join(lines)
@@ -0,0 +1,304 @@
+"""
+File: query_service.py
+Purpose: Long-running local query service over the loaded sales data
+
+The sales file is read, parsed, de-duplicated, validated and indexed once.
+The data_processor aggregations are then served over a small HTTP/JSON
+API. Responses are cached per query, and the cache is dropped when the
+source file changes (checked by modification time and size on every
+request). The lock only guards that check, reloads and the cache;
+queries are computed outside it on a snapshot of the loaded data.
+
+Bad parameters are answered with 400, and a missing or unreadable data
+file (e.g. while it is being rotated) with 503.
+
+Start it with:
+python main.py --serve [--port 8000]
+
+Endpoints (all GET, all accept the filters below):
+/summary, /region, /top-products?n=5, /customers?limit=20, /daily,
+/peak-day, /low-performers?threshold=10, /health
+
+Filters: region, product, customer, date_from, date_to (YYYY-MM-DD),
+min_amount, max_amount
+"""
+import bisect
+import json
+import os
+import threading
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from utils.data_processor import (
+    calculate_total_revenue,
+    region_wise_sales,
+    top_selling_products,
+    customer_analysis,
+    daily_sales_trend,
+    find_peak_sales_day,
+    low_performing_products
+)
+from utils.dedup import remove_duplicate_transactions
+from utils.file_handler import read_sales_data, parse_transactions, validate_and_filter
+from utils.money import amount_paise, parse_paise
+
+
+# Maximum number of cached query responses (least recently used evicted)
+CACHE_SIZE = 256
+
+FILTER_PARAMS = ("region", "product", "customer", "date_from", "date_to", "min_amount", "max_amount")
+
+
+class SalesDataStore:
+    """
+    Loaded and indexed sales data plus a per-query response cache
+    """
+
+    def __init__(self, filename, cache_size=CACHE_SIZE):
+        self.filename = filename
+        self.cache_size = cache_size
+        self.lock = threading.Lock()
+        self.signature = None
+        self.cache = OrderedDict()
+        self.reload()
+
+    def _file_signature(self):
+        stat = os.stat(self.filename)
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def reload(self):
+        """
+        (Re)loads the source file, rebuilds the indexes and clears the cache
+        """
+
+        signature = self._file_signature()
+        transactions = parse_transactions(read_sales_data(self.filename))
+        transactions, _ = remove_duplicate_transactions(transactions)
+        transactions, _, _ = validate_and_filter(transactions, verbose=False)
+
+        # Date-sorted list + parallel date keys for range lookups (bisect)
+        by_date = sorted(transactions, key=lambda t: t["Date"])
+        date_keys = [t["Date"] for t in by_date]
+
+        # Region index: region -> transactions (already in date order)
+        by_region = {}
+        for txn in by_date:
+            by_region.setdefault(txn["Region"], []).append(txn)
+
+        # One snapshot, replaced as a whole so running queries keep a
+        # consistent view
+        self.snapshot = (by_date, date_keys, by_region)
+        self.transactions = by_date
+        self.cache.clear()
+        self.signature = signature
+
+    def refresh_if_changed(self):
+        """
+        Reloads the data if the source file changed since the last load
+        """
+
+        if self._file_signature() != self.signature:
+            self.reload()
+
+    def select(self, filters, snapshot=None):
+        """
+        Returns the transactions matching the filters, using the region
+        index or the date index to narrow the scan first
+
+        snapshot: data snapshot to query (default: the current one)
+
+        Raises:
+        ValueError for an invalid min_amount / max_amount
+        """
+
+        transactions, date_keys, by_region = snapshot or self.snapshot
+        region = filters.get("region")
+        date_from = filters.get("date_from")
+        date_to = filters.get("date_to")
+
+        if region is not None:
+            rows = by_region.get(region, [])
+        else:
+            # Date range via binary search on the date-sorted list
+            start = bisect.bisect_left(date_keys, date_from) if date_from else 0
+            end = bisect.bisect_right(date_keys, date_to) if date_to else len(date_keys)
+            rows = transactions[start:end]
+
+        product = filters.get("product")
+        customer = filters.get("customer")
+        min_paise = _amount_param(filters, "min_amount")
+        max_paise = _amount_param(filters, "max_amount")
+
+        if not (product or customer or min_paise is not None or max_paise is not None
+                or (region is not None and (date_from or date_to))):
+            return rows
+
+        selected = []
+        for txn in rows:
+            if date_from and txn["Date"] < date_from:
+                continue
+            if date_to and txn["Date"] > date_to:
+                continue
+            if product and txn["ProductName"] != product and txn["ProductID"] != product:
+                continue
+            if customer and txn["CustomerID"] != customer:
+                continue
+            if min_paise is not None or max_paise is not None:
+                amount = amount_paise(txn)
+                if min_paise is not None and amount < min_paise:
+                    continue
+                if max_paise is not None and amount > max_paise:
+                    continue
+            selected.append(txn)
+
+        return selected
+
+    def query(self, endpoint, params):
+        """
+        Answers one query, from the cache when possible
+
+        Returns:
+        JSON-encoded response bytes
+
+        Raises:
+        KeyError for an unknown endpoint, ValueError for bad parameters,
+        OSError when the data file cannot be read
+        """
+
+        key = (endpoint, tuple(sorted(params.items())))
+
+        # Step 1: Freshness check, reload and cache lookup under the lock
+        with self.lock:
+            self.refresh_if_changed()
+
+            cached = self.cache.get(key)
+            if cached is not None:
+                self.cache.move_to_end(key)
+                return cached
+
+            snapshot = self.snapshot
+            signature = self.signature
+
+        # Step 2: Compute without the lock (other queries keep running)
+        body = json.dumps(self._compute(endpoint, params, snapshot)).encode("utf-8")
+
+        # Step 3: Cache it unless the data was reloaded in the meantime
+        with self.lock:
+            if self.signature == signature:
+                self.cache[key] = body
+                if len(self.cache) > self.cache_size:
+                    self.cache.popitem(last=False)
+
+        return body
+
+    def _compute(self, endpoint, params, snapshot=None):
+        """
+        Runs the aggregation behind one endpoint
+        """
+
+        filters = {name: params[name] for name in FILTER_PARAMS if name in params}
+        rows = self.select(filters, snapshot)
+
+        if endpoint == "/summary":
+            return {
+                "transactions": len(rows),
+                "total_revenue": calculate_total_revenue(rows)
+            }
+
+        if endpoint == "/region":
+            return region_wise_sales(rows)
+
+        if endpoint == "/top-products":
+            return top_selling_products(rows, n=int(params.get("n", 5)))
+
+        if endpoint == "/customers":
+            customers = customer_analysis(rows)
+            limit = int(params.get("limit", len(customers)))
+            return dict(list(customers.items())[:limit])
+
+        if endpoint == "/daily":
+            return daily_sales_trend(rows)
+
+        if endpoint == "/peak-day":
+            return find_peak_sales_day(rows)
+
+        if endpoint == "/low-performers":
+            return low_performing_products(rows, threshold=int(params.get("threshold", 10)))
+
+        raise KeyError(endpoint)
+
+
+def _amount_param(filters, name):
+    """
+    Parses an amount filter (rupees) into exact paise, or None if absent
+
+    Raises:
+    ValueError for values that are not finite amounts in range
+    """
+
+    if name not in filters:
+        return None
+
+    try:
+        return parse_paise(filters[name])
+    except ValueError:
+        raise ValueError(f"{name} must be an amount in rupees, got {filters[name]!r}") from None
+
+
+def _make_handler(store):
+    """
+    Builds a request handler class bound to one SalesDataStore
+    """
+
+    class QueryHandler(BaseHTTPRequestHandler):
+
+        def _send(self, status, body):
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            params = {name: values[-1] for name, values in parse_qs(url.query).items()}
+
+            if url.path == "/health":
+                self._send(200, json.dumps({"status": "ok", "records": len(store.transactions)}).encode("utf-8"))
+                return
+
+            try:
+                self._send(200, store.query(url.path, params))
+            except KeyError:
+                self._send(404, json.dumps({"error": f"Unknown endpoint: {url.path}"}).encode("utf-8"))
+            except ValueError as error:
+                self._send(400, json.dumps({"error": str(error)}).encode("utf-8"))
+            except OSError as error:
+                # Data file missing or being replaced; the client may retry
+                self._send(503, json.dumps({"error": f"Sales data unavailable: {error}"}).encode("utf-8"))
+
+        def log_message(self, format, *args):
+            # Keep the console quiet; one line per request is enough
+            print(f"{self.address_string()} {format % args}")
+
+    return QueryHandler
+
+
+def serve(filename="data/sales_data.txt", host="127.0.0.1", port=8000):
+    """
+    Loads the data once and serves queries until interrupted
+    """
+
+    store = SalesDataStore(filename)
+    server = ThreadingHTTPServer((host, port), _make_handler(store))
+
+    print(f"Loaded {len(store.transactions)} valid transactions from {filename}")
+    print(f"Serving sales queries on http://{host}:{port}/ (Ctrl+C to stop)")
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nStopping query service")
+    finally:
+        server.server_close()
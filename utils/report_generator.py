@@ -3,102 +3,136 @@ File: report_generator.py
 Purpose: Generates sales reports from cleaned transaction data
 """
 from datetime import datetime
-from collections import defaultdict
 
-def generate_sales_report(transactions, enriched_transactions, output_file="output/sales_report.txt"):
+from utils.data_processor import (
+    calculate_total_revenue,
+    region_wise_sales,
+    top_selling_products,
+    customer_analysis,
+    customer_analysis_spilling,
+    daily_sales_trend,
+    find_peak_sales_day,
+    low_performing_products,
+    product_revenue_paise
+)
+from utils.money import divide_paise, format_rupees
+
+
+def compute_report_analysis(transactions, memory_budget=None):
+    """
+    Runs the Part 2 analyses the report needs
+
+    Returns:
+    dictionary keyed like main.analyze_sales()
+    """
+
+    daily_trend = daily_sales_trend(transactions)
+
+    if memory_budget:
+        # Bounded memory: spill customer state to disk, keep only the top 5
+        customers = customer_analysis_spilling(
+            transactions, memory_budget, top_n=5, include_product_list=False
+        )
+    else:
+        customers = customer_analysis(transactions, include_product_list=False)
+
+    return {
+        "total_revenue": calculate_total_revenue(transactions),
+        "region_sales": region_wise_sales(transactions),
+        "top_products": top_selling_products(transactions),
+        "product_revenue_paise": product_revenue_paise(transactions),
+        "customers": customers,
+        "daily_trend": daily_trend,
+        "peak_day": find_peak_sales_day(transactions, daily_summary=daily_trend),
+        "low_performers": low_performing_products(transactions)
+    }
+
+
+def generate_sales_report(transactions, enriched_transactions, output_file="output/sales_report.txt",
+                          memory_budget=None, anomalies=None, analysis=None, basket_pairs=None):
     """
     Generates a comprehensive formatted text report
+
+    memory_budget: optional bytes limit for per-customer grouping state;
+    when given, the top customers are found with spill-to-disk grouping
+
+    anomalies: optional list from detect_revenue_anomalies(); when given,
+    a REVENUE ANOMALIES section is added
+
+    basket_pairs: optional list from frequently_bought_together(); when
+    given, a FREQUENTLY BOUGHT TOGETHER section is added
+
+    analysis: optional results already computed by main.analyze_sales()
+    (possibly cached); when missing they are computed here
+
+    enriched_transactions may be None when enrichment was skipped; the
+    API ENRICHMENT SUMMARY section then says so
     """
 
+    if analysis is None:
+        analysis = compute_report_analysis(transactions, memory_budget)
+
     # -------------------------------
-    # BASIC METRICS
+    # BASIC METRICS (all money in integer paise)
     # -------------------------------
+    # Money comes from the exact *_paise fields of the analysis, never
+    # from the rupee floats
 
     total_transactions = len(transactions)
-    total_revenue = sum(t["Quantity"] * t["UnitPrice"] for t in transactions)
-    avg_order_value = total_revenue / total_transactions if total_transactions else 0
+    total_revenue = sum(stats["total_sales_paise"] for stats in analysis["region_sales"].values())
+    avg_order_value = divide_paise(total_revenue, total_transactions)
 
-    dates = sorted(t["Date"] for t in transactions)
+    # Daily trend keys are already sorted by date
+    dates = list(analysis["daily_trend"])
     date_range = f"{dates[0]} to {dates[-1]}" if dates else "N/A"
 
     # -------------------------------
     # REGION-WISE PERFORMANCE
     # -------------------------------
 
-    region_stats = defaultdict(lambda: {"sales": 0, "count": 0})
-
-    for t in transactions:
-        amount = t["Quantity"] * t["UnitPrice"]
-        region_stats[t["Region"]]["sales"] += amount
-        region_stats[t["Region"]]["count"] += 1
-
-    region_summary = []
-    for region, stats in region_stats.items():
-        percentage = (stats["sales"] / total_revenue) * 100 if total_revenue else 0
-        region_summary.append((region, stats["sales"], percentage, stats["count"]))
-
-    region_summary.sort(key=lambda x: x[1], reverse=True)
+    region_summary = [
+        (region, stats["total_sales_paise"], stats["percentage"], stats["transaction_count"])
+        for region, stats in analysis["region_sales"].items()
+    ]
 
     # -------------------------------
     # TOP 5 PRODUCTS
     # -------------------------------
 
-
-    product_stats = defaultdict(lambda: {"qty": 0, "revenue": 0})
-
-    for t in transactions:
-        product_stats[t["ProductName"]]["qty"] += t["Quantity"]
-        product_stats[t["ProductName"]]["revenue"] += t["Quantity"] * t["UnitPrice"]
-
-    top_products = sorted(
-        product_stats.items(),
-        key=lambda x: x[1]["qty"],
-        reverse=True
-    )[:5]
+    top_products = [
+        (name, {"qty": qty, "revenue": analysis["product_revenue_paise"][name]})
+        for name, qty, _ in analysis["top_products"][:5]
+    ]
 
     # -------------------------------
     # TOP 5 CUSTOMERS
     # -------------------------------
 
-    customer_stats = defaultdict(lambda: {"spent": 0, "orders": 0})
-
-    for t in transactions:
-        customer_stats[t["CustomerID"]]["spent"] += t["Quantity"] * t["UnitPrice"]
-        customer_stats[t["CustomerID"]]["orders"] += 1
-
-    top_customers = sorted(
-        customer_stats.items(),
-        key=lambda x: x[1]["spent"],
-        reverse=True
-    )[:5]
+    top_customers = [
+        (customer_id, {"spent": stats["total_spent_paise"], "orders": stats["purchase_count"]})
+        for customer_id, stats in list(analysis["customers"].items())[:5]
+    ]
 
     # -------------------------------
     # DAILY SALES TREND
     # -------------------------------
 
-    daily_stats = defaultdict(lambda: {"revenue": 0, "count": 0, "customers": set()})
-
-    for t in transactions:
-        amount = t["Quantity"] * t["UnitPrice"]
-        daily_stats[t["Date"]]["revenue"] += amount
-        daily_stats[t["Date"]]["count"] += 1
-        daily_stats[t["Date"]]["customers"].add(t["CustomerID"])
-
-    daily_summary = sorted(
-        [(d, v["revenue"], v["count"], len(v["customers"])) for d, v in daily_stats.items()]
-    )
+    daily_summary = [
+        (d, v["revenue_paise"], v["transaction_count"], v["unique_customers"])
+        for d, v in analysis["daily_trend"].items()
+    ]
 
     # Best selling day
-    best_day = max(daily_summary, key=lambda x: x[1])
+    peak_date, _, _ = analysis["peak_day"]
+    best_day = (peak_date, analysis["daily_trend"][peak_date]["revenue_paise"] if peak_date else 0)
 
     # -------------------------------
     # LOW PERFORMING PRODUCTS
     # -------------------------------
 
     low_products = [
-        (p, v["qty"], v["revenue"])
-        for p, v in product_stats.items()
-        if v["qty"] < 10
+        (p, q, analysis["product_revenue_paise"][p])
+        for p, q, _ in analysis["low_performers"]
     ]
 
     # -------------------------------
@@ -106,22 +140,22 @@ def generate_sales_report(transactions, enriched_transactions, output_file="outp
     # -------------------------------
     avg_transaction_per_region = {}
 
-# Loop through each region and calculate average transaction value
-    for region, stats in region_stats.items():
-        avg_transaction_per_region[region] = (
-            stats["sales"] / stats["count"]
-            if stats["count"] > 0 else 0
-        )
+    # Loop through each region and calculate average transaction value
+    for region, sales, _, count in region_summary:
+        avg_transaction_per_region[region] = divide_paise(sales, count)
+
     # -------------------------------
     # API ENRICHMENT SUMMARY
     # -------------------------------
 
-    enriched_count = sum(1 for t in enriched_transactions if t.get("API_Match"))
-    success_rate = (enriched_count / len(enriched_transactions)) * 100 if enriched_transactions else 0
+    enriched_rows = enriched_transactions or []
+
+    enriched_count = sum(1 for t in enriched_rows if t.get("API_Match"))
+    success_rate = (enriched_count / len(enriched_rows)) * 100 if enriched_rows else 0
 
     failed_products = {
         t["ProductName"]
-        for t in enriched_transactions
+        for t in enriched_rows
         if not t.get("API_Match")
     }
 
@@ -141,9 +175,9 @@ def generate_sales_report(transactions, enriched_transactions, output_file="outp
         # OVERALL SUMMARY
         f.write("OVERALL SUMMARY\n")
         f.write("-" * 45 + "\n")
-        f.write(f"Total Revenue:        ₹{total_revenue:,.2f}\n")
+        f.write(f"Total Revenue:        ₹{format_rupees(total_revenue)}\n")
         f.write(f"Total Transactions:   {total_transactions}\n")
-        f.write(f"Average Order Value:  ₹{avg_order_value:,.2f}\n")
+        f.write(f"Average Order Value:  ₹{format_rupees(avg_order_value)}\n")
         f.write(f"Date Range:           {date_range}\n\n")
 
         # REGION PERFORMANCE
@@ -151,7 +185,7 @@ def generate_sales_report(transactions, enriched_transactions, output_file="outp
         f.write("-" * 45 + "\n")
         f.write("Region     Sales        % of Total   Transactions\n")
         for r, s, p, c in region_summary:
-            f.write(f"{r:<10} ₹{s:>10,.0f}   {p:>6.2f}%        {c}\n")
+            f.write(f"{r:<10} ₹{format_rupees(s, 0):>10}   {p:>6.2f}%        {c}\n")
         f.write("\n")
 
         # TOP PRODUCTS
@@ -159,7 +193,7 @@ def generate_sales_report(transactions, enriched_transactions, output_file="outp
         f.write("-" * 45 + "\n")
         f.write("Rank  Product        Qty   Revenue\n")
         for i, (p, v) in enumerate(top_products, 1):
-            f.write(f"{i:<5} {p:<14} {v['qty']:<5} ₹{v['revenue']:,.0f}\n")
+            f.write(f"{i:<5} {p:<14} {v['qty']:<5} ₹{format_rupees(v['revenue'], 0)}\n")
         f.write("\n")
 
         # TOP CUSTOMERS
@@ -167,7 +201,7 @@ def generate_sales_report(transactions, enriched_transactions, output_file="outp
         f.write("-" * 45 + "\n")
         f.write("Rank  Customer   Total Spent   Orders\n")
         for i, (c, v) in enumerate(top_customers, 1):
-            f.write(f"{i:<5} {c:<9} ₹{v['spent']:,.0f}     {v['orders']}\n")
+            f.write(f"{i:<5} {c:<9} ₹{format_rupees(v['spent'], 0)}     {v['orders']}\n")
         f.write("\n")
 
         # DAILY TREND
@@ -175,19 +209,19 @@ def generate_sales_report(transactions, enriched_transactions, output_file="outp
         f.write("-" * 45 + "\n")
         f.write("Date        Revenue     Transactions  Customers\n")
         for d, r, c, u in daily_summary:
-            f.write(f"{d}  ₹{r:>8,.0f}     {c:<12} {u}\n")
+            f.write(f"{d}  ₹{format_rupees(r, 0):>8}     {c:<12} {u}\n")
         f.write("\n")
 
         # PRODUCT PERFORMANCE
         f.write("PRODUCT PERFORMANCE ANALYSIS\n")
         f.write("-" * 45 + "\n")
 
-        f.write(f"Best Selling Day: {best_day[0]} (₹{best_day[1]:,.0f})\n\n")
+        f.write(f"Best Selling Day: {best_day[0]} (₹{format_rupees(best_day[1], 0)})\n\n")
 
         f.write("Low Performing Products:\n")
         if low_products:
             for p, q, r in low_products:
-                f.write(f" - {p}: Qty {q}, Revenue ₹{r:,.0f}\n")
+                f.write(f" - {p}: Qty {q}, Revenue ₹{format_rupees(r, 0)}\n")
         else:
             f.write(" - None\n")
 
@@ -195,18 +229,50 @@ def generate_sales_report(transactions, enriched_transactions, output_file="outp
 
         f.write("Average Transaction Value per Region:\n")
         for region, avg in avg_transaction_per_region.items():
-            f.write(f" - {region}: ₹{avg:,.2f}\n")
+            f.write(f" - {region}: ₹{format_rupees(avg)}\n")
 
         f.write("\n")
 
+        # REVENUE ANOMALIES
+        if anomalies is not None:
+            f.write("REVENUE ANOMALIES\n")
+            f.write("-" * 45 + "\n")
+            if anomalies:
+                for a in anomalies:
+                    f.write(
+                        f" - {a['date']} {a['series']}: ₹{a['revenue']:,.0f} "
+                        f"(expected ₹{a['expected']:,.0f}, z={a['z_score']:+.2f})\n"
+                    )
+            else:
+                f.write(" - None\n")
+            f.write("\n")
+
+        # FREQUENTLY BOUGHT TOGETHER
+        if basket_pairs is not None:
+            f.write("FREQUENTLY BOUGHT TOGETHER\n")
+            f.write("-" * 45 + "\n")
+            if basket_pairs:
+                for pair in basket_pairs:
+                    first, second = pair["products"]
+                    f.write(
+                        f" - {first} + {second}: {pair['count']} baskets "
+                        f"(support {pair['support']:.2%}, lift {pair['lift']:.2f})\n"
+                    )
+            else:
+                f.write(" - None\n")
+            f.write("\n")
+
 
         # API ENRICHMENT
         f.write("API ENRICHMENT SUMMARY\n")
         f.write("-" * 45 + "\n")
-        f.write(f"Products Enriched: {enriched_count}\n")
-        f.write(f"Success Rate: {success_rate:.2f}%\n")
-        f.write("Not Enriched Products:\n")
-        for p in failed_products:
-            f.write(f" - {p}\n")
+        if enriched_transactions is None:
+            f.write(" - Skipped (enrichment stage not run)\n")
+        else:
+            f.write(f"Products Enriched: {enriched_count}\n")
+            f.write(f"Success Rate: {success_rate:.2f}%\n")
+            f.write("Not Enriched Products:\n")
+            for p in failed_products:
+                f.write(f" - {p}\n")
 
     print(f"Sales report generated successfully at: {output_file}")
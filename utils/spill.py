@@ -0,0 +1,191 @@
+"""
+File: spill.py
+Purpose: Memory-budgeted grouping with spill-to-disk
+
+Group state is kept in a dictionary until the configured memory budget
+is exceeded. The dictionary is then written to a temporary file as a run
+sorted by key and cleared. At the end all runs are combined with an
+external k-way merge (in several passes when there are more runs than
+MAX_OPEN_RUNS, so the number of open files stays bounded).
+
+The budget bounds this grouping state only. The input rows are not
+counted: feed a stream (file_handler.stream_transactions) to keep them
+out of memory too, and bound the output (e.g. top_n) so the finished
+groups are not all collected again.
+"""
+import heapq
+import json
+import os
+import tempfile
+
+
+# Rough size of one group entry (key string + small state list + dict slot)
+ESTIMATED_GROUP_BYTES = 256
+
+# Default budget used when a caller enables spilling without a size
+DEFAULT_MEMORY_BUDGET = 64 * 1024 * 1024
+
+# Run files opened at once by one merge pass
+MAX_OPEN_RUNS = 64
+
+
+def parse_memory_budget(text):
+    """
+    Converts a budget like "512", "64MB", "2G" or "1500KB" into bytes
+    (a bare number means megabytes)
+
+    Returns None for an empty value (no budget)
+    """
+
+    if text is None or not str(text).strip():
+        return None
+
+    text = str(text).strip().upper().rstrip("B")
+    units = {"K": 1024, "M": 1024 ** 2, "G": 1024 ** 3}
+
+    if text and text[-1] in units:
+        return int(float(text[:-1]) * units[text[-1]])
+
+    return int(float(text) * units["M"])
+
+
+class SpillingGroupBy:
+    """
+    Groups (key, state) pairs under a memory budget
+
+    Parameters:
+    - merge: function(state_a, state_b) -> combined state
+    - memory_budget: bytes of group state kept in memory before spilling
+    - group_bytes: estimated bytes per group entry
+    - tmp_dir: directory for run files (system temp dir by default)
+    - max_open_runs: run files merged (and open) at once
+
+    Keys must be strings and states must be JSON-serializable.
+    """
+
+    def __init__(self, merge, memory_budget=DEFAULT_MEMORY_BUDGET,
+                 group_bytes=ESTIMATED_GROUP_BYTES, tmp_dir=None, max_open_runs=MAX_OPEN_RUNS):
+        self.merge = merge
+        self.max_groups = max(1, memory_budget // group_bytes)
+        self.tmp_dir = tmp_dir
+        self.max_open_runs = max(2, max_open_runs)
+        self.groups = {}
+        self.run_files = []
+
+    @property
+    def spill_count(self):
+        """
+        Number of sorted runs written to disk so far
+        """
+
+        return len(self.run_files)
+
+    def add(self, key, state):
+        """
+        Merges one state into the group for `key`
+        """
+
+        groups = self.groups
+        existing = groups.get(key)
+
+        if existing is None:
+            groups[key] = state
+            if len(groups) > self.max_groups:
+                self._spill()
+        else:
+            groups[key] = self.merge(existing, state)
+
+    def _write_run(self, pairs):
+        """
+        Writes sorted (key, state) pairs to a new run file
+
+        Returns:
+        path of the run file
+        """
+
+        handle, path = tempfile.mkstemp(prefix="sales_spill_", suffix=".jsonl", dir=self.tmp_dir)
+
+        with os.fdopen(handle, "w", encoding="utf-8") as file:
+            for key, state in pairs:
+                file.write(json.dumps([key, state]) + "\n")
+
+        return path
+
+    def _spill(self):
+        """
+        Writes the in-memory groups as one sorted run and clears them
+        """
+
+        groups = self.groups
+        self.run_files.append(self._write_run((key, groups[key]) for key in sorted(groups)))
+        self.groups = {}
+
+    def _merge_runs(self, paths):
+        """
+        Yields the combined (key, state) groups of sorted run files
+        """
+
+        merged = heapq.merge(*(self._read_run(path) for path in paths), key=lambda pair: pair[0])
+
+        current_key = None
+        current_state = None
+
+        for key, state in merged:
+            if key == current_key:
+                current_state = self.merge(current_state, state)
+                continue
+
+            if current_key is not None:
+                yield current_key, current_state
+
+            current_key, current_state = key, state
+
+        if current_key is not None:
+            yield current_key, current_state
+
+    @staticmethod
+    def _read_run(path):
+        """
+        Yields (key, state) pairs from one run file
+        """
+
+        with open(path, "r", encoding="utf-8") as file:
+            for line in file:
+                key, state = json.loads(line)
+                yield key, state
+
+    def items(self):
+        """
+        Yields every (key, state) group exactly once, sorted by key
+
+        Run files are deleted once the merge is finished.
+        """
+
+        # Nothing spilled: everything is still in memory
+        if not self.run_files:
+            for key in sorted(self.groups):
+                yield key, self.groups[key]
+            self.groups = {}
+            return
+
+        # Flush the remainder so all groups live in sorted runs
+        if self.groups:
+            self._spill()
+
+        try:
+            # Intermediate passes: merge groups of runs into longer runs
+            # until one pass can open them all
+            while len(self.run_files) > self.max_open_runs:
+                batch = self.run_files[:self.max_open_runs]
+                merged_path = self._write_run(self._merge_runs(batch))
+                self.run_files = self.run_files[self.max_open_runs:] + [merged_path]
+                for path in batch:
+                    os.remove(path)
+
+            yield from self._merge_runs(self.run_files)
+
+        finally:
+            for path in self.run_files:
+                if os.path.exists(path):
+                    os.remove(path)
+            self.run_files = []
@@ -0,0 +1,349 @@
+"""
+File: sqlite_store.py
+Purpose: Optional SQLite storage backend that loads validated transactions
+         once and pushes the Part 2 aggregations down into SQL
+"""
+import os
+import sqlite3
+
+from utils.data_processor import popcount, decode_product_mask
+from utils.money import price_paise, divide_paise, paise_to_rupees
+
+
+## Loading ##
+def load_transactions_to_sqlite(transactions, db_path=":memory:", durable=True):
+    """
+    Bulk-loads validated transactions into a SQLite database
+
+    Parameters:
+    - transactions: iterable of transaction dictionaries; rows are
+      inserted as they are produced, so a generator such as
+      stream_transactions() is never materialized
+    - db_path: database file path (":memory:" keeps it in RAM)
+    - durable: False turns off the journal and fsyncs during the load
+      (only for scratch files that are discarded if the load fails)
+
+    Returns:
+    sqlite3.Connection with the transactions table and its indexes
+    """
+
+    conn = sqlite3.connect(db_path)
+
+    if not durable:
+        conn.execute("PRAGMA journal_mode = OFF")
+        conn.execute("PRAGMA synchronous = OFF")
+
+    # Step 1: Create the table (rowid keeps the original input order,
+    # which is used to break ties exactly like Python's stable sort)
+    conn.execute("DROP TABLE IF EXISTS transactions")
+    conn.execute(
+        """
+        CREATE TABLE transactions (
+            TransactionID  TEXT,
+            Date           TEXT,
+            ProductID      TEXT,
+            ProductName    TEXT,
+            Quantity       INTEGER,
+            UnitPricePaise INTEGER,
+            CustomerID     TEXT,
+            Region         TEXT
+        )
+        """
+    )
+
+    # Step 2: Insert all rows with executemany inside one transaction
+    # (money is stored as exact integer paise)
+    rows = (
+        (
+            txn["TransactionID"], txn["Date"], txn["ProductID"],
+            txn["ProductName"], txn["Quantity"], price_paise(txn),
+            txn["CustomerID"], txn["Region"]
+        )
+        for txn in transactions
+    )
+
+    with conn:
+        conn.executemany(
+            "INSERT INTO transactions VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            rows
+        )
+
+    # Step 3: Build indexes after the bulk load (cheaper than maintaining
+    # them row by row during the insert)
+    with conn:
+        conn.execute("CREATE INDEX idx_txn_date ON transactions (Date)")
+        conn.execute("CREATE INDEX idx_txn_region ON transactions (Region)")
+        conn.execute("CREATE INDEX idx_txn_product ON transactions (ProductName)")
+        conn.execute("CREATE INDEX idx_txn_customer ON transactions (CustomerID)")
+
+    return conn
+
+
+def open_transactions_db(transactions, db_path, version):
+    """
+    Opens a file-backed transactions database, loading it only when the
+    stored dataset version differs from `version`
+
+    The load goes to a scratch file that replaces db_path once it is
+    complete, so an interrupted load never leaves a half-filled database
+    that looks current.
+
+    Parameters:
+    - transactions: iterable of transaction dictionaries (only read when
+      the database has to be (re)loaded)
+    - db_path: database file path
+    - version: dataset version (utils/memo.py dataset_version())
+
+    Returns:
+    (sqlite3.Connection, reused flag)
+    """
+
+    # Step 1: Reuse the database if it holds this version
+    if os.path.exists(db_path):
+        conn = sqlite3.connect(db_path)
+        try:
+            row = conn.execute("SELECT version FROM load_info").fetchone()
+        except sqlite3.Error:
+            row = None
+
+        if row is not None and row[0] == version:
+            return conn, True
+
+        conn.close()
+
+    # Step 2: Load into a scratch file, record the version, swap it in
+    scratch_path = f"{db_path}.loading"
+    if os.path.exists(scratch_path):
+        os.remove(scratch_path)
+
+    conn = load_transactions_to_sqlite(transactions, scratch_path, durable=False)
+    try:
+        with conn:
+            conn.execute("CREATE TABLE load_info (version TEXT)")
+            conn.execute("INSERT INTO load_info VALUES (?)", (version,))
+    finally:
+        conn.close()
+
+    os.replace(scratch_path, db_path)
+
+    return sqlite3.connect(db_path), False
+
+
+## Aggregate pushdown ##
+def sqlite_calculate_total_revenue(conn):
+    """
+    Calculates total revenue inside SQLite
+
+    Returns:
+    float: total revenue (sum of Quantity * UnitPrice)
+    """
+
+    row = conn.execute(
+        "SELECT COALESCE(SUM(Quantity * UnitPricePaise), 0) FROM transactions"
+    ).fetchone()
+
+    return paise_to_rupees(row[0])
+
+
+def sqlite_region_wise_sales(conn):
+    """
+    SQL version of region_wise_sales()
+
+    Returns:
+    dictionary containing region-wise statistics sorted by total_sales
+    """
+
+    rows = conn.execute(
+        """
+        SELECT Region,
+               SUM(Quantity * UnitPricePaise) AS total_sales,
+               COUNT(*) AS transaction_count
+        FROM transactions
+        GROUP BY Region
+        ORDER BY total_sales DESC, MIN(rowid)
+        """
+    ).fetchall()
+
+    total_sales = sum(row[1] for row in rows)
+
+    region_stats = {}
+    for region, sales, count in rows:
+        region_stats[region] = {
+            "total_sales": paise_to_rupees(sales),
+            "total_sales_paise": sales,
+            "transaction_count": count,
+            "percentage": round((sales / total_sales) * 100, 2)
+        }
+
+    return region_stats
+
+
+def sqlite_top_selling_products(conn, n=5):
+    """
+    SQL version of top_selling_products()
+
+    Returns:
+    list of tuples (ProductName, TotalQuantity, TotalRevenue)
+    """
+
+    rows = conn.execute(
+        """
+        SELECT ProductName,
+               SUM(Quantity) AS total_quantity,
+               SUM(Quantity * UnitPricePaise) AS total_revenue
+        FROM transactions
+        GROUP BY ProductName
+        ORDER BY total_quantity DESC, MIN(rowid)
+        LIMIT ?
+        """,
+        (n,)
+    ).fetchall()
+
+    return [(name, qty, paise_to_rupees(revenue)) for name, qty, revenue in rows]
+
+
+def sqlite_product_revenue_paise(conn):
+    """
+    SQL version of product_revenue_paise()
+
+    Returns:
+    dictionary {ProductName: revenue in paise}
+    """
+
+    return dict(conn.execute(
+        "SELECT ProductName, SUM(Quantity * UnitPricePaise) FROM transactions GROUP BY ProductName"
+    ).fetchall())
+
+
+def sqlite_customer_analysis(conn, product_codes=None, include_product_list=True):
+    """
+    SQL version of customer_analysis() (same bitmap fields and parameters)
+
+    Returns:
+    dictionary of customer statistics sorted by total_spent (descending)
+    """
+
+    rows = conn.execute(
+        """
+        SELECT CustomerID,
+               SUM(Quantity * UnitPricePaise) AS total_spent,
+               COUNT(*) AS purchase_count
+        FROM transactions
+        GROUP BY CustomerID
+        ORDER BY total_spent DESC, MIN(rowid)
+        """
+    ).fetchall()
+
+    customer_stats = {}
+    for customer_id, total_spent, purchase_count in rows:
+        customer_stats[customer_id] = {
+            "total_spent": paise_to_rupees(total_spent),
+            "total_spent_paise": total_spent,
+            "purchase_count": purchase_count,
+            "products_mask": 0,
+            "avg_order_value": paise_to_rupees(divide_paise(total_spent, purchase_count))
+        }
+
+    # Product bit indexes in first-seen order (same codes as customer_analysis)
+    if product_codes is None:
+        product_codes = {}
+    for (product_name,) in conn.execute(
+        "SELECT ProductName FROM transactions GROUP BY ProductName ORDER BY MIN(rowid)"
+    ):
+        product_codes.setdefault(product_name, len(product_codes))
+
+    # Distinct products per customer (uses the CustomerID index)
+    product_rows = conn.execute(
+        "SELECT DISTINCT CustomerID, ProductName FROM transactions"
+    )
+    for customer_id, product_name in product_rows:
+        customer_stats[customer_id]["products_mask"] |= 1 << product_codes[product_name]
+
+    for stats in customer_stats.values():
+        stats["distinct_products"] = popcount(stats["products_mask"])
+        if include_product_list:
+            stats["products_bought"] = decode_product_mask(stats["products_mask"], product_codes)
+
+    return customer_stats
+
+
+def sqlite_daily_sales_trend(conn):
+    """
+    SQL version of daily_sales_trend()
+
+    Returns:
+    dictionary sorted by date containing revenue, transaction_count
+    and unique_customers
+    """
+
+    rows = conn.execute(
+        """
+        SELECT Date,
+               SUM(Quantity * UnitPricePaise) AS revenue,
+               COUNT(*) AS transaction_count,
+               COUNT(DISTINCT CustomerID) AS unique_customers
+        FROM transactions
+        GROUP BY Date
+        ORDER BY Date
+        """
+    ).fetchall()
+
+    return {
+        date: {
+            "revenue": paise_to_rupees(revenue),
+            "revenue_paise": revenue,
+            "transaction_count": count,
+            "unique_customers": customers
+        }
+        for date, revenue, count, customers in rows
+    }
+
+
+def sqlite_find_peak_sales_day(conn):
+    """
+    SQL version of find_peak_sales_day()
+
+    Returns:
+    tuple (date, revenue, transaction_count)
+    """
+
+    row = conn.execute(
+        """
+        SELECT Date,
+               SUM(Quantity * UnitPricePaise) AS revenue,
+               COUNT(*) AS transaction_count
+        FROM transactions
+        GROUP BY Date
+        ORDER BY revenue DESC, Date
+        LIMIT 1
+        """
+    ).fetchone()
+
+    if row is None:
+        return (None, 0.0, 0)
+
+    return (row[0], paise_to_rupees(row[1]), row[2])
+
+
+def sqlite_low_performing_products(conn, threshold=10):
+    """
+    SQL version of low_performing_products()
+
+    Returns:
+    list of tuples (ProductName, TotalQuantity, TotalRevenue)
+    """
+
+    rows = conn.execute(
+        """
+        SELECT ProductName,
+               SUM(Quantity) AS total_quantity,
+               SUM(Quantity * UnitPricePaise) AS total_revenue
+        FROM transactions
+        GROUP BY ProductName
+        HAVING total_quantity < ?
+        ORDER BY total_quantity, MIN(rowid)
+        """,
+        (threshold,)
+    ).fetchall()
+
+    return [(name, qty, paise_to_rupees(revenue)) for name, qty, revenue in rows]
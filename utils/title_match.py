@@ -0,0 +1,178 @@
+"""
+File: title_match.py
+Purpose: Fuzzy product-title matching against the catalog
+
+Sales ProductIDs do not always line up with catalog IDs, but product
+names usually resemble catalog titles. TitleIndex builds a character
+trigram inverted index over the catalog titles once:
+
+    trigram -> [positions of titles containing it]
+
+A name is matched by probing the index with its own trigrams and counting
+shared trigrams per candidate title. Only titles that share at least one
+trigram are ever scored. The score is the Dice coefficient
+2 * |shared| / (|name trigrams| + |title trigrams|), and matches below
+the confidence threshold are rejected.
+
+Two more rules keep vague names from matching a longer title, and
+long names from matching a short title they merely contain:
+- SHORT_NAME_THRESHOLD applies to single-word names and whenever one
+  side has under LENGTH_RATIO of the other's trigrams ("Mouse" scores
+  0.75 against "Mouse Pad", "Laptop Charger" 0.64 against "Laptop";
+  both are rejected)
+- the best title must beat the second best by DEFAULT_MARGIN, otherwise
+  the name is ambiguous and not matched
+
+Only an identical normalized title counts as an exact match.
+"""
+import re
+
+
+# Default minimum Dice score for a title match
+DEFAULT_THRESHOLD = 0.6
+
+# Minimum score for single-word names (few trigrams, so a short name is
+# largely contained in many longer titles)
+SHORT_NAME_THRESHOLD = 0.8
+
+# Trigram count ratio (smaller / larger) below which a name and title
+# are treated as a short string contained in a longer one
+LENGTH_RATIO = 0.75
+
+# Minimum lead of the best score over the second best
+DEFAULT_MARGIN = 0.05
+
+_NON_ALNUM = re.compile(r"[^0-9a-z]+")
+
+
+def normalize_title(text):
+    """
+    Lowercases and collapses punctuation/whitespace to single spaces
+    """
+
+    return _NON_ALNUM.sub(" ", str(text).lower()).strip()
+
+
+def trigrams(text):
+    """
+    Returns the set of character trigrams of a normalized title
+    (padded so short words and word boundaries produce grams too)
+    """
+
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class TitleIndex:
+    """
+    Trigram inverted index over catalog titles
+
+    Parameters:
+    - products: cleaned product dictionaries (need "title")
+    - threshold: minimum Dice score for match() to return a product
+      (single-word names and very unequal lengths need at least
+      SHORT_NAME_THRESHOLD)
+    - margin: minimum lead of the best score over the second best
+    """
+
+    def __init__(self, products, threshold=DEFAULT_THRESHOLD, margin=DEFAULT_MARGIN):
+        self.threshold = threshold
+        self.margin = margin
+        self.products = []
+        self.gram_counts = []
+        self.exact = {}
+        self.postings = {}
+
+        for product in products:
+            title = normalize_title(product.get("title") or "")
+            if not title:
+                continue
+
+            position = len(self.products)
+            grams = trigrams(title)
+
+            self.products.append(product)
+            self.gram_counts.append(len(grams))
+            self.exact.setdefault(title, position)
+
+            for gram in grams:
+                self.postings.setdefault(gram, []).append(position)
+
+    def __len__(self):
+        return len(self.products)
+
+    def _scored(self, title, limit):
+        """
+        Returns up to `limit` (score, position) candidates for a
+        normalized title, best first, and the title's trigram count
+        """
+
+        grams = trigrams(title)
+
+        # Count shared trigrams per candidate via the postings lists
+        shared = {}
+        for gram in grams:
+            for position in self.postings.get(gram, ()):
+                shared[position] = shared.get(position, 0) + 1
+
+        size = len(grams)
+        scored = sorted(
+            ((2 * count / (size + self.gram_counts[position]), position)
+             for position, count in shared.items()),
+            key=lambda item: (-item[0], item[1])
+        )
+
+        return scored[:limit], size
+
+    def search(self, name, limit=5):
+        """
+        Returns up to `limit` (score, product) candidates, best first
+        (scores below the threshold are included)
+        """
+
+        title = normalize_title(name)
+        if not title:
+            return []
+
+        position = self.exact.get(title)
+        if position is not None:
+            return [(1.0, self.products[position])]
+
+        scored, _ = self._scored(title, limit)
+        return [(round(score, 4), self.products[position]) for score, position in scored]
+
+    def match(self, name):
+        """
+        Returns (product, score) for the best title if it reaches the
+        threshold (stricter for single-word names and titles much
+        shorter or longer than the name) and leads the second best by
+        the margin, otherwise None
+        """
+
+        title = normalize_title(name)
+        if not title:
+            return None
+
+        # An exact title match is always accepted
+        position = self.exact.get(title)
+        if position is not None:
+            return self.products[position], 1.0
+
+        scored, size = self._scored(title, 2)
+        if not scored:
+            return None
+
+        score, position = scored[0]
+
+        threshold = self.threshold
+        title_size = self.gram_counts[position]
+        if " " not in title or min(size, title_size) < LENGTH_RATIO * max(size, title_size):
+            threshold = max(threshold, SHORT_NAME_THRESHOLD)
+
+        if score < threshold:
+            return None
+
+        if len(scored) > 1 and score - scored[1][0] < self.margin:
+            return None
+
+        return self.products[position], round(score, 4)